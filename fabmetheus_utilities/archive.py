@@ -18,6 +18,7 @@ __date__ = '$Date: 2008/02/05 $'
 __license__ = 'GNU Affero General Public License http://www.gnu.org/licenses/agpl.html'
 
 
+globalPluginFileNamesTable = {}
 globalTemporarySettingsPath = os.path.join(os.getcwd(), 'sfact_profiles')#(os.path.expanduser('~'), '.skeinforge')#thats default sfact way in own dir
 #globalTemporarySettingsPath = os.path.join(os.path.expanduser('~'), '.skeinforge')#thats default sf way in home dir
 #globalTemporarySettingsPath = os.path.join(os.path.expanduser('~'), '.sfact')#thats repetier compatible way in home dir
@@ -235,9 +236,19 @@ def getModuleWithPath(path):
 	return getModuleWithDirectoryPath(os.path.dirname(path), os.path.basename(path))
 
 def getPluginFileNamesFromDirectoryPath(directoryPath):
-	'Get the file names of the python plugins in the directory path.'
+	'Get the file names of the python plugins in the directory path, which are listed again only when the directory has been modified.'
+	try:
+		directoryModified = os.path.getmtime(directoryPath)
+	except OSError:
+		directoryModified = None
+	if directoryPath in globalPluginFileNamesTable:
+		pluginFileNamesModified, pluginFileNames = globalPluginFileNamesTable[directoryPath]
+		if pluginFileNamesModified == directoryModified:
+			return pluginFileNames[:]
 	fileInDirectory = os.path.join(directoryPath, '__init__.py')
-	return getFileNamesByFilePaths(getPythonFileNamesExceptInit(fileInDirectory))
+	pluginFileNames = getFileNamesByFilePaths(getPythonFileNamesExceptInit(fileInDirectory))
+	globalPluginFileNamesTable[directoryPath] = (directoryModified, pluginFileNames)
+	return pluginFileNames[:]
 
 def getProfilesPath(subName=''):
 	'Get the profiles directory path, which is the settings directory joined with profiles.'
@@ -32,6 +32,7 @@ import __init__
 
 from fabmetheus_utilities.vector3 import Vector3
 from fabmetheus_utilities import xml_simple_writer
+import bisect
 import cStringIO
 import math
 import random
@@ -714,6 +715,27 @@ def getDictionaryString(dictionary):
 		addValueToOutput(0, key, output, dictionary[key])
 	return output.getvalue()
 
+def getDilatedXIntersectionsTable(xIntersectionsTable, radius, width):
+	'Get the x intersections table outset by the radius, by widening each row and joining it into the rows within the radius.'
+	if radius <= 0.0:
+		return xIntersectionsTable.copy()
+	rowRadius = int(math.floor(radius / width))
+	rowExtensions = []
+	for rowOffset in xrange(-rowRadius, rowRadius + 1):
+		rowY = rowOffset * width
+		rowExtensions.append((rowOffset, math.sqrt(max(radius * radius - rowY * rowY, 0.0))))
+	dilatedListsTable = {}
+	for xIntersectionsTableKey in xIntersectionsTable:
+		xIntersections = xIntersectionsTable[xIntersectionsTableKey]
+		for rowOffset, rowExtension in rowExtensions:
+			addElementToListDictionary(getWidenedXIntersections(xIntersections, rowExtension), xIntersectionsTableKey + rowOffset, dilatedListsTable)
+	dilatedTable = {}
+	for dilatedListsTableKey in dilatedListsTable:
+		dilatedXIntersections = getJoinOfXIntersectionLists(dilatedListsTable[dilatedListsTableKey])
+		if len(dilatedXIntersections) > 0:
+			dilatedTable[dilatedListsTableKey] = dilatedXIntersections
+	return dilatedTable
+
 def getDistanceToLine(begin, end, point):
 	'Get the distance from a vector3 point to an infinite line.'
 	pointMinusBegin = point - begin
@@ -1008,6 +1030,27 @@ def getIsWiddershinsByVector3( polygon ):
 	'Determine if the polygon goes round in the widdershins direction.'
 	return isWiddershins( getComplexPath( polygon ) )
 
+def getJoinOfXIntersectionLists(xIntersectionLists):
+	'Get the join of the x intersection lists, each list toggles its own solidity, like getJoinOfXIntersectionIndexes with the list index as the index but without making x intersection indexes.'
+	xIntersectionEvents = []
+	for listIndex, xIntersectionList in enumerate(xIntersectionLists):
+		for x in xIntersectionList:
+			xIntersectionEvents.append((x, len(xIntersectionEvents), listIndex))
+	xIntersectionEvents.sort()
+	xIntersections = []
+	solids = [False] * len(xIntersectionLists)
+	numberOfSolids = 0
+	for x, eventIndex, listIndex in xIntersectionEvents:
+		oldNumberOfSolids = numberOfSolids
+		if solids[listIndex]:
+			numberOfSolids -= 1
+		else:
+			numberOfSolids += 1
+		solids[listIndex] = not solids[listIndex]
+		if (oldNumberOfSolids > 0) != (numberOfSolids > 0):
+			xIntersections.append(x)
+	return xIntersections
+
 def getJoinOfXIntersectionIndexes( xIntersectionIndexList ):
 	'Get joined x intersections from surrounding layers.'
 	xIntersections = []
@@ -1117,6 +1160,23 @@ def getLoopConvexCentroid(polygonComplex):
 	'Get centroid of the convex hull of a complex polygon.'
 	return getLoopCentroid( getLoopConvex(polygonComplex) )
 
+def getLoopConvexMonotone(points):
+	'Get the widdershins convex hull of points using the monotone chain algorithm, which is much faster than gift wrap for many points.'
+	sortedPoints = sorted(set(points), key=lambda point: (point.real, point.imag))
+	if len(sortedPoints) < 3:
+		return sortedPoints
+	lowerHull = []
+	for point in sortedPoints:
+		while len(lowerHull) > 1 and getCrossProduct(lowerHull[-1] - lowerHull[-2], point - lowerHull[-2]) <= 0.0:
+			lowerHull.pop()
+		lowerHull.append(point)
+	upperHull = []
+	for point in reversed(sortedPoints):
+		while len(upperHull) > 1 and getCrossProduct(upperHull[-1] - upperHull[-2], point - upperHull[-2]) <= 0.0:
+			upperHull.pop()
+		upperHull.append(point)
+	return lowerHull[: -1] + upperHull[: -1]
+
 def getLoopInsideContainingLoop( containingLoop, loops ):
 	'Get a loop that is inside the containing loop.'
 	for loop in loops:
@@ -1596,6 +1656,29 @@ def getStepKeyFromPoint(point):
 	'Get step key for the point.'
 	return (int(round(point.real)), int(round(point.imag)))
 
+def getSubtractionOfXIntersections(subtractFromXIntersections, subtractXIntersections):
+	'Get the x intersections of the subtractFrom list minus the subtract list, like getXIntersectionsFromIntersections but without making x intersection indexes.'
+	xIntersectionEvents = []
+	for x in subtractFromXIntersections:
+		xIntersectionEvents.append((x, len(xIntersectionEvents), True))
+	for x in subtractXIntersections:
+		xIntersectionEvents.append((x, len(xIntersectionEvents), False))
+	xIntersectionEvents.sort()
+	fill = False
+	solid = False
+	subtractSolid = False
+	xIntersections = []
+	for x, eventIndex, isSubtractFrom in xIntersectionEvents:
+		if isSubtractFrom:
+			fill = not fill
+		else:
+			subtractSolid = not subtractSolid
+		oldSolid = solid
+		solid = fill and not subtractSolid
+		if oldSolid != solid:
+			xIntersections.append(x)
+	return xIntersections
+
 def getThreeSignificantFigures(number):
 	'Get number rounded to three significant figures as a string.'
 	absoluteNumber = abs(number)
@@ -1680,6 +1763,19 @@ def getWiddershinsUnitPolar(angle):
 	'Get polar complex from counterclockwise angle from 1, 0.'
 	return complex(math.cos(angle), math.sin(angle))
 
+def getWidenedXIntersections(xIntersections, extension):
+	'Get the sorted x intersections with each solid interval widened by the extension on both sides and the overlapping intervals merged.'
+	sortedXIntersections = sorted(xIntersections)
+	widenedXIntersections = []
+	for xIntersectionIndex in xrange(0, len(sortedXIntersections) - 1, 2):
+		begin = sortedXIntersections[xIntersectionIndex] - extension
+		end = sortedXIntersections[xIntersectionIndex + 1] + extension
+		if len(widenedXIntersections) > 0 and begin <= widenedXIntersections[-1]:
+			widenedXIntersections[-1] = max(widenedXIntersections[-1], end)
+		else:
+			widenedXIntersections += [begin, end]
+	return widenedXIntersections
+
 def getXIntersectionIfExists( beginComplex, endComplex, y ):
 	'Get the x intersection if it exists.'
 	if ( y > beginComplex.imag ) == ( y > endComplex.imag ):
@@ -1790,11 +1886,25 @@ def isLoopIntersectingLoops( loop, otherLoops ):
 	return False
 
 def isLoopListIntersecting(loops):
-	'Determine if a loop in the list is intersecting the other loops.'
+	'Determine if a loop in the list is intersecting the other loops, only the loops with overlapping bounding boxes are checked.'
+	cornerMaximums = []
+	cornerMinimums = []
+	for loop in loops:
+		cornerMaximums.append(getMaximumByComplexPath(loop))
+		cornerMinimums.append(getMinimumByComplexPath(loop))
 	for loopIndex in xrange(len(loops) - 1):
-		loop = loops[loopIndex]
-		if isLoopIntersectingLoops(loop, loops[loopIndex + 1 :]):
-			return True
+		cornerMaximum = cornerMaximums[loopIndex]
+		cornerMinimum = cornerMinimums[loopIndex]
+		overlappingLoops = []
+		for otherLoopIndex in xrange(loopIndex + 1, len(loops)):
+			otherCornerMaximum = cornerMaximums[otherLoopIndex]
+			otherCornerMinimum = cornerMinimums[otherLoopIndex]
+			if otherCornerMinimum.real <= cornerMaximum.real and otherCornerMinimum.imag <= cornerMaximum.imag:
+				if otherCornerMaximum.real >= cornerMinimum.real and otherCornerMaximum.imag >= cornerMinimum.imag:
+					overlappingLoops.append(loops[otherLoopIndex])
+		if len(overlappingLoops) > 0:
+			if isLoopIntersectingLoops(loops[loopIndex], overlappingLoops):
+				return True
 	return False
 
 def isLoopListIntersectingInsideXSegment( loopList, segmentFirstX, segmentSecondX, segmentYMirror, y ):
@@ -1842,6 +1952,13 @@ def isPointInsideLoop(loop, point):
 	'Determine if a point is inside another loop.'
 	return getNumberOfIntersectionsToLeft(loop, point) % 2 == 1
 
+def isPointInsideXIntersectionsTable(point, xIntersectionsTable, width):
+	'Determine if the point is inside the x intersections table, whose rows are sorted and joined.'
+	yIndex = int(round(point.imag / width))
+	if yIndex not in xIntersectionsTable:
+		return False
+	return bisect.bisect_right(xIntersectionsTable[yIndex], point.real) % 2 == 1
+
 def isSegmentCompletelyInX( segment, xFirst, xSecond ):
 	'Determine if the segment overlaps within x.'
 	segmentFirstX = segment[0].point.real
@@ -1919,12 +2036,12 @@ def joinXIntersectionsTables( fromTable, intoTable ):
 	for concatenatedTableKey in concatenatedTableKeys:
 		joinedKeyTable[ concatenatedTableKey ] = None
 	for joinedKey in joinedKeyTable.keys():
-		xIntersectionIndexList = []
+		xIntersectionLists = []
 		if joinedKey in intoTable:
-			addXIntersectionIndexesFromXIntersections( 0, xIntersectionIndexList, intoTable[ joinedKey ] )
+			xIntersectionLists.append(intoTable[joinedKey])
 		if joinedKey in fromTable:
-			addXIntersectionIndexesFromXIntersections( 1, xIntersectionIndexList, fromTable[ joinedKey ] )
-		xIntersections = getJoinOfXIntersectionIndexes( xIntersectionIndexList )
+			xIntersectionLists.append(fromTable[joinedKey])
+		xIntersections = getJoinOfXIntersectionLists(xIntersectionLists)
 		if len( xIntersections ) > 0:
 			intoTable[ joinedKey ] = xIntersections
 		else:
@@ -1988,11 +2105,10 @@ def subtractXIntersectionsTable( subtractFromTable, subtractTable ):
 	subtractFromTableKeys = subtractFromTable.keys()
 	subtractFromTableKeys.sort()
 	for subtractFromTableKey in subtractFromTableKeys:
-		xIntersectionIndexList = []
-		addXIntersectionIndexesFromXIntersections( - 1, xIntersectionIndexList, subtractFromTable[ subtractFromTableKey ] )
+		subtractXIntersections = []
 		if subtractFromTableKey in subtractTable:
-			addXIntersectionIndexesFromXIntersections( 0, xIntersectionIndexList, subtractTable[ subtractFromTableKey ] )
-		xIntersections = getXIntersectionsFromIntersections( xIntersectionIndexList )
+			subtractXIntersections = subtractTable[subtractFromTableKey]
+		xIntersections = getSubtractionOfXIntersections(subtractFromTable[subtractFromTableKey], subtractXIntersections)
 		if len( xIntersections ) > 0:
 			subtractFromTable[ subtractFromTableKey ] = xIntersections
 		else:
@@ -2185,6 +2301,51 @@ class Endpoint:
 		return self
 
 
+class LoopEnclosureGrid:
+	'A grid of the bounding boxes of loops, to find the first loop which encloses a point without testing every loop.'
+	def __init__(self, loops):
+		'Initialize with the loops in the order in which they are searched.'
+		self.cellDictionary = {}
+		self.cellWidth = 1.0
+		self.cornerMaximums = []
+		self.cornerMinimums = []
+		self.loops = loops
+		if len(loops) < 1:
+			return
+		for loop in loops:
+			self.cornerMaximums.append(getMaximumByComplexPath(loop))
+			self.cornerMinimums.append(getMinimumByComplexPath(loop))
+		layerSize = getMaximumByComplexPaths(loops) - getMinimumByComplexPaths(loops)
+		self.cellWidth = max(layerSize.real, layerSize.imag, 1.0) / math.ceil(math.sqrt(float(len(loops))))
+		for loopIndex in xrange(len(loops)):
+			xMinimum, yMinimum = self.getCellKey(self.cornerMinimums[loopIndex])
+			xMaximum, yMaximum = self.getCellKey(self.cornerMaximums[loopIndex])
+			for x in xrange(xMinimum, xMaximum + 1):
+				for y in xrange(yMinimum, yMaximum + 1):
+					addElementToPixelList(loopIndex, self.cellDictionary, x, y)
+
+	def __repr__(self):
+		'Get the string representation of this loop enclosure grid.'
+		return '%s, %s' % (self.cellWidth, self.cellDictionary)
+
+	def getCellKey(self, point):
+		'Get the cell key of the point.'
+		return (int(math.floor(point.real / self.cellWidth)), int(math.floor(point.imag / self.cellWidth)))
+
+	def getSmallestEnclosureIndex(self, point):
+		'Get the index of the first loop which encloses the point, or None if no loop encloses the point.'
+		cellKey = self.getCellKey(point)
+		if cellKey not in self.cellDictionary:
+			return None
+		for loopIndex in self.cellDictionary[cellKey]:
+			cornerMaximum = self.cornerMaximums[loopIndex]
+			cornerMinimum = self.cornerMinimums[loopIndex]
+			if point.real >= cornerMinimum.real and point.real <= cornerMaximum.real and point.imag >= cornerMinimum.imag and point.imag <= cornerMaximum.imag:
+				if isPointInsideLoop(self.loops[loopIndex], point):
+					return loopIndex
+		return None
+
+
 class LoopLayer:
 	'Loops with a z.'
 	def __init__(self, z):
@@ -37,6 +37,7 @@ def getGNUTranslatorGcodeFileTypeTuples():
 	"Get the file type tuples from the translators in the import plugins folder plus gcode."
 	fileTypeTuples = getTranslatorFileTypeTuples()
 	fileTypeTuples.append( ('Gcode text files', '*.gcode') )
+	fileTypeTuples.append( ('Skein binary files', '*.skein') )
 	fileTypeTuples.sort()
 	return fileTypeTuples
 
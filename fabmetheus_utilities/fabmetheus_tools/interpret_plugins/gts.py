@@ -27,7 +27,7 @@ from fabmetheus_utilities.geometry.geometry_tools import face
 from fabmetheus_utilities.geometry.solids import triangle_mesh
 from fabmetheus_utilities.vector3 import Vector3
 from fabmetheus_utilities import archive
-from fabmetheus_utilities import gcodec
+import re
 
 __author__ = 'Enrique Perez (perez_enrique@yahoo.com)'
 __credits__ = 'Nophead <http://hydraraptor.blogspot.com/>\nArt of Illusion <http://www.artofillusion.org/>'
@@ -35,6 +35,29 @@ __date__ = '$Date: 2008/21/04 $'
 __license__ = 'GNU Affero General Public License http://www.gnu.org/licenses/agpl.html'
 
 
+globalLineWithoutCommentExpression = re.compile(r'^[^#!\r\n][^\r\n]*', re.MULTILINE)
+
+
+def addFromLinesWithoutComments(linesWithoutComments, triangleMesh):
+	"Add the vertexes, edges and faces from the lines without comments, the words after the ones needed on each line are ignored."
+	splitLine = linesWithoutComments[0].split()
+	numberOfVertexes = int( splitLine[0] )
+	numberOfEdges = int(splitLine[1])
+	numberOfFaces = int( splitLine[2] )
+	edgeStart = numberOfVertexes + 1
+	faceStart = edgeStart + numberOfEdges
+	for line in linesWithoutComments[1 : edgeStart]:
+		splitLine = line.split(None, 3)
+		triangleMesh.vertexes.append(Vector3(float(splitLine[0]), float(splitLine[1]), float(splitLine[2])))
+	edges = triangleMesh.edges
+	for edgeIndex, line in enumerate(linesWithoutComments[edgeStart : faceStart]):
+		splitLine = line.split(None, 2)
+		edges.append(face.Edge().getFromVertexIndexes(edgeIndex, [int(splitLine[0]) - 1, int(splitLine[1]) - 1]))
+	for faceIndex, line in enumerate(linesWithoutComments[faceStart : faceStart + numberOfFaces]):
+		splitLine = line.split(None, 3)
+		edgeIndexes = [int(splitLine[0]) - 1, int(splitLine[1]) - 1, int(splitLine[2]) - 1]
+		triangleMesh.faces.append(face.Face().getFromEdgeIndexes(edgeIndexes, edges, faceIndex))
+
 def getCarving(fileName):
 	"Get the carving for the gts file."
 	return getFromGNUTriangulatedSurfaceText( archive.getFileText(fileName), triangle_mesh.TriangleMesh() )
@@ -43,38 +66,6 @@ def getFromGNUTriangulatedSurfaceText( gnuTriangulatedSurfaceText, triangleMesh
 	"Initialize from a GNU Triangulated Surface Text."
 	if gnuTriangulatedSurfaceText == '':
 		return None
-	lines = archive.getTextLines( gnuTriangulatedSurfaceText )
-	linesWithoutComments = []
-	for line in lines:
-		if len(line) > 0:
-			firstCharacter = line[0]
-			if firstCharacter != '#' and firstCharacter != '!':
-				linesWithoutComments.append(line)
-	splitLine = linesWithoutComments[0].split()
-	numberOfVertexes = int( splitLine[0] )
-	numberOfEdges = int(splitLine[1])
-	numberOfFaces = int( splitLine[2] )
-	faceTriples = []
-	for vertexIndex in xrange( numberOfVertexes ):
-		line = linesWithoutComments[ vertexIndex + 1 ]
-		splitLine = line.split()
-		vertex = Vector3( float( splitLine[0] ), float(splitLine[1]), float( splitLine[2] ) )
-		triangleMesh.vertexes.append(vertex)
-	edgeStart = numberOfVertexes + 1
-	for edgeIndex in xrange( numberOfEdges ):
-		line = linesWithoutComments[ edgeIndex + edgeStart ]
-		splitLine = line.split()
-		vertexIndexes = []
-		for word in splitLine[ : 2 ]:
-			vertexIndexes.append( int(word) - 1 )
-		edge = face.Edge().getFromVertexIndexes( edgeIndex, vertexIndexes )
-		triangleMesh.edges.append( edge )
-	faceStart = edgeStart + numberOfEdges
-	for faceIndex in xrange( numberOfFaces ):
-		line = linesWithoutComments[ faceIndex + faceStart ]
-		splitLine = line.split()
-		edgeIndexes = []
-		for word in splitLine[ : 3 ]:
-			edgeIndexes.append( int(word) - 1 )
-		triangleMesh.faces.append( face.Face().getFromEdgeIndexes( edgeIndexes, triangleMesh.edges, faceIndex ) )
+	linesWithoutComments = globalLineWithoutCommentExpression.findall(gnuTriangulatedSurfaceText)
+	triangle_mesh.getReturnWithoutGarbageCollection(addFromLinesWithoutComments, linesWithoutComments, triangleMesh)
 	return triangleMesh
@@ -28,8 +28,7 @@ from fabmetheus_utilities.geometry.geometry_tools import face
 from fabmetheus_utilities.geometry.solids import triangle_mesh
 from fabmetheus_utilities.vector3 import Vector3
 from fabmetheus_utilities import archive
-from fabmetheus_utilities import gcodec
-from struct import unpack
+import re
 
 __author__ = 'Enrique Perez (perez_enrique@yahoo.com)'
 __credits__ = 'Nophead <http://hydraraptor.blogspot.com/>\nArt of Illusion <http://www.artofillusion.org/>'
@@ -37,16 +36,41 @@ __date__ = '$Date: 2008/21/04 $'
 __license__ = 'GNU Affero General Public License http://www.gnu.org/licenses/agpl.html'
 
 
+globalVertexFaceExpression = re.compile(r'^[ \t]*(v|f)[ \t]+([^\r\n#]*)', re.MULTILINE)
+
+
 def addFacesGivenText( objText, triangleMesh ):
 	"Add faces given obj text."
-	lines = archive.getTextLines( objText )
-	for line in lines:
-		splitLine = line.split()
-		firstWord = gcodec.getFirstWord(splitLine)
+	faces = triangleMesh.faces
+	vertexes = triangleMesh.vertexes
+	for firstWord, wordsString in globalVertexFaceExpression.findall(objText):
+		splitLine = wordsString.split()
 		if firstWord == 'v':
-			triangleMesh.vertexes.append( getVertexGivenLine(line) )
-		elif firstWord == 'f':
-			triangleMesh.faces.append( getFaceGivenLine( line, triangleMesh ) )
+			vertexes.append(Vector3(float(splitLine[0]), float(splitLine[1]), float(splitLine[2])))
+			continue
+		if '/' in wordsString:
+			splitLine = [word.split('/', 1)[0] for word in splitLine]
+		vertexIndexes = map(int, splitLine)
+		if min(vertexIndexes) < 0:
+			vertexIndexes = getAbsoluteVertexIndexes(len(vertexes), vertexIndexes)
+		firstVertexIndex = vertexIndexes[0] - 1
+		previousVertexIndex = vertexIndexes[1] - 1
+		for vertexIndex in vertexIndexes[2 :]:
+			vertexIndex -= 1
+			fanFace = face.Face()
+			fanFace.index = len(faces)
+			fanFace.vertexIndexes = [firstVertexIndex, previousVertexIndex, vertexIndex]
+			faces.append(fanFace)
+			previousVertexIndex = vertexIndex
+
+def getAbsoluteVertexIndexes(numberOfVertexes, vertexIndexes):
+	"Get the vertex indexes starting from one, with the negative indexes counted back from the last vertex."
+	absoluteVertexIndexes = []
+	for vertexIndex in vertexIndexes:
+		if vertexIndex < 0:
+			vertexIndex += numberOfVertexes + 1
+		absoluteVertexIndexes.append(vertexIndex)
+	return absoluteVertexIndexes
 
 def getCarving(fileName=''):
 	"Get the triangle mesh for the obj file."
@@ -56,23 +80,5 @@ def getCarving(fileName=''):
 	if objText == '':
 		return None
 	triangleMesh = triangle_mesh.TriangleMesh()
-	addFacesGivenText(objText, triangleMesh)
+	triangle_mesh.getReturnWithoutGarbageCollection(addFacesGivenText, objText, triangleMesh)
 	return triangleMesh
-
-def getFaceGivenLine( line, triangleMesh ):
-	"Add face given line index and lines."
-	faceGivenLine = face.Face()
-	faceGivenLine.index = len( triangleMesh.faces )
-	splitLine = line.split()
-	for vertexStringIndex in xrange( 1, 4 ):
-		vertexString = splitLine[ vertexStringIndex ]
-		vertexStringWithSpaces = vertexString.replace('/', ' ')
-		vertexStringSplit = vertexStringWithSpaces.split()
-		vertexIndex = int( vertexStringSplit[0] ) - 1
-		faceGivenLine.vertexIndexes.append(vertexIndex)
-	return faceGivenLine
-
-def getVertexGivenLine(line):
-	"Get vertex given obj vertex line."
-	splitLine = line.split()
-	return Vector3( float(splitLine[1]), float( splitLine[2] ), float( splitLine[3] ) )
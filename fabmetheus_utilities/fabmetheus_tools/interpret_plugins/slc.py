@@ -6,6 +6,10 @@ An import plugin is a script in the interpret_plugins folder which has the funct
 
 The getCarving function takes the file name of an slc file and returns the carving.
 
+The file is read at once and the contours of each layer are indexed, then the contour points of a layer are decoded as an array of floats when carve takes the layer range.  So when the 'Print from Layer No' and 'Print up to Layer No' settings of carve leave out layers, the contours of those layers are never decoded.
+
+The x and y corners of the carving are taken from the -EXTENTS keyword of the slc header.  When the header does not have the extents, the corners are found from the minimum and maximum of the contour floats of every layer, which are read without making the loops.
+
 """
 
 
@@ -14,10 +18,11 @@ from __future__ import absolute_import
 import __init__
 
 from fabmetheus_utilities.vector3 import Vector3
-from fabmetheus_utilities import euclidean
-from fabmetheus_utilities import gcodec
+from fabmetheus_utilities import archive
 from fabmetheus_utilities import svg_writer
-from struct import unpack
+from fabmetheus_utilities import xml_simple_writer
+from struct import unpack_from
+import array
 import math
 import sys
 
@@ -34,37 +39,54 @@ def getCarving(fileName=''):
 	carving.readFile(fileName)
 	return carving
 
-def getLittleEndianFloatGivenFile( file ):
-	"Get little endian float given a file."
-	return unpack('<f', file.read(4) )[0]
-
-def getLittleEndianUnsignedLongGivenFile( file ):
-	"Get little endian float given a file."
-	return unpack('<L', file.read(4) )[0]
-
-def getPointsFromFile( numPoints, file ):
-	"Process the vertice points for a given boundary."
-	points = []
-	for pointIndex in xrange( numPoints ):
-		x = getLittleEndianFloatGivenFile( file )
-		y = getLittleEndianFloatGivenFile( file )
-		points.append( complex(x, y) )
-	return points
-
-def readHeader( file ):
-	"Read the slc header."
-	while ord( file.read( 1 ) ) != 0x1A:
-		pass
+def getExtentsFromHeader(data):
+	"Get the minimum x, maximum x, minimum y and maximum y from the -EXTENTS keyword of the slc header, or None if the header does not have them."
+	header = data[: data.find('\x1a')]
+	keywordIndex = header.find('-EXTENTS')
+	if keywordIndex < 0:
+		return None
+	words = header[keywordIndex + len('-EXTENTS') :].replace(',', ' ').split()
+	if len(words) < 4:
+		return None
+	try:
+		return [float(word) for word in words[: 4]]
+	except ValueError:
+		return None
+
+def getFloatArray(data, byteIndex, numberOfFloats):
+	"Get the array of the little endian floats in the data starting at the byte index."
+	floatArray = array.array('f')
+	floatArray.fromstring(data[byteIndex : byteIndex + 4 * numberOfFloats])
+	if sys.byteorder == 'big':
+		floatArray.byteswap()
+	return floatArray
+
+def getLittleEndianFloatGivenData(data, byteIndex):
+	"Get little endian float given the data and the byte index."
+	return unpack_from('<f', data, byteIndex)[0]
+
+def getLittleEndianUnsignedLongGivenData(data, byteIndex):
+	"Get little endian unsigned long given the data and the byte index."
+	return unpack_from('<L', data, byteIndex)[0]
+
+def getLoopsFromContourSpans(contourSpans, data):
+	"Get the loops from the byte index and number of points of each contour."
+	loops = []
+	for byteIndex, numPoints in contourSpans:
+		floatArray = getFloatArray(data, byteIndex, numPoints + numPoints)
+		loops.append(map(complex, floatArray[0 : : 2], floatArray[1 : : 2]))
+	return loops
+
+def getStartIndexAfterHeader(data):
+	"Get the byte index after the slc header, which ends with the 0x1A byte."
+	return data.find('\x1a') + 1
 
 
 class SampleTableEntry:
 	"Sample table entry."
-	def __init__( self, file ):
-		"Read in the sampling table section. It contains a table length (byte) and the table entries."
-		self.min_z_level = getLittleEndianFloatGivenFile( file )
-		self.layer_thickness = getLittleEndianFloatGivenFile( file )
-		self.beam_comp = getLittleEndianFloatGivenFile( file )
-		getLittleEndianFloatGivenFile( file )
+	def __init__(self, data, byteIndex):
+		"Read in the sampling table entry at the byte index."
+		self.min_z_level, self.layer_thickness, self.beam_comp, reserved = unpack_from('<4f', data, byteIndex)
 
 	def __repr__(self):
 		"Get the string representation of this sample table entry."
@@ -86,6 +108,7 @@ class SLCCarving:
 
 	def addXML(self, depth, output):
 		"Add xml for this object."
+		self.setLoops()
 		xml_simple_writer.addXMLFromObjects(depth, self.loopLayers, output)
 
 	def getCarveBoundaryLayers(self):
@@ -104,6 +127,7 @@ class SLCCarving:
 		"Get the carved svg text."
 		if len(self.loopLayers) < 1:
 			return ''
+		self.setLoops()
 		decimalPlaces = max(0, 2 - int(math.floor(math.log10(self.layerHeight))))
 		self.svgWriter = svg_writer.SVGWriter(True, self.cornerMaximum, self.cornerMinimum, decimalPlaces, self.layerHeight)
 		return self.svgWriter.getReplacedSVGTemplate(self.fileName, self.loopLayers, 'basic')
@@ -120,51 +144,59 @@ class SLCCarving:
 		"Return the suffix for a carving."
 		return 'svg'
 
-	def processContourLayers( self, file ):
-		"Process a contour layer at a time until the top of the part."
-		while True:
-			minLayer = getLittleEndianFloatGivenFile( file )
-			numContours = getLittleEndianUnsignedLongGivenFile( file )
+	def processContourLayers(self, data, byteIndex):
+		"Index the contours of each layer until the top of the part, the contour points are decoded when the loops of a layer are set."
+		while byteIndex + 8 <= len(data):
+			minLayer = getLittleEndianFloatGivenData(data, byteIndex)
+			numContours = getLittleEndianUnsignedLongGivenData(data, byteIndex + 4)
+			byteIndex += 8
 			if numContours == 0xFFFFFFFF:
 				return
-			loopLayer = euclidean.LoopLayer( minLayer )
-			self.loopLayers.append( loopLayer )
+			contourSpans = []
 			for contourIndex in xrange( numContours ):
-				numPoints = getLittleEndianUnsignedLongGivenFile( file )
-				numGaps = getLittleEndianUnsignedLongGivenFile( file )
+				numPoints = getLittleEndianUnsignedLongGivenData(data, byteIndex)
+				byteIndex += 8
 				if numPoints > 2:
-					loopLayer.loops.append( getPointsFromFile( numPoints, file ) )
+					contourSpans.append((byteIndex, numPoints))
+				byteIndex += 8 * numPoints
+			self.loopLayers.append(SLCLoopLayer(contourSpans, data, minLayer))
 
 	def readFile( self, fileName ):
 		"Read SLC and store the layers."
 		self.fileName = fileName
-		pslcfile = open( fileName, 'rb')
-		readHeader( pslcfile )
-		pslcfile.read( 256 ) #Go past the 256 byte 3D Reserved Section.
-		self.readTableEntry( pslcfile )
-		self.processContourLayers( pslcfile )
-		pslcfile.close()
+		data = archive.getFileText(fileName, True, 'rb')
+		if data == '':
+			return
+		byteIndex = getStartIndexAfterHeader(data) + 256 #Go past the 256 byte 3D Reserved Section.
+		byteIndex = self.readTableEntry(data, byteIndex)
+		self.processContourLayers(data, byteIndex)
+		if len(self.loopLayers) > 0:
+			self.maximumZ = self.loopLayers[-1].z
+			self.minimumZ = self.loopLayers[0].z
 		self.cornerMaximum = Vector3(-987654321.0, -987654321.0, self.maximumZ)
 		self.cornerMinimum = Vector3(987654321.0, 987654321.0, self.minimumZ)
-		for loopLayer in self.loopLayers:
-			for loop in loopLayer.loops:
-				for point in loop:
-					pointVector3 = Vector3(point.real, point.imag, loopLayer.z)
-					self.cornerMaximum.maximize(pointVector3)
-					self.cornerMinimum.minimize(pointVector3)
+		extents = getExtentsFromHeader(data)
+		if extents == None:
+			self.setCornersByContours(data)
+		elif len(self.loopLayers) > 0:
+			self.cornerMaximum = Vector3(extents[1], extents[3], self.maximumZ)
+			self.cornerMinimum = Vector3(extents[0], extents[2], self.minimumZ)
 		halfLayerThickness = 0.5 * self.layerHeight
 		self.cornerMaximum.z += halfLayerThickness
 		self.cornerMinimum.z -= halfLayerThickness
 
-	def readTableEntry( self, file ):
-		"Read in the sampling table section. It contains a table length (byte) and the table entries."
-		tableEntrySize = ord( file.read( 1 ) )
+	def readTableEntry(self, data, byteIndex):
+		"Read in the sampling table section. It contains a table length (byte) and the table entries, return the byte index after the table."
+		tableEntrySize = ord(data[byteIndex])
 		if tableEntrySize == 0:
 			print("Sampling table size is zero!")
 			exit()
+		byteIndex += 1
 		for index in xrange( tableEntrySize ):
-			sampleTableEntry = SampleTableEntry( file )
-			self.layerHeight = sampleTableEntry.layerHeight
+			sampleTableEntry = SampleTableEntry(data, byteIndex)
+			self.layerHeight = sampleTableEntry.layer_thickness
+			byteIndex += 16
+		return byteIndex
 
 	def setCarveImportRadius( self, importRadius ):
 		"Set the import radius."
@@ -178,6 +210,39 @@ class SLCCarving:
 		"Set the layer height."
 		pass
 
+	def setCornersByContours(self, data):
+		"Set the x and y corners from the minimum and maximum of the contour floats of every layer."
+		for loopLayer in self.loopLayers:
+			for byteIndex, numPoints in loopLayer.contourSpans:
+				floatArray = getFloatArray(data, byteIndex, numPoints + numPoints)
+				xArray = floatArray[0 : : 2]
+				yArray = floatArray[1 : : 2]
+				self.cornerMaximum.maximize(Vector3(max(xArray), max(yArray), loopLayer.z))
+				self.cornerMinimum.minimize(Vector3(min(xArray), min(yArray), loopLayer.z))
+
+	def setLoops(self):
+		"Set the loops of every layer."
+		for loopLayer in self.loopLayers:
+			loopLayer.setLoops()
+
+
+class SLCLoopLayer:
+	"A loop layer of an slc file, the loops are decoded from the file data when they are set, so only the layers which are printed are decoded."
+	def __init__(self, contourSpans, data, z):
+		"Initialize."
+		self.contourSpans = contourSpans
+		self.data = data
+		self.loops = []
+		self.z = z
+
+	def __repr__(self):
+		"Get the string representation of this loop layer."
+		return '%s, %s' % (self.z, self.loops)
+
+	def setLoops(self):
+		"Set the loops by decoding the contours from the file data."
+		self.loops = getLoopsFromContourSpans(self.contourSpans, self.data)
+
 
 def main():
 	"Display the inset dialog."
@@ -0,0 +1,207 @@
+"""
+Gcode index is a collection of utilities to build, read and write the layer index of a gcode file.
+
+The layer index is a tab separated sidecar file with the gcode file name plus the '.layers' extension.  For each layer it holds the byte offset of the first line of the layer, the z, the number of moves and the bounding box of the moves.  The layers start at the '(<layer>' lines if there are any, otherwise at each change of z, in which case a hop also starts a layer.  The file size and modification time of the gcode file are saved in the sidecar, so that when the gcode file changes the index is built again.
+
+With the index, the text of a layer range is read from a memory map of the gcode file, so inspecting layer 900 does not require parsing the first 899 layers.
+
+"""
+
+from __future__ import absolute_import
+#Init has to be imported first because it has code to workaround the python bug where relative imports don't work if the module is imported as a main module.
+import __init__
+
+from fabmetheus_utilities import archive
+from fabmetheus_utilities import euclidean
+import cStringIO
+import mmap
+import os
+
+
+__author__ = 'agent (agent@local)'
+__date__ = '$Date: 2026/18/10 $'
+__license__ = 'GNU Affero General Public License http://www.gnu.org/licenses/agpl.html'
+
+
+globalIndexExtension = '.layers'
+globalIndexSeparator = '\t'
+
+
+def getIndexFileName(fileName):
+	'Get the file name of the layer index sidecar of the gcode file.'
+	return fileName + globalIndexExtension
+
+def getLayerIndex(fileName):
+	'Get the layer index of the gcode file, read from the sidecar if it is up to date, otherwise built and written.'
+	layerIndex = GcodeLayerIndex().getFromIndexFile(fileName)
+	if layerIndex.isUpToDate():
+		return layerIndex
+	layerIndex = GcodeLayerIndex().getFromGcodeFile(fileName)
+	writeLayerIndex(fileName, layerIndex)
+	return layerIndex
+
+def getLayersText(fileName, layerBegin, layerEnd):
+	'Get the text before the first layer, followed by the text of the layers from layerBegin up to but not including layerEnd.'
+	return getLayerIndex(fileName).getLayersText(layerBegin, layerEnd)
+
+def writeLayerIndex(fileName, layerIndex=None):
+	'Write the layer index sidecar of the gcode file.'
+	if layerIndex == None:
+		layerIndex = GcodeLayerIndex().getFromGcodeFile(fileName)
+	archive.writeFileText(getIndexFileName(fileName), layerIndex.getIndexText())
+
+
+class GcodeLayer:
+	'A class to hold the offset, z, move count and bounding box of a gcode layer.'
+	def __init__(self, offset, z):
+		'Initialize.'
+		self.cornerMaximum = complex(-987654321.0, -987654321.0)
+		self.cornerMinimum = complex(987654321.0, 987654321.0)
+		self.moveCount = 0
+		self.offset = offset
+		self.z = z
+
+	def __repr__(self):
+		'Get the string representation of this layer.'
+		return '%s, %s, %s, %s, %s' % (self.offset, self.z, self.moveCount, self.cornerMinimum, self.cornerMaximum)
+
+	def addLocation(self, locationComplex):
+		'Add a move location to the layer.'
+		self.cornerMaximum = euclidean.getMaximum(self.cornerMaximum, locationComplex)
+		self.cornerMinimum = euclidean.getMinimum(self.cornerMinimum, locationComplex)
+		self.moveCount += 1
+
+	def getIndexLine(self):
+		'Get the tab separated index line of the layer.'
+		words = [self.offset, self.z, self.moveCount, self.cornerMinimum.real, self.cornerMinimum.imag, self.cornerMaximum.real, self.cornerMaximum.imag]
+		return globalIndexSeparator.join([str(word) for word in words])
+
+	def setFromIndexLine(self, splitLine):
+		'Set the move count and bounding box from the split index line.'
+		self.moveCount = int(splitLine[2])
+		self.cornerMinimum = complex(float(splitLine[3]), float(splitLine[4]))
+		self.cornerMaximum = complex(float(splitLine[5]), float(splitLine[6]))
+
+
+class GcodeLayerIndex:
+	'A class to build and read the layer index of a gcode file.'
+	def __init__(self):
+		'Initialize.'
+		self.fileModified = None
+		self.fileName = ''
+		self.fileSize = None
+		self.layers = []
+
+	def __repr__(self):
+		'Get the string representation of this layer index.'
+		return '%s, %s, %s\n%s' % (self.fileName, self.fileSize, self.fileModified, self.layers)
+
+	def getFromGcodeFile(self, fileName):
+		'Build the layer index by parsing the gcode file once.'
+		self.fileName = fileName
+		if not os.path.isfile(fileName):
+			print('The file ' + fileName + ' does not exist.')
+			return self
+		self.setFileSizeModified()
+		gcodeFile = open(fileName, 'rb')
+		hasLayerTags = False
+		layer = None
+		offset = 0
+		oldLocation = [0.0, 0.0, None]
+		for line in gcodeFile:
+			splitLine = line.split()
+			if len(splitLine) > 0:
+				firstWord = splitLine[0]
+				if firstWord == '(<layer>':
+					hasLayerTags = True
+					layer = GcodeLayer(offset, float(splitLine[1]))
+					self.layers.append(layer)
+				elif firstWord == 'G1' or firstWord == 'G0':
+					location = self.getLocation(oldLocation, splitLine)
+					if not hasLayerTags and location[2] != oldLocation[2]:
+						layer = GcodeLayer(offset, location[2])
+						self.layers.append(layer)
+					if layer != None and (location[0] != oldLocation[0] or location[1] != oldLocation[1]):
+						layer.addLocation(complex(location[0], location[1]))
+					oldLocation = location
+			offset += len(line)
+		gcodeFile.close()
+		return self
+
+	def getFromIndexFile(self, fileName):
+		'Read the layer index from the sidecar file.'
+		self.fileName = fileName
+		indexText = archive.getFileText(getIndexFileName(fileName), False)
+		for line in archive.getTextLines(indexText):
+			splitLine = line.split(globalIndexSeparator)
+			if len(splitLine) > 1:
+				if splitLine[0] == '_fileSize':
+					self.fileSize = int(splitLine[1])
+				elif splitLine[0] == '_fileModified':
+					self.fileModified = float(splitLine[1])
+				elif len(splitLine) > 6 and splitLine[0].isdigit():
+					layer = GcodeLayer(int(splitLine[0]), float(splitLine[1]))
+					layer.setFromIndexLine(splitLine)
+					self.layers.append(layer)
+		return self
+
+	def getIndexText(self):
+		'Get the tab separated text of the layer index.'
+		output = cStringIO.StringIO()
+		output.write('Format is tab separated layer index.\n')
+		output.write('_fileSize%s%s\n' % (globalIndexSeparator, self.fileSize))
+		output.write('_fileModified%s%r\n' % (globalIndexSeparator, self.fileModified))
+		output.write(globalIndexSeparator.join(['_Offset', 'Z', 'Move Count', 'Minimum X', 'Minimum Y', 'Maximum X', 'Maximum Y']) + '\n')
+		for layer in self.layers:
+			output.write(layer.getIndexLine() + '\n')
+		return output.getvalue()
+
+	def getLayerOffsetEnd(self, layerIndex):
+		'Get the byte offset after the end of the layer.'
+		if layerIndex + 1 < len(self.layers):
+			return self.layers[layerIndex + 1].offset
+		return self.fileSize
+
+	def getLayersText(self, layerBegin, layerEnd):
+		'Get the text before the first layer, followed by the text of the layers from layerBegin up to but not including layerEnd.'
+		if self.fileSize == None or self.fileSize == 0:
+			return ''
+		layerBegin = max(0, layerBegin)
+		layerEnd = min(layerEnd, len(self.layers))
+		gcodeFile = open(self.fileName, 'rb')
+		gcodeMap = mmap.mmap(gcodeFile.fileno(), 0, access=mmap.ACCESS_READ)
+		headerEnd = self.fileSize
+		if len(self.layers) > 0:
+			headerEnd = self.layers[0].offset
+		layersText = gcodeMap[: headerEnd]
+		if layerBegin < layerEnd:
+			layersText += gcodeMap[self.layers[layerBegin].offset : self.getLayerOffsetEnd(layerEnd - 1)]
+		gcodeMap.close()
+		gcodeFile.close()
+		return layersText
+
+	def getLocation(self, oldLocation, splitLine):
+		'Get the x, y, z location list from the split line.'
+		location = oldLocation[:]
+		for word in splitLine[1 :]:
+			firstLetter = word[0]
+			if firstLetter == 'X':
+				location[0] = float(word[1 :])
+			elif firstLetter == 'Y':
+				location[1] = float(word[1 :])
+			elif firstLetter == 'Z':
+				location[2] = float(word[1 :])
+			elif firstLetter == '(' or firstLetter == ';':
+				return location
+		return location
+
+	def isUpToDate(self):
+		'Determine if the layer index matches the size and modification time of the gcode file.'
+		if self.fileSize == None or not os.path.isfile(self.fileName):
+			return False
+		return self.fileSize == os.path.getsize(self.fileName) and self.fileModified == os.path.getmtime(self.fileName)
+
+	def setFileSizeModified(self):
+		'Set the file size and modification time from the gcode file.'
+		self.fileModified = os.path.getmtime(self.fileName)
+		self.fileSize = os.path.getsize(self.fileName)
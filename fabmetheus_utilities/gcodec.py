@@ -23,6 +23,7 @@ import __init__
 from fabmetheus_utilities.vector3 import Vector3
 from fabmetheus_utilities import archive
 from fabmetheus_utilities import euclidean
+from fabmetheus_utilities import skein_binary
 import cStringIO
 import math
 import os
@@ -117,13 +118,21 @@ def getFirstWordIndexReverse(firstWord, lines, startIndex):
 	return -1
 
 def getGcodeFileText(fileName, gcodeText):
-	'Get the gcode text from a file if it the gcode text is empty and if the file is a gcode file.'
+	'Get the gcode text from a file if it the gcode text is empty and if the file is a gcode or skein binary file.'
 	if gcodeText != '':
 		return gcodeText
 	if fileName.endswith('.gcode'):
 		return archive.getFileText(fileName)
+	if skein_binary.isSkeinBinaryFileName(fileName):
+		return skein_binary.getGcodeTextFromFile(fileName)
 	return ''
 
+def getGcodeOrBinaryFileText(fileName):
+	'Get the gcode text from a skein binary file or the entire text from any other file.'
+	if skein_binary.isSkeinBinaryFileName(fileName):
+		return skein_binary.getGcodeTextFromFile(fileName)
+	return archive.getFileText(fileName)
+
 def getGcodeWithoutDuplication(duplicateWord, gcodeText):
 	'Get gcode text without duplicate first words.'
 	lines = archive.getTextLines(gcodeText)
@@ -167,6 +176,20 @@ def getLocationFromSplitLine(oldLocation, splitLine):
 		getDoubleFromCharacterSplitLineValue('Y', splitLine, oldLocation.y),
 		getDoubleFromCharacterSplitLineValue('Z', splitLine, oldLocation.z))
 
+def getMoveTime(acceleration, distance, entrySpeed, exitSpeed, feedRateSecond):
+	'Get the time of a move with a trapezoidal speed profile, or the distance over the feed rate if the acceleration is not positive.'
+	if distance <= 0.0 or feedRateSecond <= 0.0:
+		return 0.0
+	if acceleration <= 0.0:
+		return distance / feedRateSecond
+	peakSpeed = min(feedRateSecond, math.sqrt(acceleration * distance + 0.5 * (entrySpeed * entrySpeed + exitSpeed * exitSpeed)))
+	entrySpeed = min(entrySpeed, peakSpeed)
+	exitSpeed = min(exitSpeed, peakSpeed)
+	accelerationDistance = (peakSpeed * peakSpeed - entrySpeed * entrySpeed) / (acceleration + acceleration)
+	decelerationDistance = (peakSpeed * peakSpeed - exitSpeed * exitSpeed) / (acceleration + acceleration)
+	cruiseDistance = max(0.0, distance - accelerationDistance - decelerationDistance)
+	return (peakSpeed + peakSpeed - entrySpeed - exitSpeed) / acceleration + cruiseDistance / peakSpeed
+
 def getRotationBySplitLine(splitLine):
 	'Get the complex rotation from the split gcode line.'
 	return complex(splitLine[1].replace('(', '').replace(')', ''))
@@ -440,3 +463,224 @@ class DistanceFeedRate:
 		'Parse gcode split line and store the parameters.'
 		if firstWord == '(<decimalPlacesCarried>':
 			self.decimalPlacesCarried = int(splitLine[1])
+
+
+class LayerSummaries:
+	'A class to summarize the time, active time, bridge flag and bounding box of each layer of gcode lines in one pass.'
+	def __init__(self, lines, acceleration=0.0, feedRateMinute=960.0):
+		'Parse the lines once and build the layer summaries.'
+		self.acceleration = acceleration
+		self.layerSummaries = []
+		self.layerSummaryTable = {}
+		self.oldDirection = None
+		self.oldEntrySpeed = 0.0
+		self.oldMove = None
+		isExtruderActive = False
+		layerSummary = None
+		oldLocation = None
+		for lineIndex, line in enumerate(lines):
+			splitLine = getSplitLineBeforeBracketSemicolon(line)
+			firstWord = getFirstWord(splitLine)
+			if firstWord == 'G1':
+				location = getLocationFromSplitLine(oldLocation, splitLine)
+				feedRateMinute = getFeedRateMinute(feedRateMinute, splitLine)
+				if oldLocation != None:
+					self.addMove(feedRateMinute / 60.0, isExtruderActive, layerSummary, location - oldLocation)
+				if layerSummary != None and isExtruderActive:
+					layerSummary.addLocation(location.dropAxis())
+				oldLocation = location
+			elif firstWord == 'M101':
+				isExtruderActive = True
+			elif firstWord == 'M103':
+				isExtruderActive = False
+			elif firstWord == '(<bridgeRotation>':
+				if layerSummary != None:
+					layerSummary.isBridge = True
+			elif firstWord == '(<layer>':
+				layerSummary = LayerSummary(lineIndex, float(splitLine[1]))
+				self.layerSummaries.append(layerSummary)
+				self.layerSummaryTable[lineIndex] = layerSummary
+			elif firstWord == '(</layer>)':
+				layerSummary = None
+		self.addOldMove(0.0)
+
+	def __repr__(self):
+		'Get the string representation of the layer summaries.'
+		return str(self.layerSummaries)
+
+	def addMove(self, feedRateSecond, isExtruderActive, layerSummary, segment):
+		'Add the time of the old move, now that its exit speed is known, and hold the move as the old move.'
+		distance = abs(segment)
+		if distance <= 0.0:
+			return
+		direction = segment / distance
+		junctionSpeed = 0.0
+		if self.oldMove != None:
+			cosine = self.oldDirection.dot(direction)
+			junctionSpeed = min(feedRateSecond, self.oldMove[1]) * max(0.0, cosine)
+		self.addOldMove(junctionSpeed)
+		self.oldDirection = direction
+		self.oldMove = (distance, feedRateSecond, isExtruderActive, layerSummary)
+
+	def addOldMove(self, exitSpeed):
+		'Add the time of the old move to its layer summary.'
+		if self.oldMove == None:
+			return
+		distance, feedRateSecond, isExtruderActive, layerSummary = self.oldMove
+		moveTime = getMoveTime(self.acceleration, distance, self.oldEntrySpeed, exitSpeed, feedRateSecond)
+		if layerSummary != None:
+			layerSummary.time += moveTime
+			if isExtruderActive:
+				layerSummary.activeTime += moveTime
+		self.oldEntrySpeed = exitSpeed
+
+	def getLayerSummary(self, lineIndex):
+		'Get the summary of the layer which begins at the line index, or None if there is not a layer there.'
+		if lineIndex in self.layerSummaryTable:
+			return self.layerSummaryTable[lineIndex]
+		return None
+
+
+class LayerSummary:
+	'A class to hold the time, active time, bridge flag and bounding box of a layer.'
+	def __init__(self, lineIndex, z):
+		'Initialize.'
+		self.activeTime = 0.0
+		self.cornerMaximum = complex(-987654321.0, -987654321.0)
+		self.cornerMinimum = complex(987654321.0, 987654321.0)
+		self.isBridge = False
+		self.lineIndex = lineIndex
+		self.time = 0.0
+		self.z = z
+
+	def __repr__(self):
+		'Get the string representation of this layer summary.'
+		return '%s, %s, %s, %s, %s' % (self.lineIndex, self.z, self.time, self.activeTime, self.isBridge)
+
+	def addLocation(self, locationComplex):
+		'Add an extruding location to the bounding box.'
+		self.cornerMaximum = euclidean.getMaximum(self.cornerMaximum, locationComplex)
+		self.cornerMinimum = euclidean.getMinimum(self.cornerMinimum, locationComplex)
+
+	def getBoundingLoop(self):
+		'Get the bounding box of the extruding locations as a loop, or an empty list if the extruder was not active on the layer.'
+		if self.cornerMinimum.real > self.cornerMaximum.real:
+			return []
+		return euclidean.getSquareLoopWiddershins(self.cornerMinimum, self.cornerMaximum)
+
+
+class ThreadIndex:
+	'A class to index the locations, path lengths and extruder commands of gcode lines in one pass, so that looking ahead or back along the threads does not parse the lines again.'
+	def __init__(self, lines):
+		'Parse the lines once and build the index.'
+		self.cumulativeDistances = []
+		self.isExtruderActives = []
+		self.locations = []
+		self.moveCounts = []
+		self.nextActiveMoveIndexes = []
+		self.nextExtruderOffIndexes = []
+		self.nextExtruderOnIndexes = []
+		self.nextMoveIndexes = []
+		self.previousExtruderOnIndexes = []
+		self.previousMoveIndexes = []
+		self.threadIndexes = []
+		cumulativeDistance = 0.0
+		firstWords = []
+		isExtruderActive = False
+		location = None
+		moveCount = 0
+		previousExtruderOnIndex = None
+		previousMoveIndex = None
+		threadIndex = -1
+		for lineIndex, line in enumerate(lines):
+			splitLine = getSplitLineBeforeBracketSemicolon(line)
+			firstWord = getFirstWord(splitLine)
+			firstWords.append(firstWord)
+			if firstWord == 'G1':
+				oldLocation = location
+				location = getLocationFromSplitLine(oldLocation, splitLine)
+				if oldLocation != None:
+					cumulativeDistance += location.distance(oldLocation)
+				moveCount += 1
+				previousMoveIndex = lineIndex
+			elif firstWord == 'M101':
+				isExtruderActive = True
+				previousExtruderOnIndex = lineIndex
+				threadIndex += 1
+			elif firstWord == 'M103':
+				isExtruderActive = False
+			self.cumulativeDistances.append(cumulativeDistance)
+			self.isExtruderActives.append(isExtruderActive)
+			self.locations.append(location)
+			self.moveCounts.append(moveCount)
+			self.previousExtruderOnIndexes.append(previousExtruderOnIndex)
+			self.previousMoveIndexes.append(previousMoveIndex)
+			self.threadIndexes.append(threadIndex)
+		nextActiveMoveIndex = None
+		nextExtruderOffIndex = None
+		nextExtruderOnIndex = None
+		nextMoveIndex = None
+		for lineIndex in xrange(len(firstWords) - 1, -1, -1):
+			firstWord = firstWords[lineIndex]
+			if firstWord == 'G1':
+				nextMoveIndex = lineIndex
+				if lineIndex > 0 and self.isExtruderActives[lineIndex - 1]:
+					nextActiveMoveIndex = lineIndex
+			elif firstWord == 'M101':
+				nextExtruderOnIndex = lineIndex
+			elif firstWord == 'M103':
+				nextExtruderOffIndex = lineIndex
+			self.nextActiveMoveIndexes.append(nextActiveMoveIndex)
+			self.nextExtruderOffIndexes.append(nextExtruderOffIndex)
+			self.nextExtruderOnIndexes.append(nextExtruderOnIndex)
+			self.nextMoveIndexes.append(nextMoveIndex)
+		self.nextActiveMoveIndexes.reverse()
+		self.nextExtruderOffIndexes.reverse()
+		self.nextExtruderOnIndexes.reverse()
+		self.nextMoveIndexes.reverse()
+
+	def __repr__(self):
+		'Get the string representation of this thread index.'
+		return '%s lines, %s moves, %s threads' % (len(self.locations), self.getMoveCount(0, len(self.locations) - 1), self.getThreadCount())
+
+	def getDistance(self, beginIndex, location, endIndex):
+		'Get the path length of the moves after beginIndex up to and including endIndex, starting from the location.'
+		firstMoveIndex = self.getNextIndex(self.nextMoveIndexes, beginIndex + 1)
+		if firstMoveIndex == None or firstMoveIndex > endIndex:
+			return 0.0
+		firstMoveDistance = 0.0
+		if location != None:
+			firstMoveDistance = location.distance(self.locations[firstMoveIndex])
+		return firstMoveDistance + self.cumulativeDistances[endIndex] - self.cumulativeDistances[firstMoveIndex]
+
+	def getLocation(self, beginIndex, location, endIndex):
+		'Get the location after endIndex, which is the location if there are no moves after beginIndex up to and including endIndex.'
+		if self.getMoveCount(beginIndex, endIndex) == 0:
+			return location
+		return self.locations[endIndex]
+
+	def getMoveCount(self, beginIndex, endIndex):
+		'Get the number of moves after beginIndex up to and including endIndex.'
+		if endIndex <= beginIndex:
+			return 0
+		if beginIndex < 0:
+			return self.moveCounts[endIndex]
+		return self.moveCounts[endIndex] - self.moveCounts[beginIndex]
+
+	def getNextIndex(self, nextIndexes, lineIndex):
+		'Get the next index at or after the line index, or None if there is none.'
+		if lineIndex < 0 or lineIndex >= len(nextIndexes):
+			return None
+		return nextIndexes[lineIndex]
+
+	def getPreviousIndex(self, previousIndexes, lineIndex):
+		'Get the previous index at or before the line index, or None if there is none.'
+		if lineIndex < 0 or lineIndex >= len(previousIndexes):
+			return None
+		return previousIndexes[lineIndex]
+
+	def getThreadCount(self):
+		'Get the number of extruder on commands.'
+		if len(self.threadIndexes) == 0:
+			return 0
+		return self.threadIndexes[-1] + 1
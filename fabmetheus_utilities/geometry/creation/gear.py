@@ -6,6 +6,8 @@ A helix pattern can be added to each gear type.  All the gear types have a clear
 
 The couple has a pinion gear and a complement.
 
+The gear geometry is cached by the evaluated gear attributes and the settings it depends on, so identical gears, like the copies made by an array, are only generated once.
+
 ==Examples==
 The link text includes the distinguishing parameters.  Each svg page was generated from an xml page of the same root name using carve.  For example, gear.svg was generated by clicking 'Carve' on the carve tool panel and choosing gear.xml in the file chooser.
 
@@ -426,6 +428,12 @@ __date__ = '$Date: 2008/02/05 $'
 __license__ = 'GNU Affero General Public License http://www.gnu.org/licenses/agpl.html'
 
 
+globalGeometryOutputDictionary = {}
+globalMaximumNumberOfCachedGears = 20
+globalUnkeyedAttributeNames = set('_arrayIndex _arrayPoint id name tags visible'.split())
+globalUnkeyedAttributePrefixes = ('matrix.', 'rotate.', 'scale.', 'translate.')
+
+
 def addBevelGear(derivation, extrudeDerivation, pitchRadius, positives, teeth, vector3GearProfile):
 	"Get extrude output for a cylinder gear."
 	totalPitchRadius = derivation.pitchRadiusComplement + derivation.pitchRadius
@@ -623,9 +631,24 @@ def getGearProfileRack(derivation, toothProfile):
 	return gearProfile
 
 def getGeometryOutput(derivation, elementNode):
-	"Get vector3 vertexes from attribute dictionary."
-	if derivation == None:
-		derivation = GearDerivation(elementNode)
+	"Get vector3 vertexes from attribute dictionary, the geometry of an identical gear is copied from the cache."
+	if derivation != None:
+		return getGeometryOutputByDerivation(derivation, elementNode)
+	geometryOutputKey = getGeometryOutputKey(elementNode)
+	if geometryOutputKey == None:
+		return getGeometryOutputByDerivation(GearDerivation(elementNode), elementNode)
+	if geometryOutputKey not in globalGeometryOutputDictionary:
+		if len(globalGeometryOutputDictionary) >= globalMaximumNumberOfCachedGears:
+			globalGeometryOutputDictionary.clear()
+		globalGeometryOutputDictionary[geometryOutputKey] = getGeometryOutputByDerivation(GearDerivation(elementNode), elementNode)
+	return triangle_mesh.getGeometryOutputCopy(globalGeometryOutputDictionary[geometryOutputKey])
+
+def getGeometryOutputByArguments(arguments, elementNode):
+	"Get vector3 vertexes from attribute dictionary by arguments."
+	return getGeometryOutput(None, elementNode)
+
+def getGeometryOutputByDerivation(derivation, elementNode):
+	"Get vector3 vertexes from the gear derivation."
 	creationFirst = derivation.creationType.lower()[: 1]
 	toothProfileComplement = getToothProfile(derivation, derivation.pitchRadiusComplement, derivation.teethComplement)
 	pinionProfile = getGearProfileCylinder(derivation.teethPinion, derivation.pinionToothProfile)
@@ -680,14 +703,49 @@ def getGeometryOutput(derivation, elementNode):
 		euclidean.translateVector3Path(gearVertexes, translation)
 	return {'group' : {'shapes' : [extrudeOutputPinion, extrudeOutputSecond]}}
 
-def getGeometryOutputByArguments(arguments, elementNode):
-	"Get vector3 vertexes from attribute dictionary by arguments."
-	return getGeometryOutput(None, elementNode)
+def getGeometryOutputKey(elementNode):
+	'Get the cache key of the gear geometry output, or None if an attribute value can not be in a key.'
+	attributeKeys = []
+	for attributeName in sorted(elementNode.attributes.keys()):
+		if attributeName in globalUnkeyedAttributeNames or attributeName.startswith(globalUnkeyedAttributePrefixes):
+			continue
+		value = elementNode.attributes[attributeName]
+		if value.__class__ == str:
+			value = evaluate.getEvaluatedValueObliviously(elementNode, attributeName)
+		hashableValue = getHashableValue(value)
+		if hashableValue == None:
+			return None
+		attributeKeys.append((attributeName, hashableValue))
+	settingKeys = (
+		elementNode.getCascadeBoolean(False, 'radiusAreal'),
+		setting.getLayerHeight(elementNode),
+		setting.getOverhangRadians(elementNode),
+		setting.getOverhangSpan(elementNode),
+		setting.getPrecision(elementNode),
+		setting.getTwistPrecision(elementNode))
+	return (tuple(attributeKeys), settingKeys)
 
 def getHalfwave(pitchRadius, teeth):
 	'Get tooth halfwave.'
 	return pitchRadius * math.pi / float(teeth)
 
+def getHashableValue(value):
+	'Get the hashable value of an attribute value, or None if the value is not a number, string, vector or list of those.'
+	valueClass = value.__class__
+	if valueClass == bool or valueClass == complex or valueClass == float or valueClass == int or valueClass == str:
+		return value
+	if valueClass == Vector3 or valueClass == Vector3Index:
+		return ('Vector3', value.x, value.y, value.z)
+	if valueClass != list and valueClass != tuple:
+		return None
+	hashableValues = ['list']
+	for listElement in value:
+		hashableValue = getHashableValue(listElement)
+		if hashableValue == None:
+			return None
+		hashableValues.append(hashableValue)
+	return tuple(hashableValues)
+
 def getHelixComplexPath(derivation, elementNode):
 	'Set gear helix path.'
 	helixTypeFirstCharacter = derivation.helixType.lower()[: 1]
@@ -12,6 +12,7 @@ import __init__
 
 from fabmetheus_utilities.geometry.creation import lineation
 from fabmetheus_utilities.geometry.creation import solid
+from fabmetheus_utilities.geometry.geometry_tools import face
 from fabmetheus_utilities.geometry.geometry_tools import path
 from fabmetheus_utilities.geometry.geometry_utilities import evaluate
 from fabmetheus_utilities.geometry.solids import triangle_mesh
@@ -29,29 +30,71 @@ __date__ = '$Date: 2008/02/05 $'
 __license__ = 'GNU Affero General Public License http://www.gnu.org/licenses/agpl.html'
 
 
+def addFaceByIndexes(faces, indexBegin, indexCenter, indexEnd):
+	'Add a face by the vertex indexes, unless two of the indexes are the same.'
+	if indexBegin != indexCenter and indexCenter != indexEnd and indexEnd != indexBegin:
+		faceByIndexes = face.Face()
+		faceByIndexes.index = len(faces)
+		faceByIndexes.vertexIndexes = [indexBegin, indexCenter, indexEnd]
+		faces.append(faceByIndexes)
+
+def addFacesByCenterLoop(faces, center, indexedLoop):
+	'Add the fan of faces from the center to each segment of the loop.'
+	centerIndex = center.index
+	for pointIndex, point in enumerate(indexedLoop):
+		addFaceByIndexes(faces, centerIndex, point.index, indexedLoop[(pointIndex + 1) % len(indexedLoop)].index)
+
+def addFacesByFlatBlocks(faces, heightGrid, indexedGridTop):
+	'Add the top faces, each flat block is a fan from its center to all the grid points around it, so the interior points of the block are left out without making any t junctions.'
+	for rowIndex, columnIndex, size in getFlatBlocks(heightGrid):
+		if size == 1:
+			addFacesByGridCell(faces, indexedGridTop[rowIndex], indexedGridTop[rowIndex + 1], columnIndex)
+		else:
+			halfSize = size / 2
+			center = indexedGridTop[rowIndex + halfSize][columnIndex + halfSize]
+			addFacesByCenterLoop(faces, center, getIndexedBlockLoop(indexedGridTop, rowIndex, columnIndex, size))
+
+def addFacesByGridCell(faces, rowBottom, rowTop, columnIndex):
+	'Add the two faces of the grid cell, in the same order as triangle_mesh.addFacesByGrid.'
+	indexBegin = rowBottom[columnIndex].index
+	indexCenter = rowTop[columnIndex + 1].index
+	addFaceByIndexes(faces, indexBegin, rowBottom[columnIndex + 1].index, indexCenter)
+	addFaceByIndexes(faces, indexBegin, indexCenter, rowTop[columnIndex].index)
+
+def addFlatBlocks(flatBlocks, flatHeightLevels, levelIndex, rowIndex, columnIndex):
+	'Add the largest flat blocks inside the block of the level, a block which is not flat is split into its four quarter blocks.'
+	flatHeights = flatHeightLevels[levelIndex]
+	if rowIndex >= len(flatHeights) or columnIndex >= len(flatHeights[0]):
+		return
+	if levelIndex == 0 or flatHeights[rowIndex][columnIndex] != None:
+		flatBlocks.append((rowIndex << levelIndex, columnIndex << levelIndex, 1 << levelIndex))
+		return
+	for quarterRowIndex in xrange(rowIndex + rowIndex, rowIndex + rowIndex + 2):
+		for quarterColumnIndex in xrange(columnIndex + columnIndex, columnIndex + columnIndex + 2):
+			addFlatBlocks(flatBlocks, flatHeightLevels, levelIndex - 1, quarterRowIndex, quarterColumnIndex)
+
 def addHeightsByBitmap(heights, textLines):
 	'Add heights by bitmap.'
-	for line in textLines[3:]:
-		for integerWord in line.split():
-			heights.append(float(integerWord))
+	heights += map(float, ' '.join(textLines[3:]).split())
 
 def addHeightsByGraymap(heights, textLines):
 	'Add heights by graymap.'
 	divisor = float(textLines[3])
-	for line in textLines[4:]:
-		for integerWord in line.split():
-			heights.append(float(integerWord) / divisor)
+	for height in map(float, ' '.join(textLines[4:]).split()):
+		heights.append(height / divisor)
 
 def getAddIndexedHeightGrid(heightGrid, minimumXY, step, top, vertexes):
 	'Get and add an indexed heightGrid.'
 	indexedHeightGrid = []
+	columnOffsets = []
+	for columnIndex in xrange(len(heightGrid[0])):
+		columnOffsets.append(step.real * float(columnIndex) + minimumXY.real)
 	for rowIndex, row in enumerate(heightGrid):
 		indexedRow = []
 		indexedHeightGrid.append(indexedRow)
 		rowOffset = step.imag * float(rowIndex) + minimumXY.imag
 		for columnIndex, element in enumerate(row):
-			columnOffset = step.real * float(columnIndex) + minimumXY.real
-			vector3index = Vector3Index(len(vertexes), columnOffset, rowOffset, top * element)
+			vector3index = Vector3Index(len(vertexes), columnOffsets[columnIndex], rowOffset, top * element)
 			indexedRow.append(vector3index)
 			vertexes.append(vector3index)
 	return indexedHeightGrid
@@ -87,6 +130,28 @@ def getAddIndexedSegmentedPerimeter(heightGrid, maximumXY, minimumXY, step, vert
 		indexedSegmentedPerimeter.append(vector3index)
 	return indexedSegmentedPerimeter
 
+def getFlatBlocks(heightGrid):
+	'Get the row index, column index and size of the blocks of cells which cover the height grid, a block of more than one cell is flat and is as large as the quarter tree of blocks allows.'
+	flatHeights = []
+	for rowIndex in xrange(len(heightGrid) - 1):
+		rowBottom = heightGrid[rowIndex]
+		rowTop = heightGrid[rowIndex + 1]
+		flatRow = []
+		flatHeights.append(flatRow)
+		for columnIndex in xrange(len(rowBottom) - 1):
+			height = rowBottom[columnIndex]
+			if rowBottom[columnIndex + 1] == height and rowTop[columnIndex] == height and rowTop[columnIndex + 1] == height:
+				flatRow.append(height)
+			else:
+				flatRow.append(None)
+	flatHeightLevels = [flatHeights]
+	while len(flatHeights) > 1 or len(flatHeights[0]) > 1:
+		flatHeights = getHalvedFlatHeights(flatHeights)
+		flatHeightLevels.append(flatHeights)
+	flatBlocks = []
+	addFlatBlocks(flatBlocks, flatHeightLevels, len(flatHeightLevels) - 1, 0, 0)
+	return flatBlocks
+
 def getGeometryOutput(elementNode):
 	'Get vector3 vertexes from attribute dictionary.'
 	derivation = HeightmapDerivation(elementNode)
@@ -120,6 +185,12 @@ def getGeometryOutputByHeightGrid(derivation, elementNode, heightGrid):
 			print(heightGrid)
 			print(elementNode)
 			return None
+	return triangle_mesh.getReturnWithoutGarbageCollection(getGeometryOutputByRectangularHeightGrid, derivation, heightGrid)
+
+def getGeometryOutputByRectangularHeightGrid(derivation, heightGrid):
+	'Get the geometry output of the rectangular height grid, the faces are made by their vertex indexes in one pass over the grid.'
+	numberOfColumns = len(heightGrid)
+	numberOfRows = len(heightGrid[0])
 	inradiusComplex = derivation.inradius.dropAxis()
 	minimumXY = -inradiusComplex
 	step = complex(derivation.inradius.x / float(numberOfRows - 1), derivation.inradius.y / float(numberOfColumns - 1))
@@ -132,10 +203,41 @@ def getGeometryOutputByHeightGrid(derivation, elementNode, heightGrid):
 	indexedLoops = [indexedBottomLoop]
 	indexedGridTop = getAddIndexedHeightGrid(heightGrid, minimumXY, step, top, vertexes)
 	indexedLoops.append(triangle_mesh.getIndexedLoopFromIndexedGrid(indexedGridTop))
-	vertexes = triangle_mesh.getUniqueVertexes(indexedLoops + indexedGridTop)
-	triangle_mesh.addPillarFromConvexLoopsGridTop(faces, indexedGridTop, indexedLoops)
+	centerBottom = 0.5 * (minimumXY + inradiusComplex)
+	indexedCenters = [Vector3Index(len(vertexes), centerBottom.real, centerBottom.imag, 0.0)]
+	vertexes = triangle_mesh.getUniqueVertexes(indexedLoops + indexedGridTop + [indexedCenters])
+	addFacesByCenterLoop(faces, indexedCenters[0], indexedBottomLoop[: : -1])
+	triangle_mesh.addFacesByConvexLoops(faces, indexedLoops)
+	if derivation.decimate:
+		addFacesByFlatBlocks(faces, heightGrid, indexedGridTop)
+		return triangle_mesh.getGeometryOutputByFacesVertexes(faces, getUsedVertexes(faces, vertexes))
+	for rowIndex in xrange(len(indexedGridTop) - 1):
+		rowBottom = indexedGridTop[rowIndex]
+		rowTop = indexedGridTop[rowIndex + 1]
+		for columnIndex in xrange(len(rowBottom) - 1):
+			addFacesByGridCell(faces, rowBottom, rowTop, columnIndex)
 	return triangle_mesh.getGeometryOutputByFacesVertexes(faces, vertexes)
 
+def getHalvedFlatHeights(flatHeights):
+	'Get the flat heights of the blocks of twice the size, a block is flat if its four quarter blocks are flat at the same height.'
+	halvedFlatHeights = []
+	for rowIndex in xrange(0, len(flatHeights), 2):
+		rowBottom = flatHeights[rowIndex]
+		rowTop = None
+		if rowIndex + 1 < len(flatHeights):
+			rowTop = flatHeights[rowIndex + 1]
+		halvedRow = []
+		halvedFlatHeights.append(halvedRow)
+		for columnIndex in xrange(0, len(rowBottom), 2):
+			height = rowBottom[columnIndex]
+			if height == None or rowTop == None or columnIndex + 1 >= len(rowBottom):
+				halvedRow.append(None)
+			elif rowBottom[columnIndex + 1] == height and rowTop[columnIndex] == height and rowTop[columnIndex + 1] == height:
+				halvedRow.append(height)
+			else:
+				halvedRow.append(None)
+	return halvedFlatHeights
+
 def getHeightGrid(fileName):
 	'Get heightGrid by fileName.'
 	if 'models/' not in fileName:
@@ -163,15 +265,23 @@ def getHeightGrid(fileName):
 		print('http://en.wikipedia.org/wiki/Netpbm_format')
 		return []
 	heightGrid = []
-	heightIndex = 0
 	for rowIndex in xrange(numberOfRows):
-		row = []
-		heightGrid.append(row)
-		for columnIndex in xrange(numberOfColumns):
-			row.append(heights[heightIndex])
-			heightIndex += 1
+		heightIndex = rowIndex * numberOfColumns
+		heightGrid.append(heights[heightIndex : heightIndex + numberOfColumns])
 	return heightGrid
 
+def getIndexedBlockLoop(indexedGrid, rowIndex, columnIndex, size):
+	'Get the indexed loop of all the grid points around the block, in the same direction as the cell loops.'
+	columnEndIndex = columnIndex + size
+	rowEndIndex = rowIndex + size
+	indexedBlockLoop = indexedGrid[rowIndex][columnIndex : columnEndIndex]
+	for row in indexedGrid[rowIndex : rowEndIndex]:
+		indexedBlockLoop.append(row[columnEndIndex])
+	indexedBlockLoop += indexedGrid[rowEndIndex][columnEndIndex : columnIndex : -1]
+	for row in indexedGrid[rowEndIndex : rowIndex : -1]:
+		indexedBlockLoop.append(row[columnIndex])
+	return indexedBlockLoop
+
 def getNewDerivation(elementNode):
 	'Get new derivation.'
 	return HeightmapDerivation(elementNode)
@@ -181,13 +291,25 @@ def getRaisedHeightGrid(heightGrid, start):
 	raisedHeightGrid = []
 	remainingHeight = 1.0 - start
 	for row in heightGrid:
-		raisedRow = []
-		raisedHeightGrid.append(raisedRow)
-		for element in row:
-			raisedElement = remainingHeight * element + start
-			raisedRow.append(raisedElement)
+		raisedHeightGrid.append([remainingHeight * element + start for element in row])
 	return raisedHeightGrid
 
+def getUsedVertexes(faces, vertexes):
+	'Get the vertexes which are used by the faces, and change the vertex indexes of the faces and vertexes to the indexes in the used vertexes.'
+	usedIndexes = [None] * len(vertexes)
+	for faceUsing in faces:
+		for vertexIndex in faceUsing.vertexIndexes:
+			usedIndexes[vertexIndex] = True
+	usedVertexes = []
+	for vertexIndex, vertex in enumerate(vertexes):
+		if usedIndexes[vertexIndex] != None:
+			usedIndexes[vertexIndex] = len(usedVertexes)
+			vertex.index = len(usedVertexes)
+			usedVertexes.append(vertex)
+	for faceUsing in faces:
+		faceUsing.vertexIndexes = [usedIndexes[vertexIndex] for vertexIndex in faceUsing.vertexIndexes]
+	return usedVertexes
+
 def processElementNode(elementNode):
 	'Process the xml element.'
 	solid.processElementNodeByGeometry(elementNode, getGeometryOutput(elementNode))
@@ -197,6 +319,7 @@ class HeightmapDerivation:
 	'Class to hold heightmap variables.'
 	def __init__(self, elementNode):
 		'Set defaults.'
+		self.decimate = evaluate.getEvaluatedBoolean(False, elementNode, 'decimate')
 		self.fileName = evaluate.getEvaluatedString('', elementNode, 'file')
 		self.heightGrid = evaluate.getEvaluatedValue([], elementNode, 'heightGrid')
 		self.inradius = evaluate.getVector3ByPrefixes(elementNode, ['demisize', 'inradius'], Vector3(10.0, 10.0, 5.0))
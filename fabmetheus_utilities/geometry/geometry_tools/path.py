@@ -74,6 +74,7 @@ class Path(dictionary.Dictionary):
 		'Add empty lists.'
 		dictionary.Dictionary.__init__(self)
 		self.matrix4X4 = matrix.Matrix()
+		self.matrixChain = matrix.MatrixChain()
 		self.oldChainTetragrid = None
 		self.transformedPath = None
 		self.vertexes = []
@@ -101,7 +102,7 @@ class Path(dictionary.Dictionary):
 
 	def getMatrixChainTetragrid(self):
 		'Get the matrix chain tetragrid.'
-		return matrix.getTetragridTimesOther(self.elementNode.parentNode.xmlObject.getMatrixChainTetragrid(), self.matrix4X4.tetragrid)
+		return self.matrixChain.getChainTetragrid(self.elementNode.parentNode.xmlObject.getMatrixChainTetragrid(), self.matrix4X4.tetragrid)
 
 	def getPaths(self):
 		'Get all paths.'
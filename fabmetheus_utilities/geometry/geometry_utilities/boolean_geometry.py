@@ -95,10 +95,16 @@ class BooleanGeometry:
 
 	def getCarveBoundaryLayers(self):
 		'Get the boundary layers.'
+		triangleMeshes = []
+		for visibleObject in evaluate.getVisibleObjects(self.archivableObjects):
+			triangleMeshes += visibleObject.getTriangleMeshes()
+		triangle_mesh.setSliceTwins(triangleMeshes)
 		if self.getMinimumZ() == None:
+			triangle_mesh.removeSliceTwins(triangleMeshes)
 			return []
 		z = self.minimumZ + 0.5 * self.layerHeight
 		self.loopLayers = getLoopLayers(self.archivableObjects, self.importRadius, self.layerHeight, self.maximumZ, True, z, self.zoneArrangement)
+		triangle_mesh.removeSliceTwins(triangleMeshes)
 		self.cornerMaximum = Vector3(-912345678.0, -912345678.0, -912345678.0)
 		self.cornerMinimum = Vector3(912345678.0, 912345678.0, 912345678.0)
 		for loopLayer in self.loopLayers:
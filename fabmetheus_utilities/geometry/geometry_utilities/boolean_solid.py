@@ -18,11 +18,10 @@ import __init__
 from fabmetheus_utilities.geometry.geometry_utilities.evaluate_elements import setting
 from fabmetheus_utilities.geometry.geometry_utilities import evaluate
 from fabmetheus_utilities.geometry.solids import group
-from fabmetheus_utilities.geometry.solids import triangle_mesh
 from fabmetheus_utilities.vector3 import Vector3
 from fabmetheus_utilities import euclidean
 from fabmetheus_utilities import gcodec
-from fabmetheus_utilities import intercircle
+from fabmetheus_utilities import polygon_boolean
 import math
 
 
@@ -32,161 +31,21 @@ __date__ = '$Date: 2008/21/04 $'
 __license__ = 'GNU Affero General Public License http://www.gnu.org/licenses/agpl.html'
 
 
-def addLineLoopsIntersections( loopLoopsIntersections, loops, pointBegin, pointEnd ):
-	'Add intersections of the line with the loops.'
-	normalizedSegment = pointEnd - pointBegin
-	normalizedSegmentLength = abs( normalizedSegment )
-	if normalizedSegmentLength <= 0.0:
-		return
-	lineLoopsIntersections = []
-	normalizedSegment /= normalizedSegmentLength
-	segmentYMirror = complex(normalizedSegment.real, -normalizedSegment.imag)
-	pointBeginRotated = segmentYMirror * pointBegin
-	pointEndRotated = segmentYMirror * pointEnd
-	addLoopsXSegmentIntersections( lineLoopsIntersections, loops, pointBeginRotated.real, pointEndRotated.real, segmentYMirror, pointBeginRotated.imag )
-	for lineLoopsIntersection in lineLoopsIntersections:
-		point = complex( lineLoopsIntersection, pointBeginRotated.imag ) * normalizedSegment
-		loopLoopsIntersections.append(point)
-
-def addLineXSegmentIntersection( lineLoopsIntersections, segmentFirstX, segmentSecondX, vector3First, vector3Second, y ):
-	'Add intersections of the line with the x segment.'
-	xIntersection = euclidean.getXIntersectionIfExists( vector3First, vector3Second, y )
-	if xIntersection == None:
-		return
-	if xIntersection < min( segmentFirstX, segmentSecondX ):
-		return
-	if xIntersection <= max( segmentFirstX, segmentSecondX ):
-		lineLoopsIntersections.append( xIntersection )
-
-def addLoopLoopsIntersections( loop, loopsLoopsIntersections, otherLoops ):
-	'Add intersections of the loop with the other loops.'
-	for pointIndex in xrange(len(loop)):
-		pointBegin = loop[pointIndex]
-		pointEnd = loop[(pointIndex + 1) % len(loop)]
-		addLineLoopsIntersections( loopsLoopsIntersections, otherLoops, pointBegin, pointEnd )
-
-def addLoopsXSegmentIntersections( lineLoopsIntersections, loops, segmentFirstX, segmentSecondX, segmentYMirror, y ):
-	'Add intersections of the loops with the x segment.'
-	for loop in loops:
-		addLoopXSegmentIntersections( lineLoopsIntersections, loop, segmentFirstX, segmentSecondX, segmentYMirror, y )
-
-def addLoopXSegmentIntersections( lineLoopsIntersections, loop, segmentFirstX, segmentSecondX, segmentYMirror, y ):
-	'Add intersections of the loop with the x segment.'
-	rotatedLoop = euclidean.getRotatedComplexes( segmentYMirror, loop )
-	for pointIndex in xrange( len( rotatedLoop ) ):
-		pointFirst = rotatedLoop[pointIndex]
-		pointSecond = rotatedLoop[ (pointIndex + 1) % len( rotatedLoop ) ]
-		addLineXSegmentIntersection( lineLoopsIntersections, segmentFirstX, segmentSecondX, pointFirst, pointSecond, y )
-
-def getInBetweenLoopsFromLoops(loops, radius):
-	'Get the in between loops from loops.'
-	inBetweenLoops = []
-	for loop in loops:
-		inBetweenLoop = []
-		for pointIndex in xrange(len(loop)):
-			pointBegin = loop[pointIndex]
-			pointEnd = loop[(pointIndex + 1) % len(loop)]
-			intercircle.addPointsFromSegment(pointBegin, pointEnd, inBetweenLoop, radius)
-		inBetweenLoops.append(inBetweenLoop)
-	return inBetweenLoops
-
-def getInsetPointsByInsetLoop( insetLoop, inside, loops, radius ):
-	'Get the inset points of the inset loop inside the loops.'
-	insetPointsByInsetLoop = []
-	for pointIndex in xrange( len( insetLoop ) ):
-		pointBegin = insetLoop[ ( pointIndex + len( insetLoop ) - 1 ) % len( insetLoop ) ]
-		pointCenter = insetLoop[pointIndex]
-		pointEnd = insetLoop[ (pointIndex + 1) % len( insetLoop ) ]
-		if getIsInsetPointInsideLoops( inside, loops, pointBegin, pointCenter, pointEnd, radius ):
-			insetPointsByInsetLoop.append( pointCenter )
-	return insetPointsByInsetLoop
-
-def getInsetPointsByInsetLoops( insetLoops, inside, loops, radius ):
-	'Get the inset points of the inset loops inside the loops.'
-	insetPointsByInsetLoops = []
-	for insetLoop in insetLoops:
-		insetPointsByInsetLoops += getInsetPointsByInsetLoop( insetLoop, inside, loops, radius )
-	return insetPointsByInsetLoops
-
-def getIsInsetPointInsideLoops( inside, loops, pointBegin, pointCenter, pointEnd, radius ):
-	'Determine if the inset point is inside the loops.'
-	centerMinusBegin = euclidean.getNormalized( pointCenter - pointBegin )
-	centerMinusBeginWiddershins = complex( - centerMinusBegin.imag, centerMinusBegin.real )
-	endMinusCenter = euclidean.getNormalized( pointEnd - pointCenter )
-	endMinusCenterWiddershins = complex( - endMinusCenter.imag, endMinusCenter.real )
-	widdershinsNormalized = euclidean.getNormalized( centerMinusBeginWiddershins + endMinusCenterWiddershins ) * radius
-	return euclidean.getIsInFilledRegion( loops,  pointCenter + widdershinsNormalized ) == inside
-
 def getLoopsDifference(importRadius, loopLists):
 	'Get difference loops.'
-	halfImportRadius = 0.5 * importRadius # so that there are no misses on shallow angles
-	radiusSide = 0.01 * importRadius
-	negativeLoops = getLoopsUnion(importRadius, loopLists[1 :])
-	intercircle.directLoops(False, negativeLoops)
-	positiveLoops = loopLists[0]
-	intercircle.directLoops(True, positiveLoops)
-	corners = getInsetPointsByInsetLoops(negativeLoops, True, positiveLoops, radiusSide)
-	corners += getInsetPointsByInsetLoops(positiveLoops, False, negativeLoops, radiusSide)
-	allPoints = corners[:]
-	allPoints += getInsetPointsByInsetLoops(getInBetweenLoopsFromLoops(negativeLoops, halfImportRadius), True, positiveLoops, radiusSide)
-	allPoints += getInsetPointsByInsetLoops(getInBetweenLoopsFromLoops(positiveLoops, halfImportRadius), False, negativeLoops, radiusSide)
-	return triangle_mesh.getDescendingAreaOrientedLoops(allPoints, corners, importRadius)
+	return polygon_boolean.getDifferenceLoops(loopLists)
 
 def getLoopsIntersection(importRadius, loopLists):
 	'Get intersection loops.'
-	intercircle.directLoopLists(True, loopLists)
 	if len(loopLists) < 1:
 		return []
 	if len(loopLists) < 2:
 		return loopLists[0]
-	intercircle.directLoopLists(True, loopLists)
-	loopsIntersection = loopLists[0]
-	for loopList in loopLists[1 :]:
-		loopsIntersection = getLoopsIntersectionByPair(importRadius, loopsIntersection, loopList)
-	return loopsIntersection
-
-def getLoopsIntersectionByPair(importRadius, loopsFirst, loopsLast):
-	'Get intersection loops for a pair of loop lists.'
-	halfImportRadius = 0.5 * importRadius # so that there are no misses on shallow angles
-	radiusSide = 0.01 * importRadius
-	corners = []
-	corners += getInsetPointsByInsetLoops(loopsFirst, True, loopsLast, radiusSide)
-	corners += getInsetPointsByInsetLoops(loopsLast, True, loopsFirst, radiusSide)
-	allPoints = corners[:]
-	allPoints += getInsetPointsByInsetLoops(getInBetweenLoopsFromLoops(loopsFirst, halfImportRadius), True, loopsLast, radiusSide)
-	allPoints += getInsetPointsByInsetLoops(getInBetweenLoopsFromLoops(loopsLast, halfImportRadius), True, loopsFirst, radiusSide)
-	return triangle_mesh.getDescendingAreaOrientedLoops(allPoints, corners, importRadius)
-
-def getLoopsListsIntersections( loopsList ):
-	'Get intersections betweens the loops lists.'
-	loopsListsIntersections = []
-	for loopsIndex in xrange( len( loopsList ) ):
-		loops = loopsList[ loopsIndex ]
-		for otherLoops in loopsList[ : loopsIndex ]:
-			loopsListsIntersections += getLoopsLoopsIntersections( loops, otherLoops )
-	return loopsListsIntersections
-
-def getLoopsLoopsIntersections( loops, otherLoops ):
-	'Get all the intersections of the loops with the other loops.'
-	loopsLoopsIntersections = []
-	for loop in loops:
-		addLoopLoopsIntersections( loop, loopsLoopsIntersections, otherLoops )
-	return loopsLoopsIntersections
+	return polygon_boolean.getIntersectionLoops(loopLists)
 
 def getLoopsUnion(importRadius, loopLists):
 	'Get joined loops sliced through shape.'
-	allPoints = []
-	corners = getLoopsListsIntersections(loopLists)
-	radiusSideNegative = -0.01 * importRadius
-	intercircle.directLoopLists(True, loopLists)
-	for loopListIndex in xrange(len(loopLists)):
-		insetLoops = loopLists[ loopListIndex ]
-		inBetweenInsetLoops = getInBetweenLoopsFromLoops(insetLoops, importRadius)
-		otherLoops = euclidean.getConcatenatedList(loopLists[: loopListIndex] + loopLists[loopListIndex + 1 :])
-		corners += getInsetPointsByInsetLoops(insetLoops, False, otherLoops, radiusSideNegative)
-		allPoints += getInsetPointsByInsetLoops(inBetweenInsetLoops, False, otherLoops, radiusSideNegative)
-	allPoints += corners[:]
-	return triangle_mesh.getDescendingAreaOrientedLoops(allPoints, corners, importRadius)
+	return polygon_boolean.getUnionLoops(loopLists)
 
 def getVisibleObjectLoopsList( importRadius, visibleObjects, z ):
 	'Get visible object loops list.'
@@ -25,6 +25,9 @@ __date__ = '$Date: 2008/02/05 $'
 __license__ = 'GNU Affero General Public License http://www.gnu.org/licenses/agpl.html'
 
 
+globalCompiledExpressionDictionary = {}
+globalEvaluatorSplitWordsDictionary = {}
+globalMaximumNumberOfCachedExpressions = 10000
 globalModuleFunctionsDictionary = {}
 
 
@@ -188,6 +191,17 @@ def getCapitalizedSuffixKey(prefix, suffix):
 		return prefix + suffix
 	return prefix + suffix[:1].upper()+suffix[1:]
 
+def getCompiledExpression(words):
+	'Get the compiled expression of the split words, from the cache if they have been compiled before.'
+	wordsKey = tuple(words)
+	if wordsKey in globalCompiledExpressionDictionary:
+		return globalCompiledExpressionDictionary[wordsKey]
+	if len(globalCompiledExpressionDictionary) >= globalMaximumNumberOfCachedExpressions:
+		globalCompiledExpressionDictionary.clear()
+	compiledExpression = CompiledExpression(wordsKey)
+	globalCompiledExpressionDictionary[wordsKey] = compiledExpression
+	return compiledExpression
+
 def getDictionarySplitWords(dictionary, value):
 	'Get split line for evaluators.'
 	if getIsQuoted(value):
@@ -304,15 +318,7 @@ def getEvaluatedExpressionValue(elementNode, value):
 
 def getEvaluatedExpressionValueBySplitLine(elementNode, words):
 	'Evaluate the expression value.'
-	evaluators = []
-	for wordIndex, word in enumerate(words):
-		nextWord = ''
-		nextWordIndex = wordIndex + 1
-		if nextWordIndex < len(words):
-			nextWord = words[nextWordIndex]
-		evaluator = getEvaluator(elementNode, evaluators, nextWord, word)
-		if evaluator != None:
-			evaluators.append(evaluator)
+	evaluators = getCompiledExpression(words).getEvaluators(elementNode)
 	while getBracketsExist(evaluators):
 		pass
 	evaluatedExpressionValueEvaluators = getEvaluatedExpressionValueEvaluators(evaluators)
@@ -399,83 +405,51 @@ def getEvaluatedValueObliviously(elementNode, key):
 
 def getEvaluator(elementNode, evaluators, nextWord, word):
 	'Get the evaluator.'
+	evaluatorFactory = getEvaluatorFactory(word)
+	if evaluatorFactory == None:
+		return getScopeEvaluator(elementNode, elementNode.getXMLProcessor().functions, word)
+	return evaluatorFactory(elementNode, word)
+
+def getEvaluatorByDollar(elementNode, word):
+	'Get the value evaluator of the word after the dollar sign.'
+	return EvaluatorValue(word[1 :])
+
+def getEvaluatorByQuote(elementNode, word):
+	'Get the value evaluator of the word inside the quotes.'
+	return EvaluatorValue(word[1 : -1])
+
+def getEvaluatorFactory(word):
+	'Get the evaluator class or function of the word, or None if the evaluator depends on the local variables, classes and functions in scope.'
 	if word in globalSplitDictionary:
-		return globalSplitDictionary[word](elementNode, word)
+		return globalSplitDictionary[word]
 	firstCharacter = word[: 1]
 	if firstCharacter == "'" or firstCharacter == '"':
 		if len(word) > 1:
 			if firstCharacter == word[-1]:
-				return EvaluatorValue(word[1 : -1])
+				return getEvaluatorByQuote
 	if firstCharacter == '$':
-		return EvaluatorValue(word[1 :])
+		return getEvaluatorByDollar
 	dotIndex = word.find('.')
-	functions = elementNode.getXMLProcessor().functions
-	if dotIndex > -1 and len(word) > 1:
-		if dotIndex == 0 and word[1].isalpha():
-			return EvaluatorAttribute(elementNode, word)
-		if dotIndex > 0:
-			untilDot = word[: dotIndex]
-			if untilDot in globalModuleEvaluatorDictionary:
-				return globalModuleEvaluatorDictionary[untilDot](elementNode, word)
-		if len(functions) > 0:
-			if untilDot in functions[-1].localDictionary:
-				return EvaluatorLocal(elementNode, word)
+	if dotIndex == 0 and len(word) > 1:
+		if word[1].isalpha():
+			return EvaluatorAttribute
+	if dotIndex > 0:
+		untilDot = word[: dotIndex]
+		if untilDot in globalModuleEvaluatorDictionary:
+			return globalModuleEvaluatorDictionary[untilDot]
 	if firstCharacter.isalpha() or firstCharacter == '_':
-		if len(functions) > 0:
-			if word in functions[-1].localDictionary:
-				return EvaluatorLocal(elementNode, word)
-		wordElement = elementNode.getElementNodeByID(word)
-		if wordElement != None:
-			if wordElement.getNodeName() == 'class':
-				return EvaluatorClass(wordElement, word)
-			if wordElement.getNodeName() == 'function':
-				return EvaluatorFunction(wordElement, word)
-		return EvaluatorValue(word)
-	return EvaluatorNumeric(elementNode, word)
+		return None
+	return EvaluatorNumeric
 
 def getEvaluatorSplitWords(value):
-	'Get split words for evaluators.'
-	if value.startswith('='):
-		value = value[len('=') :]
-	if len(value) < 1:
-		return []
-	global globalDictionaryOperatorBegin
-	uniqueQuoteIndex = 0
-	word = ''
-	quoteString = None
-	quoteDictionary = {}
-	for characterIndex in xrange(len(value)):
-		character = value[characterIndex]
-		if character == '"' or character == "'":
-			if quoteString == None:
-				quoteString = ''
-			elif quoteString != None:
-				if character == quoteString[: 1]:
-					uniqueQuoteIndex = getUniqueQuoteIndex(uniqueQuoteIndex, value)
-					uniqueToken = getTokenByNumber(uniqueQuoteIndex)
-					quoteDictionary[uniqueToken] = quoteString + character
-					character = uniqueToken
-					quoteString = None
-		if quoteString == None:
-			word += character
-		else:
-			quoteString += character
-	beginSplitWords = getDictionarySplitWords(globalDictionaryOperatorBegin, word)
-	global globalSplitDictionaryOperator
-	evaluatorSplitWords = []
-	for beginSplitWord in beginSplitWords:
-		if beginSplitWord in globalDictionaryOperatorBegin:
-			evaluatorSplitWords.append(beginSplitWord)
-		else:
-			evaluatorSplitWords += getDictionarySplitWords(globalSplitDictionaryOperator, beginSplitWord)
-	for evaluatorSplitWordIndex, evaluatorSplitWord in enumerate(evaluatorSplitWords):
-		for quoteDictionaryKey in quoteDictionary.keys():
-			if quoteDictionaryKey in evaluatorSplitWord:
-				evaluatorSplitWords[evaluatorSplitWordIndex] = evaluatorSplitWord.replace(quoteDictionaryKey, quoteDictionary[quoteDictionaryKey])
-	evaluatorTransitionWords = []
-	for evaluatorSplitWord in evaluatorSplitWords:
-		addQuoteWord(evaluatorTransitionWords, evaluatorSplitWord)
-	return evaluatorTransitionWords
+	'Get split words for evaluators, from the cache if the value has been split before.'
+	if value in globalEvaluatorSplitWordsDictionary:
+		return globalEvaluatorSplitWordsDictionary[value][:]
+	if len(globalEvaluatorSplitWordsDictionary) >= globalMaximumNumberOfCachedExpressions:
+		globalEvaluatorSplitWordsDictionary.clear()
+	evaluatorSplitWords = getUncachedEvaluatorSplitWords(value)
+	globalEvaluatorSplitWordsDictionary[value] = evaluatorSplitWords
+	return evaluatorSplitWords[:]
 
 def getFloatListFromBracketedString( bracketedString ):
 	'Get list from a bracketed string.'
@@ -637,6 +611,24 @@ def getRadiusArealizedBasedOnAreaRadius(elementNode, radius, sides):
 		return radius
 	return radius * euclidean.getRadiusArealizedMultiplier(sides)
 
+def getScopeEvaluator(elementNode, functions, word):
+	'Get the evaluator of a name, which depends on the local variables, classes and functions in scope.'
+	if len(functions) > 0:
+		localDictionary = functions[-1].localDictionary
+		dotIndex = word.find('.')
+		if dotIndex > 0:
+			if word[: dotIndex] in localDictionary:
+				return EvaluatorLocal(elementNode, word)
+		if word in localDictionary:
+			return EvaluatorLocal(elementNode, word)
+	wordElement = elementNode.getElementNodeByID(word)
+	if wordElement != None:
+		if wordElement.getNodeName() == 'class':
+			return EvaluatorClass(wordElement, word)
+		if wordElement.getNodeName() == 'function':
+			return EvaluatorFunction(wordElement, word)
+	return EvaluatorValue(word)
+
 def getSidesBasedOnPrecision(elementNode, radius):
 	'Get the number of polygon sides.'
 	return int(math.ceil(math.sqrt(0.5 * radius / setting.getPrecision(elementNode)) * math.pi))
@@ -723,6 +715,50 @@ def getTransformedPathsByKey(defaultTransformedPaths, elementNode, key):
 		return defaultTransformedPaths
 	return elementNodeObject.getTransformedPaths()
 
+def getUncachedEvaluatorSplitWords(value):
+	'Get split words for evaluators without the cache.'
+	if value.startswith('='):
+		value = value[len('=') :]
+	if len(value) < 1:
+		return []
+	global globalDictionaryOperatorBegin
+	uniqueQuoteIndex = 0
+	word = ''
+	quoteString = None
+	quoteDictionary = {}
+	for characterIndex in xrange(len(value)):
+		character = value[characterIndex]
+		if character == '"' or character == "'":
+			if quoteString == None:
+				quoteString = ''
+			elif quoteString != None:
+				if character == quoteString[: 1]:
+					uniqueQuoteIndex = getUniqueQuoteIndex(uniqueQuoteIndex, value)
+					uniqueToken = getTokenByNumber(uniqueQuoteIndex)
+					quoteDictionary[uniqueToken] = quoteString + character
+					character = uniqueToken
+					quoteString = None
+		if quoteString == None:
+			word += character
+		else:
+			quoteString += character
+	beginSplitWords = getDictionarySplitWords(globalDictionaryOperatorBegin, word)
+	global globalSplitDictionaryOperator
+	evaluatorSplitWords = []
+	for beginSplitWord in beginSplitWords:
+		if beginSplitWord in globalDictionaryOperatorBegin:
+			evaluatorSplitWords.append(beginSplitWord)
+		else:
+			evaluatorSplitWords += getDictionarySplitWords(globalSplitDictionaryOperator, beginSplitWord)
+	for evaluatorSplitWordIndex, evaluatorSplitWord in enumerate(evaluatorSplitWords):
+		for quoteDictionaryKey in quoteDictionary.keys():
+			if quoteDictionaryKey in evaluatorSplitWord:
+				evaluatorSplitWords[evaluatorSplitWordIndex] = evaluatorSplitWord.replace(quoteDictionaryKey, quoteDictionary[quoteDictionaryKey])
+	evaluatorTransitionWords = []
+	for evaluatorSplitWord in evaluatorSplitWords:
+		addQuoteWord(evaluatorTransitionWords, evaluatorSplitWord)
+	return evaluatorTransitionWords
+
 def getUniqueQuoteIndex( uniqueQuoteIndex, word ):
 	'Get uniqueQuoteIndex.'
 	uniqueQuoteIndex += 1
@@ -1015,6 +1051,33 @@ class ClassObject:
 			self.selfDictionary[attributeName] = value
 
 
+class CompiledExpression:
+	'Class to hold the split words of an expression and the evaluator factories of the words.'
+	def __init__(self, words):
+		'Set the evaluator factories of the words.'
+		self.evaluatorFactories = []
+		self.words = words
+		for word in words:
+			self.evaluatorFactories.append(getEvaluatorFactory(word))
+
+	def __repr__(self):
+		'Get the string representation of this CompiledExpression.'
+		return str(self.words)
+
+	def getEvaluators(self, elementNode):
+		'Get new evaluators of the words for the element node, the names are looked up in the current scope.'
+		evaluators = []
+		functions = None
+		for evaluatorFactory, word in zip(self.evaluatorFactories, self.words):
+			if evaluatorFactory == None:
+				if functions == None:
+					functions = elementNode.getXMLProcessor().functions
+				evaluators.append(getScopeEvaluator(elementNode, functions, word))
+			else:
+				evaluators.append(evaluatorFactory(elementNode, word))
+		return evaluators
+
+
 class EmptyObject:
 	'An empty object.'
 	def __init__(self):
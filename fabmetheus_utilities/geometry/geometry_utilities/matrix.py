@@ -365,9 +365,14 @@ def getTransformedVector3s(tetragrid, vector3s):
 	'Get the vector3s multiplied by a matrix.'
 	if getIsIdentityTetragridOrNone(tetragrid):
 		return euclidean.getPathCopy(vector3s)
+	row0, row1, row2 = tetragrid[0], tetragrid[1], tetragrid[2]
+	xx, xy, xz, xw = row0[0], row0[1], row0[2], row0[3]
+	yx, yy, yz, yw = row1[0], row1[1], row1[2], row1[3]
+	zx, zy, zz, zw = row2[0], row2[1], row2[2], row2[3]
 	transformedVector3s = []
 	for vector3 in vector3s:
-		transformedVector3s.append(getTransformedVector3Blindly(tetragrid, vector3))
+		x, y, z = vector3.x, vector3.y, vector3.z
+		transformedVector3s.append(Vector3(xx * x + xy * y + xz * z + xw, yx * x + yy * y + yz * z + yw, zx * x + zy * y + zz * z + zw))
 	return transformedVector3s
 
 def getTransformTetragrid(elementNode, prefix):
@@ -426,8 +431,35 @@ def transformVector3sByMatrix(tetragrid, vector3s):
 	'Transform the vector3s by a matrix.'
 	if getIsIdentityTetragridOrNone(tetragrid):
 		return
+	row0, row1, row2 = tetragrid[0], tetragrid[1], tetragrid[2]
+	xx, xy, xz, xw = row0[0], row0[1], row0[2], row0[3]
+	yx, yy, yz, yw = row1[0], row1[1], row1[2], row1[3]
+	zx, zy, zz, zw = row2[0], row2[1], row2[2], row2[3]
 	for vector3 in vector3s:
-		transformVector3Blindly(tetragrid, vector3)
+		x, y, z = vector3.x, vector3.y, vector3.z
+		vector3.x = xx * x + xy * y + xz * z + xw
+		vector3.y = yx * x + yy * y + yz * z + yw
+		vector3.z = zx * x + zy * y + zz * z + zw
+
+
+class MatrixChain:
+	'A class to keep the chain tetragrid of an object, which is only multiplied again when the chain tetragrid of the parent or the tetragrid of the object has changed.'
+	def __init__(self):
+		'Initialize.'
+		self.chainTetragrid = None
+		self.isMultiplied = False
+		self.parentChainTetragrid = None
+		self.tetragrid = None
+
+	def getChainTetragrid(self, parentChainTetragrid, tetragrid):
+		'Get the parent chain tetragrid times the tetragrid, a new chain tetragrid is returned only when it has been multiplied again.'
+		if self.isMultiplied and parentChainTetragrid is self.parentChainTetragrid and tetragrid == self.tetragrid:
+			return self.chainTetragrid
+		self.chainTetragrid = getTetragridCopy(getTetragridTimesOther(parentChainTetragrid, tetragrid))
+		self.isMultiplied = True
+		self.parentChainTetragrid = parentChainTetragrid
+		self.tetragrid = getTetragridCopy(tetragrid)
+		return self.chainTetragrid
 
 
 class Matrix:
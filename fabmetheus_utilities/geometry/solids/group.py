@@ -44,6 +44,7 @@ class Group(dictionary.Dictionary):
 		"Add empty lists."
 		dictionary.Dictionary.__init__(self)
 		self.matrix4X4 = matrix.Matrix()
+		self.matrixChain = matrix.MatrixChain()
 
 	def addXMLInnerSection(self, depth, output):
 		"Add xml inner section for this object."
@@ -69,7 +70,7 @@ class Group(dictionary.Dictionary):
 
 	def getMatrixChainTetragrid(self):
 		"Get the matrix chain tetragrid."
-		return matrix.getTetragridTimesOther(self.elementNode.parentNode.xmlObject.getMatrixChainTetragrid(), self.matrix4X4.tetragrid)
+		return self.matrixChain.getChainTetragrid(self.elementNode.parentNode.xmlObject.getMatrixChainTetragrid(), self.matrix4X4.tetragrid)
 
 	def getVisible(self):
 		"Get visible."
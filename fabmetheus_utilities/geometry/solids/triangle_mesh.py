@@ -19,6 +19,7 @@ from fabmetheus_utilities.vector3index import Vector3Index
 from fabmetheus_utilities import euclidean
 from fabmetheus_utilities import intercircle
 from fabmetheus_utilities import settings
+import gc
 import math
 
 
@@ -28,6 +29,9 @@ __date__ = '$Date: 2008/02/05 $'
 __license__ = 'GNU Affero General Public License http://www.gnu.org/licenses/agpl.html'
 
 
+globalSliceRotationTolerance = 1.0e-9
+
+
 def addEdgePair( edgePairTable, edges, faceEdgeIndex, remainingEdgeIndex, remainingEdgeTable ):
 	'Add edge pair to the edge pair table.'
 	if faceEdgeIndex == remainingEdgeIndex:
@@ -402,6 +406,19 @@ def getInsetPoint( loop, tinyRadius ):
 	midpointNormalized = midpoint / abs( midpoint )
 	return point + midpointNormalized * tinyRadius
 
+def getIsAroundLoopOutsideTriangle(begin, end, loop, triangle):
+	'Determine if the arc around the loop is entirely outside the triangle, only the points in the y range of the triangle can be inside.'
+	maximumY = max(triangle[0].imag, triangle[1].imag, triangle[2].imag)
+	minimumY = min(triangle[0].imag, triangle[1].imag, triangle[2].imag)
+	if end <= begin:
+		end += len(loop)
+	for pointIndex in xrange(begin, end):
+		point = loop[pointIndex % len(loop)]
+		if point.imag > minimumY and point.imag <= maximumY:
+			if euclidean.isPointInsideLoop(triangle, point):
+				return False
+	return True
+
 def getIsPathEntirelyOutsideTriangle(begin, center, end, vector3Path):
 	'Determine if a path is entirely outside another loop.'
 	loop = [begin.dropAxis(), center.dropAxis(), end.dropAxis()]
@@ -571,13 +588,17 @@ def getRemainingEdgeTable(edges, vertexes, z):
 
 def getRemainingLoopAddFace(faces, remainingLoop):
 	'Get the remaining loop and add face.'
+	remainingComplexLoop = []
+	for indexedVertex in remainingLoop:
+		remainingComplexLoop.append(indexedVertex.dropAxis())
 	for indexedVertexIndex, indexedVertex in enumerate(remainingLoop):
 		nextIndex = (indexedVertexIndex + 1) % len(remainingLoop)
 		previousIndex = (indexedVertexIndex + len(remainingLoop) - 1) % len(remainingLoop)
 		nextVertex = remainingLoop[nextIndex]
 		previousVertex = remainingLoop[previousIndex]
-		remainingPath = euclidean.getAroundLoop((indexedVertexIndex + 2) % len(remainingLoop), previousIndex, remainingLoop)
-		if len(remainingLoop) < 4 or getIsPathEntirelyOutsideTriangle(previousVertex, indexedVertex, nextVertex, remainingPath):
+		triangle = [remainingComplexLoop[previousIndex], remainingComplexLoop[indexedVertexIndex], remainingComplexLoop[nextIndex]]
+		aroundBeginIndex = (indexedVertexIndex + 2) % len(remainingLoop)
+		if len(remainingLoop) < 4 or getIsAroundLoopOutsideTriangle(aroundBeginIndex, previousIndex, remainingComplexLoop, triangle):
 			faceConvex = face.Face()
 			faceConvex.index = len(faces)
 			faceConvex.vertexIndexes.append(indexedVertex.index)
@@ -589,6 +610,16 @@ def getRemainingLoopAddFace(faces, remainingLoop):
 	print(remainingLoop)
 	return []
 
+def getReturnWithoutGarbageCollection(function, *arguments):
+	'Get the return value of the function called with the arguments, with the garbage collection disabled while the many small objects of a mesh are made.'
+	isGarbageCollectionEnabled = gc.isenabled()
+	gc.disable()
+	try:
+		return function(*arguments)
+	finally:
+		if isGarbageCollectionEnabled:
+			gc.enable()
+
 def getSharedFace( firstEdge, faces, secondEdge ):
 	'Get the face which is shared by two edges.'
 	for firstEdgeFaceIndex in firstEdge.faceIndexes:
@@ -597,6 +628,18 @@ def getSharedFace( firstEdge, faces, secondEdge ):
 				return faces[ firstEdgeFaceIndex ]
 	return None
 
+def getSliceRotationTranslation(tetragrid):
+	'Get the xy rotation, xy translation and z translation of a tetragrid which only rotates around and translates along the z axis, otherwise get None.'
+	tetragrid = matrix.getIdentityTetragrid(tetragrid)
+	if tetragrid[0][2] != 0.0 or tetragrid[1][2] != 0.0 or tetragrid[2][0] != 0.0 or tetragrid[2][1] != 0.0 or tetragrid[2][2] != 1.0:
+		return None
+	rotation = complex(tetragrid[0][0], tetragrid[1][0])
+	if abs(abs(rotation) - 1.0) > globalSliceRotationTolerance:
+		return None
+	if abs(tetragrid[1][1] - rotation.real) > globalSliceRotationTolerance or abs(tetragrid[0][1] + rotation.imag) > globalSliceRotationTolerance:
+		return None
+	return (rotation, complex(tetragrid[0][3], tetragrid[1][3]), tetragrid[2][3])
+
 def getSymmetricXLoop(path, vertexes, x):
 	'Get symmetrix x loop.'
 	loop = []
@@ -695,6 +738,12 @@ def processElementNode(elementNode):
 	'Process the xml element.'
 	evaluate.processArchivable(TriangleMesh, elementNode)
 
+def removeSliceTwins(triangleMeshes):
+	'Remove the slice twins and the slice loops of the triangle meshes.'
+	for triangleMesh in triangleMeshes:
+		triangleMesh.sliceLoopsDictionary = None
+		triangleMesh.sliceTwin = None
+
 def setEdgeMaximumMinimum(edge, vertexes):
 	'Set the edge maximum and minimum.'
 	beginIndex = edge.vertexIndexes[0]
@@ -710,6 +759,25 @@ def setEdgeMaximumMinimum(edge, vertexes):
 	edge.zMinimum = min(beginZ, endZ)
 	edge.zMaximum = max(beginZ, endZ)
 
+def setSliceTwins(triangleMeshes):
+	'Set the slice twin of each triangle mesh which is a rotated around and translated in the xy plane copy of an earlier triangle mesh.'
+	removeSliceTwins(triangleMeshes)
+	sliceSourceDictionary = {}
+	for triangleMesh in triangleMeshes:
+		if triangleMesh.elementNode == None:
+			continue
+		sliceRotationTranslation = getSliceRotationTranslation(triangleMesh.getMatrixChainTetragrid())
+		if sliceRotationTranslation == None:
+			continue
+		rotation, translation, zTranslation = sliceRotationTranslation
+		sliceKey = triangleMesh.getSliceKey(zTranslation)
+		if sliceKey in sliceSourceDictionary:
+			sliceSource, sourceRotation, sourceTranslation = sliceSourceDictionary[sliceKey]
+			triangleMesh.sliceTwin = SliceTwin(rotation * sourceRotation.conjugate(), sliceSource, sourceTranslation, translation)
+		else:
+			triangleMesh.sliceLoopsDictionary = {}
+			sliceSourceDictionary[sliceKey] = (triangleMesh, rotation, translation)
+
 def sortLoopsInOrderOfArea(isDescending, loops):
 	'Sort the loops in the order of area according isDescending.'
 	loops.sort(key=euclidean.getAreaLoopAbsolute, reverse=isDescending)
@@ -784,6 +852,30 @@ class FaceGenerator:
 		return betweenIndex
 
 
+class SliceTwin:
+	'A class to get the loops of a triangle mesh by rotating and translating the loops of an identical triangle mesh.'
+	def __init__(self, rotation, sliceSource, sourceTranslation, translation):
+		'Initialize.'
+		self.rotation = rotation
+		self.sliceSource = sliceSource
+		self.sourceTranslation = sourceTranslation
+		self.translation = translation
+
+	def __repr__(self):
+		'Get the string representation of this SliceTwin.'
+		return '%s, %s, %s' % (self.rotation, self.sourceTranslation, self.translation)
+
+	def getLoops(self, importRadius, z):
+		'Get the rotated and translated loops of the slice source.'
+		loops = []
+		for sourceLoop in self.sliceSource.getLoops(importRadius, z):
+			loop = []
+			for point in sourceLoop:
+				loop.append(self.rotation * (point - self.sourceTranslation) + self.translation)
+			loops.append(loop)
+		return loops
+
+
 class TriangleMesh( group.Group ):
 	'A triangle mesh.'
 	def __init__(self):
@@ -795,7 +887,10 @@ class TriangleMesh( group.Group ):
 		self.importCoarseness = 1.0
 		self.isCorrectMesh = True
 		self.loopLayers = []
+		self.numberOfFacesWithEdges = 0
 		self.oldChainTetragrid = None
+		self.sliceLoopsDictionary = None
+		self.sliceTwin = None
 		self.transformedVertexes = None
 		self.vertexes = []
 
@@ -843,8 +938,16 @@ class TriangleMesh( group.Group ):
 
 	def getLoops(self, importRadius, z):
 		'Get loops sliced through shape.'
-		self.importRadius = importRadius
-		return self.getLoopsFromMesh(z)
+		if self.sliceTwin != None:
+			return self.sliceTwin.getLoops(importRadius, z)
+		if self.sliceLoopsDictionary == None:
+			self.importRadius = importRadius
+			return self.getLoopsFromMesh(z)
+		sliceLoopsKey = (importRadius, z)
+		if sliceLoopsKey not in self.sliceLoopsDictionary:
+			self.importRadius = importRadius
+			self.sliceLoopsDictionary[sliceLoopsKey] = self.getLoopsFromMesh(z)
+		return self.sliceLoopsDictionary[sliceLoopsKey]
 
 	def getLoopsFromMesh( self, z ):
 		'Get loops from a carve of a mesh.'
@@ -870,6 +973,16 @@ class TriangleMesh( group.Group ):
 			self.cornerMinimum.minimize(point)
 		return self.cornerMinimum.z
 
+	def getSliceKey(self, zTranslation):
+		'Get the key of the untransformed vertexes, faces and z translation, which is the same for identical triangle meshes.'
+		vertexTuples = []
+		for vertex in self.vertexes:
+			vertexTuples.append((vertex.x, vertex.y, vertex.z))
+		faceTuples = []
+		for face in self.faces:
+			faceTuples.append(tuple(face.vertexIndexes))
+		return (self.isCorrectMesh, zTranslation, tuple(vertexTuples), tuple(faceTuples))
+
 	def getTransformedVertexes(self):
 		'Get all transformed vertexes.'
 		if self.elementNode == None:
@@ -906,10 +1019,11 @@ class TriangleMesh( group.Group ):
 		self.layerHeight = layerHeight
 
 	def setEdgesForAllFaces(self):
-		'Set the face edges of all the faces.'
+		'Set the face edges of all the faces, the faces are only appended so the faces before numberOfFacesWithEdges already have their edges.'
 		edgeTable = {}
-		for face in self.faces:
+		for face in self.faces[self.numberOfFacesWithEdges :]:
 			face.setEdgeIndexesToVertexIndexes( self.edges, edgeTable )
+		self.numberOfFacesWithEdges = len(self.faces)
 
 
 class ZoneArrangement:
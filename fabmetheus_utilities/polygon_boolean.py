@@ -0,0 +1,308 @@
+"""
+Polygon boolean is a collection of utilities to get the union, intersection and difference of lists of loops.
+
+The loop points are snapped to an integer grid with a spacing of one over globalIntegerMultiplier millimeters.  The segments of all the loops are swept in order of their minimum x, and each segment is split at the points where it crosses or overlaps another segment of the sweep.  Each split segment is then classified by whether the points just to its left and just to its right are inside the result of the operation, a point is inside a loop list if a ray from the point crosses the segments of the list an odd number of times.  Only the split segments which have the inside of the result on one side and the outside on the other are kept, directed so that the inside is on the left, and those segments are linked into the loops of the result.
+
+The crossing rays are only tested against the segments in the same band of y, so an operation on loops with n segments takes about n log n time when the loops do not cross many times.  Because the splitting and the classification are on the integer grid, loops which touch, share edges, or cross themselves do not need an import radius to be joined.
+
+The result loops are in descending order of area, the outer loops are widdershins and the hole loops are clockwise.
+
+"""
+
+from __future__ import absolute_import
+#Init has to be imported first because it has code to workaround the python bug where relative imports don't work if the module is imported as a main module.
+import __init__
+
+from fabmetheus_utilities import euclidean
+import heapq
+import math
+
+
+__author__ = 'agent (agent@local)'
+__date__ = '$Date: 2026/18/10 $'
+__license__ = 'GNU Affero General Public License http://www.gnu.org/licenses/agpl.html'
+
+
+globalIntegerMultiplier = 100000.0
+globalSideOffset = 0.25
+
+
+def addIntegerSegments(loop, loopListIndex, segments):
+	'Add the integer segments of the loop to the segments.'
+	integerLoop = []
+	for point in loop:
+		integerPoint = (int(round(point.real * globalIntegerMultiplier)), int(round(point.imag * globalIntegerMultiplier)))
+		if len(integerLoop) < 1 or integerPoint != integerLoop[-1]:
+			integerLoop.append(integerPoint)
+	while len(integerLoop) > 1 and integerLoop[0] == integerLoop[-1]:
+		del integerLoop[-1]
+	if len(integerLoop) < 3:
+		return
+	for pointIndex, begin in enumerate(integerLoop):
+		segments.append(BooleanSegment(begin, integerLoop[(pointIndex + 1) % len(integerLoop)], loopListIndex))
+
+def addSegmentIntersections(segment, otherSegment):
+	'Add the points where the segments cross or overlap to the split points of the segments.'
+	beginX, beginY = segment.begin
+	segmentX = segment.end[0] - beginX
+	segmentY = segment.end[1] - beginY
+	otherBeginX, otherBeginY = otherSegment.begin
+	otherX = otherSegment.end[0] - otherBeginX
+	otherY = otherSegment.end[1] - otherBeginY
+	betweenX = otherBeginX - beginX
+	betweenY = otherBeginY - beginY
+	denominator = segmentX * otherY - segmentY * otherX
+	if denominator == 0:
+		if betweenX * segmentY - betweenY * segmentX != 0:
+			return
+		segment.addSplitPointIfInside(otherSegment.begin)
+		segment.addSplitPointIfInside(otherSegment.end)
+		otherSegment.addSplitPointIfInside(segment.begin)
+		otherSegment.addSplitPointIfInside(segment.end)
+		return
+	segmentNumerator = betweenX * otherY - betweenY * otherX
+	otherNumerator = betweenX * segmentY - betweenY * segmentX
+	if denominator < 0:
+		denominator = -denominator
+		segmentNumerator = -segmentNumerator
+		otherNumerator = -otherNumerator
+	if segmentNumerator < 0 or segmentNumerator > denominator or otherNumerator < 0 or otherNumerator > denominator:
+		return
+	along = float(segmentNumerator) / float(denominator)
+	point = (int(round(beginX + along * segmentX)), int(round(beginY + along * segmentY)))
+	segment.addSplitPointIfInside(point)
+	otherSegment.addSplitPointIfInside(point)
+
+def getBooleanLoops(isInsideFunction, loopLists):
+	'Get the loops of the boolean operation, isInsideFunction gets whether a point is inside the result from whether it is inside each loop list.'
+	segments = []
+	for loopListIndex, loopList in enumerate(loopLists):
+		for loop in loopList:
+			addIntegerSegments(loop, loopListIndex, segments)
+	if len(segments) < 1:
+		return []
+	setSplitPoints(segments)
+	splitSegments = []
+	for segment in segments:
+		for begin, end in segment.getSplitPairs():
+			splitSegments.append(BooleanSegment(begin, end, segment.loopListIndex))
+	crossingTable = CrossingTable(len(loopLists), splitSegments)
+	endsDictionary = {}
+	undirectedSet = set()
+	for splitSegment in splitSegments:
+		begin = splitSegment.begin
+		end = splitSegment.end
+		undirectedKey = (min(begin, end), max(begin, end))
+		if undirectedKey in undirectedSet:
+			continue
+		undirectedSet.add(undirectedKey)
+		leftPoint, rightPoint = getSidePoints(begin, end)
+		isLeftInside = isInsideFunction(crossingTable.getInsides(leftPoint))
+		if isLeftInside == isInsideFunction(crossingTable.getInsides(rightPoint)):
+			continue
+		if not isLeftInside:
+			begin, end = end, begin
+		if begin in endsDictionary:
+			endsDictionary[begin].append(end)
+		else:
+			endsDictionary[begin] = [end]
+	loops = []
+	for integerLoop in getLinkedIntegerLoops(endsDictionary):
+		loop = []
+		for point in getIntegerLoopWithoutCollinear(integerLoop):
+			loop.append(complex(float(point[0]) / globalIntegerMultiplier, float(point[1]) / globalIntegerMultiplier))
+		if len(loop) > 2:
+			loops.append(loop)
+	loops.sort(key=euclidean.getAreaLoopAbsolute, reverse=True)
+	return loops
+
+def getDifferenceLoops(loopLists):
+	'Get the loops of the first loop list minus the other loop lists.'
+	return getBooleanLoops(getIsInsideDifference, loopLists)
+
+def getIntegerLoopWithoutCollinear(integerLoop):
+	'Get the integer loop without the points which are in the middle of a straight line.'
+	loopWithoutCollinear = []
+	for pointIndex, center in enumerate(integerLoop):
+		begin = integerLoop[pointIndex - 1]
+		end = integerLoop[(pointIndex + 1) % len(integerLoop)]
+		beginX = center[0] - begin[0]
+		beginY = center[1] - begin[1]
+		endX = end[0] - center[0]
+		endY = end[1] - center[1]
+		if beginX * endY - beginY * endX != 0 or beginX * endX + beginY * endY < 0:
+			loopWithoutCollinear.append(center)
+	return loopWithoutCollinear
+
+def getIntersectionLoops(loopLists):
+	'Get the loops of the intersection of the loop lists.'
+	return getBooleanLoops(getIsInsideIntersection, loopLists)
+
+def getIsInsideDifference(insides):
+	'Determine if the point is inside the first loop list and outside the others.'
+	if not insides[0]:
+		return False
+	return True not in insides[1 :]
+
+def getIsInsideIntersection(insides):
+	'Determine if the point is inside all the loop lists.'
+	return False not in insides
+
+def getIsInsideUnion(insides):
+	'Determine if the point is inside any of the loop lists.'
+	return True in insides
+
+def getLinkedIntegerLoops(endsDictionary):
+	'Get the closed integer loops by linking the directed segments, at a point with more than one outgoing segment the sharpest right turn is taken.'
+	integerLoops = []
+	for start in sorted(endsDictionary.keys()):
+		while len(endsDictionary[start]) > 0:
+			integerLoop = [start]
+			previous = start
+			current = endsDictionary[start].pop()
+			while current != start:
+				integerLoop.append(current)
+				if current not in endsDictionary or len(endsDictionary[current]) < 1:
+					integerLoop = []
+					break
+				ends = endsDictionary[current]
+				endIndex = getRightTurnIndex(previous, current, ends)
+				previous = current
+				current = ends[endIndex]
+				del ends[endIndex]
+			if len(integerLoop) > 2:
+				integerLoops.append(integerLoop)
+	return integerLoops
+
+def getRightTurnIndex(previous, current, ends):
+	'Get the index of the end which makes the sharpest right turn at the current point.'
+	if len(ends) == 1:
+		return 0
+	inX = current[0] - previous[0]
+	inY = current[1] - previous[1]
+	rightTurnIndex = 0
+	smallestAngle = 999.0
+	for endIndex, end in enumerate(ends):
+		outX = end[0] - current[0]
+		outY = end[1] - current[1]
+		angle = math.atan2(inX * outY - inY * outX, inX * outX + inY * outY)
+		if angle < smallestAngle:
+			rightTurnIndex = endIndex
+			smallestAngle = angle
+	return rightTurnIndex
+
+def getSidePoints(begin, end):
+	'Get the points just to the left and just to the right of the middle of the integer segment.'
+	segmentX = float(end[0] - begin[0])
+	segmentY = float(end[1] - begin[1])
+	multiplier = globalSideOffset / math.sqrt(segmentX * segmentX + segmentY * segmentY)
+	leftX = -segmentY * multiplier
+	leftY = segmentX * multiplier
+	centerX = 0.5 * float(begin[0] + end[0])
+	centerY = 0.5 * float(begin[1] + end[1])
+	return (centerX + leftX, centerY + leftY), (centerX - leftX, centerY - leftY)
+
+def getUnionLoops(loopLists):
+	'Get the loops of the union of the loop lists.'
+	return getBooleanLoops(getIsInsideUnion, loopLists)
+
+def setSplitPoints(segments):
+	'Set the split points of the segments by sweeping them in order of their minimum x.'
+	activeHeap = []
+	activeSegments = set()
+	for segment in sorted(segments, key=lambda segment: segment.minimumX):
+		while len(activeHeap) > 0 and activeHeap[0][0] < segment.minimumX:
+			activeSegments.discard(heapq.heappop(activeHeap)[1])
+		for activeSegment in activeSegments:
+			if activeSegment.maximumY >= segment.minimumY and activeSegment.minimumY <= segment.maximumY:
+				addSegmentIntersections(activeSegment, segment)
+		heapq.heappush(activeHeap, (segment.maximumX, segment))
+		activeSegments.add(segment)
+
+
+class BooleanSegment:
+	'A class to hold an integer segment of a loop list and the points where it is split.'
+	def __init__(self, begin, end, loopListIndex):
+		'Initialize.'
+		self.begin = begin
+		self.end = end
+		self.loopListIndex = loopListIndex
+		self.maximumX = max(begin[0], end[0])
+		self.maximumY = max(begin[1], end[1])
+		self.minimumX = min(begin[0], end[0])
+		self.minimumY = min(begin[1], end[1])
+		self.splitPoints = []
+
+	def __repr__(self):
+		'Get the string representation of this BooleanSegment.'
+		return '%s, %s, %s, %s' % (self.begin, self.end, self.loopListIndex, self.splitPoints)
+
+	def addSplitPointIfInside(self, point):
+		'Add the point to the split points if it is inside the segment bounding box and is not an end point.'
+		if point == self.begin or point == self.end:
+			return
+		if point[0] < self.minimumX or point[0] > self.maximumX or point[1] < self.minimumY or point[1] > self.maximumY:
+			return
+		segmentX = self.end[0] - self.begin[0]
+		segmentY = self.end[1] - self.begin[1]
+		if (point[0] - self.begin[0]) * segmentX + (point[1] - self.begin[1]) * segmentY <= 0:
+			return
+		self.splitPoints.append(point)
+
+	def getSplitPairs(self):
+		'Get the begin and end pairs of the segment split at the split points.'
+		if len(self.splitPoints) < 1:
+			return [(self.begin, self.end)]
+		segmentX = self.end[0] - self.begin[0]
+		segmentY = self.end[1] - self.begin[1]
+		alongPoints = []
+		for splitPoint in set(self.splitPoints):
+			alongPoints.append(((splitPoint[0] - self.begin[0]) * segmentX + (splitPoint[1] - self.begin[1]) * segmentY, splitPoint))
+		alongPoints.sort()
+		splitPairs = []
+		begin = self.begin
+		for along, splitPoint in alongPoints:
+			splitPairs.append((begin, splitPoint))
+			begin = splitPoint
+		splitPairs.append((begin, self.end))
+		return splitPairs
+
+
+class CrossingTable:
+	'A class to find whether a point is inside each loop list, by the number of segments crossed by a ray to the right of the point.'
+	def __init__(self, numberOfLoopLists, segments):
+		'Add the segments to the bands of y which they span.'
+		self.numberOfLoopLists = numberOfLoopLists
+		self.minimumY = min([segment.minimumY for segment in segments])
+		maximumY = max([segment.maximumY for segment in segments])
+		numberOfBands = max(1, len(segments) / 2)
+		self.bandHeight = max(1.0, float(maximumY - self.minimumY) / float(numberOfBands))
+		self.bands = []
+		for bandIndex in xrange(int(math.floor(float(maximumY - self.minimumY) / self.bandHeight)) + 1):
+			self.bands.append([])
+		for segment in segments:
+			if segment.minimumY == segment.maximumY:
+				continue
+			for bandIndex in xrange(self.getBandIndex(segment.minimumY), self.getBandIndex(segment.maximumY) + 1):
+				self.bands[bandIndex].append(segment)
+
+	def __repr__(self):
+		'Get the string representation of this CrossingTable.'
+		return '%s, %s, %s' % (self.numberOfLoopLists, self.bandHeight, len(self.bands))
+
+	def getBandIndex(self, y):
+		'Get the index of the band which holds the y.'
+		return max(0, min(len(self.bands) - 1, int(math.floor(float(y - self.minimumY) / self.bandHeight))))
+
+	def getInsides(self, point):
+		'Get the list of whether the point is inside each loop list.'
+		insides = [False] * self.numberOfLoopLists
+		x, y = point
+		for segment in self.bands[self.getBandIndex(y)]:
+			beginY = segment.begin[1]
+			endY = segment.end[1]
+			if (beginY > y) != (endY > y):
+				beginX = segment.begin[0]
+				if beginX + (y - beginY) * float(segment.end[0] - beginX) / float(endY - beginY) > x:
+					insides[segment.loopListIndex] = not insides[segment.loopListIndex]
+		return insides
@@ -45,6 +45,8 @@ globalSettingReplacements = {
 	'Location Wipe Y (mm):' : 'Wipe Y (mm):',
 	'Location Wipe Z (mm):' : 'Wipe Z (mm):'
 	}
+globalLayerProgressListener = None
+globalReadRepositoryCache = {}
 globalSpreadsheetSeparator = '\t'
 globalTemporaryOverrides = {}
 
@@ -116,6 +118,14 @@ def addPluginsToMenu( directoryPath, menu, pluginFileNames ):
 	for pluginFileName in pluginFileNames:
 		ToolDialog().addPluginToMenu( menu, os.path.join( directoryPath, pluginFileName ) )
 
+def addRepositoryToReadCache(profilesPath, repository):
+	'Add the setting values of the read repository to the read repository cache.'
+	valueTable = {}
+	for setting in repository.preferences:
+		if hasattr(setting, 'value'):
+			valueTable[setting.name] = getCopiedValue(setting.value)
+	globalReadRepositoryCache[profilesPath] = (getReadCacheStamps(profilesPath, repository), valueTable)
+
 def cancelRepository(repository):
 	"Read the repository then set all the entities to the read repository values."
 	getReadRepository(repository)
@@ -186,6 +196,12 @@ def getAlterationLines(fileName):
 	"Get the text lines from the fileName in the alterations directories."
 	return archive.getTextLines(getAlterationFile(fileName))
 
+def getCopiedValue(value):
+	'Get a copy of the value if it is a list, otherwise the value.'
+	if value.__class__ == list:
+		return value[:]
+	return value
+
 def getDisplayedDialogFromConstructor(repository):
 	"Display the repository dialog."
 	try:
@@ -294,9 +310,30 @@ def getRadioPluginsAddPluginFrame( directoryPath, importantFileNames, names, rep
 	repository.pluginFrame.getFromPath( defaultRadioButton, directoryPath, repository )
 	return radioPlugins
 
+def getReadCacheStamps(profilesPath, repository):
+	'Get the modification time and size stamps of the profile files which the repository is read from.'
+	fileNames = [profilesPath]
+	if repository.baseNameSynonym != None:
+		fileNames.append(archive.getProfilesPath(getProfileName(repository.baseNameSynonym, repository)))
+	if repository.baseNameSynonymDictionary != None:
+		for synonymBaseName in sorted(repository.baseNameSynonymDictionary.values()):
+			fileNames.append(archive.getProfilesPath(getProfileName(synonymBaseName, repository)))
+	stamps = []
+	for fileName in fileNames:
+		try:
+			fileStat = os.stat(fileName)
+			stamps.append((fileName, fileStat.st_mtime, fileStat.st_size))
+		except OSError:
+			stamps.append((fileName, None, None))
+	return stamps
+
 def getReadRepository(repository):
-	"Read and return settings from a file."
-	text = archive.getFileText(archive.getProfilesPath(getProfileBaseName(repository)), False)
+	"Read and return settings from a file, or from the read repository cache if the profile files have not changed."
+	profilesPath = archive.getProfilesPath(getProfileBaseName(repository))
+	if setRepositoryToReadCache(profilesPath, repository):
+		temporaryApplyOverrides(repository)
+		return repository
+	text = archive.getFileText(profilesPath, False)
 	if text == '':
 		if repository.baseNameSynonym != None:
 			text = archive.getFileText(archive.getProfilesPath(getProfileName(repository.baseNameSynonym, repository)), False)
@@ -309,6 +346,7 @@ def getReadRepository(repository):
 		temporaryApplyOverrides(repository)
 		return repository
 	readSettingsFromText(repository, text)
+	addRepositoryToReadCache(profilesPath, repository)
 	temporaryApplyOverrides(repository)
 	return repository
 
@@ -449,10 +487,14 @@ def openWebPage( webPagePath ):
 
 def printProgress(layerIndex, procedureName):
 	"Print layerIndex followed by a carriage return."
+	if globalLayerProgressListener != None:
+		globalLayerProgressListener.startLayer(layerIndex)
 	printProgressByString('%s layer count %s...' % (procedureName.capitalize(), layerIndex + 1))
 
 def printProgressByNumber(layerIndex, numberOfLayers, procedureName):
 	"Print layerIndex and numberOfLayers followed by a carriage return."
+	if globalLayerProgressListener != None:
+		globalLayerProgressListener.startLayer(layerIndex)
 	printProgressByString('%s layer count %s of %s...' % (procedureName.capitalize(), layerIndex + 1, numberOfLayers))
 
 def printProgressByString(progressString):
@@ -562,6 +604,26 @@ def setRepositoryToLine(lineIndex, lines, shortDictionary):
 			shortDictionary[shortDictionaryKey].setValueToSplitLine(lineIndex, lines, splitLine)
 			return
 
+def setRepositoryToReadCache(profilesPath, repository):
+	'Set the repository to the cached setting values and return true if the profile files have not changed since they were read, otherwise return false.'
+	if profilesPath not in globalReadRepositoryCache:
+		return False
+	stamps, valueTable = globalReadRepositoryCache[profilesPath]
+	if stamps != getReadCacheStamps(profilesPath, repository):
+		del globalReadRepositoryCache[profilesPath]
+		return False
+	valueSettings = []
+	for setting in repository.preferences:
+		if hasattr(setting, 'value'):
+			if setting.name not in valueTable:
+				return False
+			valueSettings.append(setting)
+	if len(valueSettings) != len(valueTable):
+		return False
+	for setting in valueSettings:
+		setting.value = getCopiedValue(valueTable[setting.name])
+	return True
+
 def setSpinColor( setting ):
 	"Set the spin box color to the value, yellow if it is lower than the default and blue if it is higher."
 	if setting.entry == None:
@@ -610,6 +672,9 @@ def temporaryAddPreferenceOverride(module, name, value):
 	if not module in globalTemporaryOverrides:
 		globalTemporaryOverrides[module] = {}
 	globalTemporaryOverrides[module][name] = value
+	globalReadRepositoryCache.clear()
+	from skeinforge_application.skeinforge_utilities import skeinforge_profile
+	skeinforge_profile.globalProfileDirectoryCache.clear()
 	print('OVERRIDE %s %s %s' % (module,name,value))
 	print(globalTemporaryOverrides[module])
 
@@ -622,7 +687,7 @@ def temporaryApplyOverrides(repository):
 		settingTable = {}
 		for setting in repository.preferences:
 			settingTable[ setting.name ] = setting
-		for (name, value) in overrides[repository.baseName].items():
+		for (name, value) in globalTemporaryOverrides[repository.baseName].items():
 			if name in settingTable:
 				settingTable[name].setValueToString(value)
 			else:
@@ -633,6 +698,8 @@ def writeSettings(repository):
 	profilesDirectoryPath = archive.getProfilesPath(getProfileBaseName(repository))
 	archive.makeDirectory(os.path.dirname(profilesDirectoryPath))
 	archive.writeFileText(profilesDirectoryPath, getRepositoryText(repository))
+	if profilesDirectoryPath in globalReadRepositoryCache:
+		del globalReadRepositoryCache[profilesDirectoryPath]
 	for setting in repository.preferences:
 		setting.updateSaveListeners()
 
@@ -0,0 +1,409 @@
+"""
+Skein binary is a collection of utilities to read and write the compact binary skein format.
+
+The skein binary format is a lossless container for crafted gcode.  Movement and point lines whose numbers round trip through float32 are stored as typed move records, every other line is stored once in a string table and referenced by index.  So a file can be converted to the binary format and back without changing a line, while the moves can be read without tokenizing the text.
+
+==Record structure==
+The file starts with the four byte magic 'SKNB' and a version byte, followed by the records.  All numbers are little endian.
+
+Line record:
+'L', uint32 index into the string table
+
+Move record:
+'M', uint8 segment type, uint16 index into the layout table, one float32 for each word of the layout
+
+The segment type is the index in globalSegmentTypes; it is travel when the extruder is off, otherwise it is the innermost open edge, loop, infill, skirt, raftPerimeter or supportLayer tag.  A layout is the first word followed by each letter and number of decimal places and, for point tags, the end tag, for example 'G1 X3 Y3 Z1 F1' or '(<boundaryPoint> X3 Y3 Z1 </boundaryPoint>)'.
+
+After the records come the string table, the layout table and the layer table, each starting with a uint32 count.  The strings are uint32 length prefixed, the layouts are uint16 length prefixed and each layer is a uint32 record offset, a float32 z and a uint32 move count.  The file ends with the uint32 offset of the string table and the four byte magic 'SKNE'.
+
+"""
+
+from __future__ import absolute_import
+#Init has to be imported first because it has code to workaround the python bug where relative imports don't work if the module is imported as a main module.
+import __init__
+
+from fabmetheus_utilities import archive
+from fabmetheus_utilities import euclidean
+from struct import Struct
+import array
+import cStringIO
+import sys
+
+
+__author__ = 'agent (agent@local)'
+__date__ = '$Date: 2026/18/10 $'
+__license__ = 'GNU Affero General Public License http://www.gnu.org/licenses/agpl.html'
+
+
+globalEndMagic = 'SKNE'
+globalFileExtension = 'skein'
+globalFloatStruct = Struct('<f')
+globalLayerStruct = Struct('<IfI')
+globalLengthStruct = Struct('<I')
+globalLineStruct = Struct('<cI')
+globalMagic = 'SKNB'
+globalMoveLetters = 'XYZFEIJR'
+globalMoveStruct = Struct('<cBH')
+globalMoveWords = ['G0', 'G1', 'G2', 'G3']
+globalPointWords = ['(<boundaryPoint>', '(<infillPoint>', '(<raftPoint>']
+globalSegmentTags = ['edge', 'loop', 'infill', 'skirt', 'raftPerimeter', 'supportLayer']
+globalSegmentTypes = ['travel', 'extrusion'] + globalSegmentTags
+globalShortLengthStruct = Struct('<H')
+globalTrailerStruct = Struct('<I4s')
+globalVersion = 1
+
+
+def getBinaryText(gcodeText):
+	'Get the skein binary text from the gcode text.'
+	return SkeinBinaryWriter().getBinaryText(gcodeText)
+
+def getFloat32(number):
+	'Get the number as it would be after being stored as a float32.'
+	return globalFloatStruct.unpack(globalFloatStruct.pack(number))[0]
+
+def getGcodeText(binaryText):
+	'Get the gcode text from the skein binary text.'
+	return SkeinBinaryReader().getFromBinaryText(binaryText).getGcodeText()
+
+def getGcodeTextFromFile(fileName):
+	'Get the gcode text from a skein binary file.'
+	binaryText = archive.getFileText(fileName, True, 'rb')
+	if not isSkeinBinary(binaryText):
+		return ''
+	return getGcodeText(binaryText)
+
+def getLayoutWordsNumbers(line):
+	'Get the layout words and numbers of a movement line, return None if the line can not be stored losslessly as a move.'
+	splitLine = line.split(' ')
+	if len(splitLine) < 2:
+		return None
+	firstWord = splitLine[0]
+	layoutWords = [firstWord]
+	numberWords = splitLine[1 :]
+	if firstWord in globalPointWords:
+		endWord = '</%s)' % firstWord[2 :]
+		if numberWords[-1] != endWord:
+			return None
+		numberWords = numberWords[: -1]
+	elif firstWord not in globalMoveWords:
+		return None
+	numbers = []
+	for word in numberWords:
+		if len(word) < 3 or word[0] not in globalMoveLetters:
+			return None
+		dotIndex = word.find('.')
+		if dotIndex < 0:
+			return None
+		decimalPlaces = len(word) - dotIndex - 1
+		try:
+			number = getFloat32(float(word[1 :]))
+		except ValueError:
+			return None
+		if euclidean.getRoundedToPlacesString(decimalPlaces, number) != word[1 :]:
+			return None
+		layoutWords.append(word[0] + str(decimalPlaces))
+		numbers.append(number)
+	if firstWord in globalPointWords:
+		layoutWords.append(splitLine[-1])
+	return ' '.join(layoutWords), numbers
+
+def getLittleEndianFloatArray(floatText):
+	'Get the float32 array from the little endian float32 text.'
+	floatArray = array.array('f', floatText)
+	if sys.byteorder == 'big':
+		floatArray.byteswap()
+	return floatArray
+
+def getLittleEndianFloatText(numbers):
+	'Get the little endian float32 text of the numbers.'
+	floatArray = array.array('f', numbers)
+	if sys.byteorder == 'big':
+		floatArray.byteswap()
+	return floatArray.tostring()
+
+def getSkeinBinaryReader(fileName):
+	'Get the skein binary reader of a skein binary file.'
+	return SkeinBinaryReader().getFromBinaryText(archive.getFileText(fileName, True, 'rb'))
+
+def isSkeinBinary(text):
+	'Determine if the text is in the skein binary format.'
+	return text.startswith(globalMagic)
+
+def isSkeinBinaryFileName(fileName):
+	'Determine if the file name has the skein binary extension.'
+	return fileName.endswith('.' + globalFileExtension)
+
+def writeBinaryFile(fileName, gcodeText):
+	'Write the gcode text to a skein binary file.'
+	archive.writeFileText(fileName, getBinaryText(gcodeText), 'wb+')
+
+
+class SkeinBinaryLayer:
+	'A class to hold the location of a layer in the skein binary.'
+	def __init__(self, moveCount, recordIndex, z):
+		'Initialize.'
+		self.moveCount = moveCount
+		self.recordIndex = recordIndex
+		self.z = z
+
+	def __repr__(self):
+		'Get the string representation of this layer.'
+		return '%s, %s, %s' % (self.recordIndex, self.z, self.moveCount)
+
+
+class SkeinBinaryReader:
+	'A class to read the records of a skein binary.'
+	def getFromBinaryText(self, binaryText):
+		'Read the tables of the skein binary text.'
+		self.binaryText = binaryText
+		self.layers = []
+		self.layouts = []
+		self.strings = []
+		if len(binaryText) < len(globalMagic) + 1 + globalTrailerStruct.size or not isSkeinBinary(binaryText):
+			print('Warning, the text is not in the skein binary format in getFromBinaryText in skein_binary.')
+			self.recordsEnd = 0
+			return self
+		self.version = ord(binaryText[len(globalMagic)])
+		if self.version > globalVersion:
+			print('Warning, the skein binary version %s is newer than the readable version %s.' % (self.version, globalVersion))
+		self.recordsEnd, endMagic = globalTrailerStruct.unpack_from(binaryText, len(binaryText) - globalTrailerStruct.size)
+		if endMagic != globalEndMagic:
+			print('Warning, the skein binary is truncated in getFromBinaryText in skein_binary.')
+			self.recordsEnd = 0
+			return self
+		tableIndex = self.recordsEnd
+		stringCount = globalLengthStruct.unpack_from(binaryText, tableIndex)[0]
+		tableIndex += globalLengthStruct.size
+		for stringIndex in xrange(stringCount):
+			stringLength = globalLengthStruct.unpack_from(binaryText, tableIndex)[0]
+			tableIndex += globalLengthStruct.size
+			self.strings.append(binaryText[tableIndex : tableIndex + stringLength])
+			tableIndex += stringLength
+		layoutCount = globalLengthStruct.unpack_from(binaryText, tableIndex)[0]
+		tableIndex += globalLengthStruct.size
+		for layoutIndex in xrange(layoutCount):
+			layoutLength = globalShortLengthStruct.unpack_from(binaryText, tableIndex)[0]
+			tableIndex += globalShortLengthStruct.size
+			layout = binaryText[tableIndex : tableIndex + layoutLength]
+			tableIndex += layoutLength
+			self.layouts.append(SkeinBinaryLayout(layout))
+		layerCount = globalLengthStruct.unpack_from(binaryText, tableIndex)[0]
+		tableIndex += globalLengthStruct.size
+		for layerIndex in xrange(layerCount):
+			recordIndex, z, moveCount = globalLayerStruct.unpack_from(binaryText, tableIndex)
+			self.layers.append(SkeinBinaryLayer(moveCount, recordIndex, z))
+			tableIndex += globalLayerStruct.size
+		return self
+
+	def getGcodeText(self):
+		'Get the gcode text of all the records.'
+		return self.getRecordsGcodeText(len(globalMagic) + 1, self.recordsEnd)
+
+	def getLayerGcodeText(self, layerIndex):
+		'Get the gcode text of a layer, from the layer line until the next layer line.'
+		return self.getRecordsGcodeText(self.layers[layerIndex].recordIndex, self.getLayerRecordEnd(layerIndex))
+
+	def getLayerRecordEnd(self, layerIndex):
+		'Get the index after the last record of the layer.'
+		if layerIndex + 1 < len(self.layers):
+			return self.layers[layerIndex + 1].recordIndex
+		return self.recordsEnd
+
+	def getLayersText(self, layerBegin, layerEnd):
+		'Get the gcode text before the first layer, followed by the gcode text of the layers from layerBegin up to but not including layerEnd.'
+		if self.recordsEnd == 0:
+			return ''
+		layerBegin = max(0, layerBegin)
+		layerEnd = min(layerEnd, len(self.layers))
+		headerEnd = self.recordsEnd
+		if len(self.layers) > 0:
+			headerEnd = self.layers[0].recordIndex
+		layersText = self.getRecordsGcodeText(len(globalMagic) + 1, headerEnd)
+		if layerBegin < layerEnd:
+			layersText += self.getRecordsGcodeText(self.layers[layerBegin].recordIndex, self.getLayerRecordEnd(layerEnd - 1))
+		return layersText
+
+	def getLineRecordIndex(self, recordIndex):
+		'Get the gcode line of the record and the index of the next record.'
+		recordType = self.binaryText[recordIndex]
+		if recordType == 'L':
+			stringIndex = globalLineStruct.unpack_from(self.binaryText, recordIndex)[1]
+			return self.strings[stringIndex], recordIndex + globalLineStruct.size
+		segmentTypeIndex, layout, numbers, nextRecordIndex = self.getMoveRecordIndex(recordIndex)
+		return layout.getLine(numbers), nextRecordIndex
+
+	def getMoveRecordIndex(self, recordIndex):
+		'Get the segment type index, layout and numbers of the move record and the index of the next record.'
+		recordType, segmentTypeIndex, layoutIndex = globalMoveStruct.unpack_from(self.binaryText, recordIndex)
+		if recordType != 'M':
+			print('Warning, the record type %s is not known in getMoveRecordIndex in skein_binary.' % recordType)
+		layout = self.layouts[layoutIndex]
+		numbersBegin = recordIndex + globalMoveStruct.size
+		numbersEnd = numbersBegin + 4 * len(layout.letters)
+		numbers = getLittleEndianFloatArray(self.binaryText[numbersBegin : numbersEnd])
+		return segmentTypeIndex, layout, numbers, numbersEnd
+
+	def getRecordsGcodeText(self, recordIndex, recordEnd):
+		'Get the gcode text of the records from recordIndex up to but not including recordEnd.'
+		output = cStringIO.StringIO()
+		while recordIndex < recordEnd:
+			line, recordIndex = self.getLineRecordIndex(recordIndex)
+			output.write(line + '\n')
+		return output.getvalue()
+
+	def getSegments(self, layerIndex):
+		'Get the typed segments of a layer, each is a segment type name and a float32 array of the x, y, z coordinates of the moves, starting from the end of the previous segment.'
+		recordIndex = self.layers[layerIndex].recordIndex
+		recordEnd = self.getLayerRecordEnd(layerIndex)
+		location = [0.0, 0.0, self.layers[layerIndex].z]
+		segments = []
+		segmentTypeIndex = None
+		while recordIndex < recordEnd:
+			if self.binaryText[recordIndex] == 'L':
+				recordIndex += globalLineStruct.size
+				continue
+			moveSegmentTypeIndex, layout, numbers, recordIndex = self.getMoveRecordIndex(recordIndex)
+			if not layout.hasLocation:
+				continue
+			if moveSegmentTypeIndex != segmentTypeIndex:
+				segmentTypeIndex = moveSegmentTypeIndex
+				segmentCoordinates = array.array('f')
+				if len(segments) > 0:
+					segmentCoordinates.extend(location)
+				segments.append((globalSegmentTypes[segmentTypeIndex], segmentCoordinates))
+			layout.setLocation(location, numbers)
+			segments[-1][1].extend(location)
+		return segments
+
+
+class SkeinBinaryLayout:
+	'A class to hold the first word, letters, decimal places and end word of a move record.'
+	def __init__(self, layout):
+		'Initialize.'
+		layoutWords = layout.split(' ')
+		self.decimalPlacesList = []
+		self.endWords = []
+		self.firstWord = layoutWords[0]
+		self.letters = []
+		if self.firstWord in globalPointWords:
+			self.endWords = layoutWords[-1 :]
+			layoutWords = layoutWords[: -1]
+		for layoutWord in layoutWords[1 :]:
+			self.letters.append(layoutWord[0])
+			self.decimalPlacesList.append(int(layoutWord[1 :]))
+		self.hasLocation = self.firstWord in globalMoveWords and ('X' in self.letters or 'Y' in self.letters or 'Z' in self.letters)
+
+	def __repr__(self):
+		'Get the string representation of this layout.'
+		words = [self.firstWord]
+		for letterIndex, letter in enumerate(self.letters):
+			words.append(letter + str(self.decimalPlacesList[letterIndex]))
+		return ' '.join(words + self.endWords)
+
+	def getLine(self, numbers):
+		'Get the gcode line from the numbers.'
+		words = [self.firstWord]
+		for letterIndex, letter in enumerate(self.letters):
+			words.append(letter + euclidean.getRoundedToPlacesString(self.decimalPlacesList[letterIndex], numbers[letterIndex]))
+		return ' '.join(words + self.endWords)
+
+	def setLocation(self, location, numbers):
+		'Set the x, y, z location list from the numbers.'
+		for letterIndex, letter in enumerate(self.letters):
+			if letter == 'X':
+				location[0] = numbers[letterIndex]
+			elif letter == 'Y':
+				location[1] = numbers[letterIndex]
+			elif letter == 'Z':
+				location[2] = numbers[letterIndex]
+
+
+class SkeinBinaryWriter:
+	'A class to write gcode text in the skein binary format.'
+	def __init__(self):
+		'Initialize.'
+		self.isExtruderActive = False
+		self.layers = []
+		self.layoutDictionary = {}
+		self.layouts = []
+		self.output = cStringIO.StringIO()
+		self.segmentTagStack = []
+		self.stringDictionary = {}
+		self.strings = []
+
+	def addLine(self, line):
+		'Add a gcode line as a line or move record.'
+		layoutWordsNumbers = getLayoutWordsNumbers(line)
+		if layoutWordsNumbers == None:
+			self.addLineRecord(line)
+			return
+		layout, numbers = layoutWordsNumbers
+		if layout not in self.layoutDictionary:
+			self.layoutDictionary[layout] = len(self.layouts)
+			self.layouts.append(SkeinBinaryLayout(layout))
+		layoutIndex = self.layoutDictionary[layout]
+		self.output.write(globalMoveStruct.pack('M', self.getSegmentTypeIndex(), layoutIndex))
+		self.output.write(getLittleEndianFloatText(numbers))
+		if len(self.layers) > 0 and self.layouts[layoutIndex].hasLocation:
+			self.layers[-1].moveCount += 1
+
+	def addLineRecord(self, line):
+		'Add a line record and update the extruder and tag state.'
+		splitLine = line.split()
+		firstWord = ''
+		if len(splitLine) > 0:
+			firstWord = splitLine[0]
+		if firstWord == 'M101':
+			self.isExtruderActive = True
+		elif firstWord == 'M103':
+			self.isExtruderActive = False
+		elif firstWord == '(<layer>' and len(splitLine) > 1:
+			self.layers.append(SkeinBinaryLayer(0, self.output.tell(), float(splitLine[1])))
+		elif firstWord.startswith('(</'):
+			tagName = firstWord[3 :].replace('>', '').replace(')', '')
+			if tagName in self.segmentTagStack:
+				self.segmentTagStack.reverse()
+				self.segmentTagStack.remove(tagName)
+				self.segmentTagStack.reverse()
+		elif firstWord.startswith('(<'):
+			tagName = firstWord[2 :].replace('>', '').replace(')', '')
+			if tagName in globalSegmentTags:
+				self.segmentTagStack.append(tagName)
+		if line not in self.stringDictionary:
+			self.stringDictionary[line] = len(self.strings)
+			self.strings.append(line)
+		self.output.write(globalLineStruct.pack('L', self.stringDictionary[line]))
+
+	def addTables(self):
+		'Add the string, layout and layer tables and the trailer.'
+		recordsEnd = self.output.tell()
+		self.output.write(globalLengthStruct.pack(len(self.strings)))
+		for string in self.strings:
+			self.output.write(globalLengthStruct.pack(len(string)))
+			self.output.write(string)
+		self.output.write(globalLengthStruct.pack(len(self.layouts)))
+		for layout in self.layouts:
+			layoutString = str(layout)
+			self.output.write(globalShortLengthStruct.pack(len(layoutString)))
+			self.output.write(layoutString)
+		self.output.write(globalLengthStruct.pack(len(self.layers)))
+		for layer in self.layers:
+			self.output.write(globalLayerStruct.pack(layer.recordIndex, layer.z, layer.moveCount))
+		self.output.write(globalTrailerStruct.pack(recordsEnd, globalEndMagic))
+
+	def getBinaryText(self, gcodeText):
+		'Get the skein binary text from the gcode text.'
+		self.output.write(globalMagic + chr(globalVersion))
+		for line in archive.getTextLines(gcodeText):
+			if line != '':
+				self.addLine(line)
+		self.addTables()
+		return self.output.getvalue()
+
+	def getSegmentTypeIndex(self):
+		'Get the index of the current segment type.'
+		if not self.isExtruderActive:
+			return 0
+		if len(self.segmentTagStack) == 0:
+			return 1
+		return globalSegmentTypes.index(self.segmentTagStack[-1])
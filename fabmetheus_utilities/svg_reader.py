@@ -844,6 +844,8 @@ class SVGReader:
 	"An svg carving."
 	def __init__(self):
 		"Add empty lists."
+		self.commentElement = None
+		self.documentElement = None
 		self.loopLayers = []
 		self.sliceDictionary = None
 		self.stopProcessing = False
@@ -876,8 +878,20 @@ class SVGReader:
 			print('Warning, documentElement was None in parseSVG in SVGReader, so nothing will be done for:')
 			print(fileName)
 			return
+		self.commentElement = svg_writer.getCommentElement(self.documentElement)
 		self.parseSVGByElementNode(self.documentElement)
 
+	def parseSVGByHandoffOrText(self, fileName, svgText):
+		"Take the layers from the svg handoff if the svg text was made in this process, otherwise parse the svg text."
+		svgHandoff = svg_writer.getSVGHandoff(svgText)
+		if svgHandoff == None:
+			self.parseSVG(fileName, svgText)
+			return
+		self.commentElement = svgHandoff.commentElement
+		self.fileName = fileName
+		self.loopLayers = svgHandoff.loopLayers
+		self.sliceDictionary = svgHandoff.sliceDictionary
+
 	def parseSVGByElementNode(self, elementNode):
 		"Parse SVG by elementNode."
 		self.sliceDictionary = svg_writer.getSliceDictionary(elementNode)
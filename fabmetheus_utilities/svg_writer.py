@@ -3,6 +3,8 @@ Svg_writer is a class and collection of utilities to read from and write to an s
 
 Svg_writer uses the layer_template.svg file in the templates folder in the same folder as svg_writer, to output an svg file.
 
+When the svg writer makes an svg text, it also keeps the loop layers rounded the way they are written, the slice dictionary and the original xml comment as the svg handoff.  When the next tool in the same process gets that same svg text, the svg reader takes the handoff instead of parsing the svg text back into the loop layers.
+
 """
 
 from __future__ import absolute_import
@@ -28,6 +30,7 @@ __license__ = 'GNU Affero General Public License http://www.gnu.org/licenses/agp
 
 
 globalOriginalTextString = '<!-- Original XML Text:\n'
+globalSVGHandoff = None
 
 
 def getCarving(fileName):
@@ -77,9 +80,22 @@ def getSVGByLoopLayers(addLayerTemplateToSVG, carving, loopLayers):
 		carving.getCarveLayerHeight())
 	return svgWriter.getReplacedSVGTemplate(carving.fileName, loopLayers, 'basic', carving.getFabmetheusXML())
 
+def getSVGHandoff(svgText):
+	'Get the svg handoff and clear it, or None if the svg text was not the last svg text made in this process.'
+	global globalSVGHandoff
+	svgHandoff = globalSVGHandoff
+	globalSVGHandoff = None
+	if svgHandoff == None or svgHandoff.svgText is not svgText:
+		return None
+	return svgHandoff
+
 def getTruncatedRotatedBoundaryLayers(loopLayers, repository):
-	'Get the truncated rotated boundary layers.'
-	return loopLayers[repository.layersFrom.value : repository.layersTo.value]
+	'Get the truncated rotated boundary layers, and set the loops of the layers which are decoded on demand, like those of an slc file.'
+	truncatedRotatedBoundaryLayers = loopLayers[repository.layersFrom.value : repository.layersTo.value]
+	for loopLayer in truncatedRotatedBoundaryLayers:
+		if hasattr(loopLayer, 'setLoops'):
+			loopLayer.setLoops()
+	return truncatedRotatedBoundaryLayers
 
 def setSVGCarvingCorners(cornerMaximum, cornerMinimum, layerHeight, loopLayers):
 	'Parse SVG text and store the layers.'
@@ -94,6 +110,20 @@ def setSVGCarvingCorners(cornerMaximum, cornerMinimum, layerHeight, loopLayers):
 	cornerMinimum.z -= halfLayerThickness
 
 
+class SVGHandoff:
+	'A class to hand the loop layers of an svg text to the next tool in the same process.'
+	def __init__(self, commentElement, loopLayers, sliceDictionary, svgText):
+		'Initialize.'
+		self.commentElement = commentElement
+		self.loopLayers = loopLayers
+		self.sliceDictionary = sliceDictionary
+		self.svgText = svgText
+
+	def __repr__(self):
+		'Get the string representation of this svg handoff.'
+		return '%s, %s' % (self.sliceDictionary, self.loopLayers)
+
+
 class SVGWriter:
 	'A base class to get an svg skein from a carving.'
 	def __init__(self,
@@ -109,6 +139,7 @@ class SVGWriter:
 		self.cornerMinimum = cornerMinimum
 		self.decimalPlacesCarried = decimalPlacesCarried
 		self.edgeWidth = edgeWidth
+		self.handoffLoopLayers = []
 		self.layerHeight = layerHeight
 		self.textHeight = 22.5
 		self.unitScale = 3.7
@@ -143,6 +174,7 @@ class SVGWriter:
 		else:
 			del self.pathDictionary['transform']
 		self.pathDictionary['d'] = self.getSVGStringForLoops(loopLayer.loops)
+		self.handoffLoopLayers.append(self.getRoundedLoopLayer(loopLayer))
 
 	def addOriginalAsComment(self, elementNode):
 		'Add original elementNode as a comment.'
@@ -221,12 +253,25 @@ class SVGWriter:
 			self.svgElement.getElementNodeByID('controls').removeFromIDNameParent()
 		self.graphicsElementNode.removeFromIDNameParent()
 		self.addOriginalAsComment(elementNode)
-		return documentNode.__repr__()
+		svgText = documentNode.__repr__()
+		global globalSVGHandoff
+		globalSVGHandoff = SVGHandoff(getCommentElement(self.svgElement), self.handoffLoopLayers, self.sliceDictionary.copy(), svgText)
+		return svgText
 
 	def getRounded(self, number):
 		'Get number rounded to the number of carried decimal places as a string.'
 		return euclidean.getRoundedToPlacesString(self.decimalPlacesCarried, number)
 
+	def getRoundedLoopLayer(self, loopLayer):
+		'Get the loop layer with the coordinates rounded as they are written, which are the coordinates the svg reader would read.'
+		roundedLoopLayer = euclidean.LoopLayer(float(self.getRounded(loopLayer.z)))
+		for loop in loopLayer.loops:
+			roundedLoop = []
+			for point in loop:
+				roundedLoop.append(complex(float(self.getRounded(point.real)), float(self.getRounded(point.imag))))
+			roundedLoopLayer.loops.append(roundedLoop)
+		return roundedLoopLayer
+
 	def getRoundedComplexString(self, point):
 		'Get the rounded complex string.'
 		return self.getRounded( point.real ) + ' ' + self.getRounded( point.imag )
@@ -3,6 +3,8 @@ The xml_simple_reader.py script is an xml parser that can parse a line separated
 
 This xml parser will read a line seperated xml text and produce a tree of the xml with a document element.  Each element can have an attribute table, childNodes, a class name, parentNode, text and a link to the document element.
 
+The text is parsed by the expat parser of the standard library, which is written in C, when expat reads the text the same way as the character by character monad parser.  The ampersands are escaped before expat reads the text, so the character entities are left as they are, like the monad parser does.  When the text has carriage returns, a document type declaration or whitespace characters in attribute values, which expat would change, or when expat can not parse the text, the monad parser is used.
+
 This example gets an xml tree for the xml file boolean.xml.  This example is run in a terminal in the folder which contains boolean.xml and xml_simple_reader.py.
 
 
@@ -38,6 +40,12 @@ from fabmetheus_utilities import archive
 from fabmetheus_utilities import euclidean
 from fabmetheus_utilities import xml_simple_writer
 import cStringIO
+import re
+try:
+	# pyexpat is imported directly, because importing the xml package would shadow the xml interpret plugin module.
+	import pyexpat as expat
+except:
+	expat = None
 
 
 __author__ = 'Enrique Perez (perez_enrique@yahoo.com)'
@@ -46,21 +54,44 @@ __date__ = '$Date: 2008/21/04 $'
 __license__ = 'GNU Affero General Public License http://www.gnu.org/licenses/agpl.html'
 
 
+globalAttributeWhitespaceRegex = re.compile('=\\s*("[^"]*[\\t\\n]|\'[^\']*[\\t\\n])')
 globalGetAccessibleAttributeSet = set('getPaths getPreviousVertex getPreviousElementNode getVertexes parentNode'.split())
+globalUnparsedAmpersandRegex = re.compile('(<!\\[CDATA\\[.*?\\]\\]>|<!--.*?-->|<\\?.*?\\?>)|&', re.DOTALL)
 
 
-def createAppendByText(parentNode, xmlText):
-	'Create and append the child nodes from the xmlText.'
+def createAppendByExpat(parentNode, xmlText):
+	'Create and append the child nodes from the xmlText with the expat parser, return False if expat can not parse the xmlText.'
+	expatReader = ExpatReader(getAmpersandEscapedText(xmlText))
+	if not expatReader.isParsed:
+		return False
+	expatReader.createAppend(parentNode)
+	return True
+
+def createAppendByMonads(parentNode, xmlText):
+	'Create and append the child nodes from the xmlText with the character by character monad parser.'
 	monad = OpenMonad(parentNode)
 	for character in xmlText:
 		monad = monad.getNextMonad(character)
 
+def createAppendByText(parentNode, xmlText):
+	'Create and append the child nodes from the xmlText.'
+	if isExpatReadable(xmlText):
+		if createAppendByExpat(parentNode, xmlText):
+			return
+	createAppendByMonads(parentNode, xmlText)
+
 def createAppendByTextb(parentNode, xmlText):
 	'Create and append the child nodes from the xmlText.'
 	monad = OpenMonad(parentNode)
 	for character in xmlText:
 		monad = monad.getNextMonad(character)
 
+def getAmpersandEscapedText(xmlText):
+	'Get the xml text with the ampersands outside of the CDATA sections, comments and processing instructions escaped, so that expat leaves the character entities as they are.'
+	if '&' not in xmlText:
+		return xmlText
+	return globalUnparsedAmpersandRegex.sub(getEscapedAmpersand, xmlText)
+
 def getChildElementsByLocalName(childNodes, localName):
 	'Get the childNodes which have the given local name.'
 	childElementsByLocalName = []
@@ -82,6 +113,12 @@ def getElementsByLocalName(childNodes, localName):
 			elementsByLocalName += childNode.getElementsByLocalName(localName)
 	return elementsByLocalName
 
+def getEscapedAmpersand(match):
+	'Get the escaped ampersand, or the CDATA section, comment or processing instruction as it is.'
+	if match.group(1) == None:
+		return '&amp;'
+	return match.group(1)
+
 def getFileText(fileName, printWarning=True, readMode='r'):
 	'Get the entire text of a file.'
 	try:
@@ -94,6 +131,16 @@ def getFileText(fileName, printWarning=True, readMode='r'):
 			print('The file ' + fileName + ' does not exist.')
 	return ''
 
+def isExpatReadable(xmlText):
+	'Determine if the expat parser would read the xmlText the same way as the monad parser.'
+	if expat == None or not isinstance(xmlText, str):
+		return False
+	if '\r' in xmlText or '<!DOCTYPE' in xmlText:
+		return False
+	if globalAttributeWhitespaceRegex.search(xmlText) == None:
+		return True
+	return globalAttributeWhitespaceRegex.search(globalUnparsedAmpersandRegex.sub('', xmlText)) == None
+
 
 class CDATASectionMonad:
 	'A monad to handle a CDATASection node.'
@@ -746,6 +793,112 @@ class ElementReadMonad:
 		return KeyMonad(character, self.elementNode)
 
 
+class ExpatReader:
+	'A class to parse an xml text with the expat parser into the events of the monad parser.'
+	def __init__(self, xmlText):
+		'Initialize and parse the xmlText.'
+		self.cdataInput = None
+		self.events = []
+		self.isParsed = True
+		self.isTextDropped = True
+		self.textInput = []
+		self.xmlText = xmlText
+		self.parser = expat.ParserCreate('utf-8')
+		self.parser.buffer_text = True
+		self.parser.returns_unicode = False
+		self.parser.CharacterDataHandler = self.parseCharacterData
+		self.parser.CommentHandler = self.parseComment
+		self.parser.EndCdataSectionHandler = self.parseEndCdataSection
+		self.parser.EndElementHandler = self.parseEndElement
+		self.parser.ProcessingInstructionHandler = self.parseProcessingInstruction
+		self.parser.StartCdataSectionHandler = self.parseStartCdataSection
+		self.parser.StartElementHandler = self.parseStartElement
+		self.parser.XmlDeclHandler = self.parseXMLDeclaration
+		try:
+			self.parser.Parse(xmlText, True)
+		except expat.ExpatError:
+			self.isParsed = False
+		self.parser = None
+
+	def __repr__(self):
+		'Get the string representation of this expat reader.'
+		return '%s, %s' % (self.isParsed, self.events)
+
+	def addDocumentTypeEvent(self):
+		'Add the document type event, with the raw text of the declaration or processing instruction.'
+		self.addTextEvent()
+		beginIndex = self.parser.CurrentByteIndex
+		endIndex = self.xmlText.find('?>', beginIndex) + 2
+		self.events.append((DocumentTypeNode, self.xmlText[beginIndex : endIndex] + '\n'))
+		self.isTextDropped = True
+
+	def addTextEvent(self):
+		'Add the stripped text before a tag as a text event, if there is any.'
+		text = ''.join(self.textInput).strip()
+		if len(text) > 0:
+			self.events.append((TextNode, text))
+		self.textInput = []
+
+	def createAppend(self, parentNode):
+		'Create and append the child nodes from the events.'
+		for event in self.events:
+			eventType = event[0]
+			if eventType == ElementNode:
+				elementNode = ElementNode(parentNode)
+				elementNode.attributes = event[1]
+				elementNode.localName = event[2]
+				elementNode.appendSelfToParent()
+				parentNode = elementNode
+			elif eventType == None:
+				parentNode = parentNode.parentNode
+			else:
+				parentNode.childNodes.append(eventType(parentNode, event[1]))
+
+	def parseCharacterData(self, data):
+		'Add the character data to the CDATA section or to the text.'
+		if self.cdataInput != None:
+			self.cdataInput.append(data)
+		elif not self.isTextDropped:
+			self.textInput.append(data)
+
+	def parseComment(self, data):
+		'Add the comment event.'
+		self.addTextEvent()
+		self.events.append((CommentNode, '<!--%s-->\n' % data))
+		self.isTextDropped = True
+
+	def parseEndCdataSection(self):
+		'Add the CDATA section event.'
+		self.events.append((CDATASectionNode, '<![CDATA[%s]]>\n' % ''.join(self.cdataInput)))
+		self.cdataInput = None
+		self.isTextDropped = True
+
+	def parseEndElement(self, name):
+		'Add the element end event.'
+		self.addTextEvent()
+		self.events.append((None,))
+		self.isTextDropped = False
+
+	def parseProcessingInstruction(self, target, data):
+		'Add the processing instruction as a document type event.'
+		self.addDocumentTypeEvent()
+
+	def parseStartCdataSection(self):
+		'Start the CDATA section.'
+		self.addTextEvent()
+		self.cdataInput = []
+
+	def parseStartElement(self, name, attributes):
+		'Add the element start event.'
+		self.addTextEvent()
+		self.events.append((ElementNode, attributes, name.lower()))
+		self.isTextDropped = False
+
+	def parseXMLDeclaration(self, version, encoding, standalone):
+		'Add the xml declaration as a document type event.'
+		self.addDocumentTypeEvent()
+
+
 class KeyMonad:
 	'A monad to set the key of an attribute of an ElementNode.'
 	def __init__(self, character, elementNode):
@@ -228,6 +228,7 @@ from skeinforge_application.skeinforge_utilities import skeinforge_craft
 from skeinforge_application.skeinforge_plugins.analyze_plugins import skeinlayer
 from skeinforge_application.skeinforge_utilities import skeinforge_polyfile
 from skeinforge_application.skeinforge_utilities import skeinforge_profile
+from skeinforge_application.skeinforge_utilities import skeinforge_profiler
 import os
 import sys
 
@@ -586,7 +587,7 @@ class SkeinforgeRepository:
 		if self.usePyPyforSlicing.value :
 			for fileName in fileNames:
 				os.getcwd()
-				CommandOutput=os.popen('C:\pypy-1.9\pypy.exe %s%s %s'  % (os.getcwd(),'\skeinforge_application\skeinforge_utilities\skeinforge_craft.py', fileName)).read() #for pypy slicing
+				CommandOutput=os.popen('C:\pypy-1.9\pypy.exe %s%s %s%s'  % (os.getcwd(),'\skeinforge_application\skeinforge_utilities\skeinforge_craft.py', skeinforge_profiler.getCommandLineOptionsString(), fileName)).read() #for pypy slicing
 #				print fileName
 				print CommandOutput #for pypy slicing
 #				print "Slicing finished....."
@@ -619,7 +620,9 @@ def main():
 	parser.add_option(
 		'-o', '--option', help='set an individual option in the format "module:preference=value"',
 		action='append', type='string', dest='preferences')
+	skeinforge_profiler.addProfilerOptions(parser)
 	(options, args) = parser.parse_args()
+	skeinforge_profiler.setCraftProfilerByOptions(options)
 	if options.preferencesDirectory:
 		archive.globalTemporarySettingsPath = options.preferencesDirectory
 	if options.preferences:
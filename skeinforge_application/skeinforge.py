@@ -226,6 +226,7 @@ from optparse import OptionParser
 from skeinforge_application.skeinforge_utilities import skeinforge_craft
 from skeinforge_application.skeinforge_utilities import skeinforge_polyfile
 from skeinforge_application.skeinforge_utilities import skeinforge_profile
+from skeinforge_application.skeinforge_utilities import skeinforge_profiler
 import os
 import sys
 
@@ -613,7 +614,9 @@ def main():
 	parser.add_option(
 		'-o', '--option', help='set an individual option in the format "module:preference=value"',
 		action='append', type='string', dest='preferences')
+	skeinforge_profiler.addProfilerOptions(parser)
 	(options, args) = parser.parse_args()
+	skeinforge_profiler.setCraftProfilerByOptions(options)
 	if options.preferencesDirectory:
 		archive.globalTemporarySettingsPath = options.preferencesDirectory
 	if options.preferences:
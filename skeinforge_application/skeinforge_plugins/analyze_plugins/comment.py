@@ -53,7 +53,7 @@ def getNewRepository():
 
 def getWindowAnalyzeFile(fileName):
 	"Comment a gcode file."
-	gcodeText = archive.getFileText(fileName)
+	gcodeText = gcodec.getGcodeOrBinaryFileText(fileName)
 	return getWindowAnalyzeFileGivenText(fileName, gcodeText)
 
 def getWindowAnalyzeFileGivenText(fileName, gcodeText):
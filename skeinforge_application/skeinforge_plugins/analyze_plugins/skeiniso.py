@@ -262,7 +262,7 @@ def getNewRepository():
 
 def getWindowAnalyzeFile(fileName):
 	"Skeiniso a gcode file."
-	gcodeText = archive.getFileText(fileName)
+	gcodeText = gcodec.getGcodeOrBinaryFileText(fileName)
 	return getWindowAnalyzeFileGivenText(fileName, gcodeText)
 
 def getWindowAnalyzeFileGivenText( fileName, gcodeText, repository=None):
@@ -580,9 +580,7 @@ class SkeinisoSkein:
 			self.moveColoredThreadToSkeinPane()
 			self.isEdge = False
 		if firstWord == 'G2' or firstWord == 'G3':
-			relativeLocation = gcodec.getLocationFromSplitLine(self.oldLocation, splitLine)
-			relativeLocation.z = 0.0
-			location = self.oldLocation + relativeLocation
+			location = gcodec.getLocationFromSplitLine(self.oldLocation, splitLine)
 			self.linearMove(line, location)
 			self.oldLocation = location
 
@@ -160,7 +160,7 @@ def getRankIndex( rulingSeparationWidthMillimeters, screenOrdinate ):
 
 def getWindowAnalyzeFile(fileName):
 	"Display a gcode file in a skeinlayer window."
-	gcodeText = archive.getFileText(fileName)
+	gcodeText = gcodec.getGcodeOrBinaryFileText(fileName)
 	return getWindowAnalyzeFileGivenText(fileName, gcodeText)
 
 def getWindowAnalyzeFileGivenText( fileName, gcodeText, repository=None):
@@ -361,9 +361,7 @@ class SkeinlayerSkein:
 		elif firstWord == 'M103':
 			self.extruderActive = False
 		if firstWord == 'G2' or firstWord == 'G3':
-			relativeLocation = gcodec.getLocationFromSplitLine(self.oldLocation, splitLine)
-			relativeLocation.z = 0.0
-			location = self.oldLocation + relativeLocation
+			location = gcodec.getLocationFromSplitLine(self.oldLocation, splitLine)
 			self.linearMove(line, location)
 			self.oldLocation = location
 
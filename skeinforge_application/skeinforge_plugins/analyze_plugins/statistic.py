@@ -121,7 +121,7 @@ def getNewRepository():
 
 def getWindowAnalyzeFile(fileName):
 	"Write statistics for a gcode file."
-	return getWindowAnalyzeFileGivenText( fileName, archive.getFileText(fileName) )
+	return getWindowAnalyzeFileGivenText( fileName, gcodec.getGcodeOrBinaryFileText(fileName) )
 
 def getWindowAnalyzeFileGivenText( fileName, gcodeText, repository=None):
 	"Write statistics for a gcode file."
@@ -315,7 +315,6 @@ class StatisticSkein:
 		if self.oldLocation == None:
 			return
 		location = self.getLocationSetFeedRateToSplitLine(splitLine)
-		location += self.oldLocation
 		center = self.oldLocation.copy()
 		indexOfR = gcodec.getIndexOfStartingWithSecond( "R", splitLine )
 		if indexOfR > 0:
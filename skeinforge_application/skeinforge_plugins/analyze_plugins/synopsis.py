@@ -116,7 +116,7 @@ def getNewRepository():
 
 def getWindowAnalyzeFile(fileName):
 	'Write scalable vector graphics for a gcode file.'
-	gcodeText = archive.getFileText(fileName)
+	gcodeText = gcodec.getGcodeOrBinaryFileText(fileName)
 	return getWindowAnalyzeFileGivenText(fileName, gcodeText)
 
 def getWindowAnalyzeFileGivenText(fileName, gcodeText, repository=None):
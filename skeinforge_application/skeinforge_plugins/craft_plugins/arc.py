@@ -0,0 +1,207 @@
+"""
+This page is in the table of contents.
+Arc is a plugin to replace the runs of short linear moves which lie on a circle with arc moves.
+
+The curved edges of the object come out of the inset and fill tools as many short linear moves, so a curved part makes a large gcode file, and on a slow serial link the host may not be able to send the moves as fast as the firmware executes them, so the extruder pauses and leaves blobs.  Arc replaces each run of at least 'Minimum Arc Segments' extruding moves which lie on a circle with a single G2 or G3 move, which has the center relative to the start in the I and J words.  The dimension tool then gives the arc move the extrusion distance of the arc length.  The firmware must support G2 and G3 moves.
+
+Arc only joins moves at the same height and feed rate while the extruder is on, and an arc is always less than half a circle.
+
+==Operation==
+The default 'Activate Arc' checkbox is off.  When it is on, the functions described below will work, when it is off, nothing will be done.
+
+==Settings==
+===Arc Tolerance===
+Default is 0.05 millimeters.
+
+Defines the largest distance that the arc may be from the points of the linear moves, and from the linear moves between the points.
+
+===Maximum Arc Radius===
+Default is two hundred millimeters.
+
+Defines the radius of the largest arc, moves on a larger circle are almost straight so they are left as linear moves.
+
+===Minimum Arc Segments===
+Default is four.
+
+Defines the smallest number of linear moves which are replaced by an arc.
+
+==Examples==
+The following examples arc the file Screw Holder Bottom.stl.  The examples are run in a terminal in the folder which contains Screw Holder Bottom.stl and arc.py.
+
+> python arc.py
+This brings up the arc dialog.
+
+> python arc.py Screw Holder Bottom.stl
+The arc tool is parsing the file:
+Screw Holder Bottom.stl
+..
+The arc tool has created the file:
+.. Screw Holder Bottom_arc.gcode
+
+"""
+
+from __future__ import absolute_import
+#Init has to be imported first because it has code to workaround the python bug where relative imports don't work if the module is imported as a main module.
+import __init__
+
+from fabmetheus_utilities.fabmetheus_tools import fabmetheus_interpret
+from fabmetheus_utilities import archive
+from fabmetheus_utilities import euclidean
+from fabmetheus_utilities import gcodec
+from fabmetheus_utilities import settings
+from skeinforge_application.skeinforge_utilities import skeinforge_craft
+from skeinforge_application.skeinforge_utilities import skeinforge_polyfile
+from skeinforge_application.skeinforge_utilities import skeinforge_profile
+import math
+import sys
+
+
+__author__ = 'agent (agent@local)'
+__date__ = '$Date: 2026/18/10 $'
+__license__ = 'GNU Affero General Public License http://www.gnu.org/licenses/agpl.html'
+
+
+# The arc distance of gcodec is the minor arc through the chord, so the arcs must be less than half a circle.
+globalMaximumArcAngle = 0.9 * math.pi
+
+
+def getCircumcenter(begin, center, end):
+	'Get the center of the circle through the three points, or None if they are collinear.'
+	beginCenter = center - begin
+	beginEnd = end - begin
+	denominator = 2.0 * euclidean.getCrossProduct(beginCenter, beginEnd)
+	if abs(denominator) < 1e-12:
+		return None
+	beginCenterSquared = beginCenter.real * beginCenter.real + beginCenter.imag * beginCenter.imag
+	beginEndSquared = beginEnd.real * beginEnd.real + beginEnd.imag * beginEnd.imag
+	x = (beginEnd.imag * beginCenterSquared - beginCenter.imag * beginEndSquared) / denominator
+	y = (beginCenter.real * beginEndSquared - beginEnd.real * beginCenterSquared) / denominator
+	return begin + complex(x, y)
+
+def getCraftedText(fileName, text='', repository=None):
+	'Arc a gcode linear move file or text.'
+	return getCraftedTextFromText(archive.getTextIfEmpty(fileName, text), repository)
+
+def getCraftedTextFromText(gcodeText, repository=None):
+	'Arc a gcode linear move text.'
+	if gcodec.isProcedureDoneOrFileIsEmpty(gcodeText, 'arc'):
+		return gcodeText
+	if repository == None:
+		repository = settings.getReadRepository(ArcRepository())
+	if not repository.activateArc.value:
+		return gcodeText
+	return ArcSkein().getCraftedGcode(gcodeText, repository)
+
+def getNewRepository():
+	'Get new repository.'
+	return ArcRepository()
+
+def writeOutput(fileName, shouldAnalyze=True):
+	'Arc a gcode linear move file.'
+	skeinforge_craft.writeChainTextWithNounMessage(fileName, 'arc', shouldAnalyze)
+
+
+class ArcRepository:
+	'A class to handle the arc settings.'
+	def __init__(self):
+		'Set the default settings, execute title & settings fileName.'
+		skeinforge_profile.addListsToCraftTypeRepository('skeinforge_application.skeinforge_plugins.craft_plugins.arc.html', self)
+		self.fileNameInput = settings.FileNameInput().getFromFileName(fabmetheus_interpret.getGNUTranslatorGcodeFileTypeTuples(), 'Open File for Arc', self, '')
+		self.activateArc = settings.BooleanSetting().getFromValue('Activate Arc', self, False)
+		self.arcTolerance = settings.FloatSpin().getFromValue(0.005, 'Arc Tolerance (mm):', self, 0.2, 0.05)
+		self.maximumArcRadius = settings.FloatSpin().getFromValue(10.0, 'Maximum Arc Radius (mm):', self, 1000.0, 200.0)
+		self.minimumArcSegments = settings.IntSpin().getFromValue(2, 'Minimum Arc Segments (integer):', self, 20, 4)
+		self.executeTitle = 'Arc'
+
+	def execute(self):
+		'Arc button has been clicked.'
+		fileNames = skeinforge_polyfile.getFileOrDirectoryTypesUnmodifiedGcode(self.fileNameInput.value, fabmetheus_interpret.getImportPluginFileNames(), self.fileNameInput.wasCancelled)
+		for fileName in fileNames:
+			writeOutput(fileName)
+
+
+class ArcSkein(skeinforge_craft.LinearMoveRunSkein):
+	'A class to arc a skein of extrusions.'
+	def __init__(self):
+		'Initialize.'
+		skeinforge_craft.LinearMoveRunSkein.__init__(self, 'arc')
+		self.arcAngle = None
+		self.arcCenter = None
+
+	def addArcLine(self, beginLocation, endLocation):
+		'Add the arc move from the begin location to the end location, around the arc center.'
+		firstWord = 'G2'
+		if self.arcAngle > 0.0:
+			firstWord = 'G3'
+		centerMinusBegin = self.arcCenter - beginLocation.dropAxis()
+		line = self.distanceFeedRate.getFirstWordMovement(firstWord, endLocation)
+		line += ' I%s J%s' % (self.distanceFeedRate.getRounded(centerMinusBegin.real), self.distanceFeedRate.getRounded(centerMinusBegin.imag))
+		if self.runFeedRateMinute != None:
+			line += ' F' + self.distanceFeedRate.getRounded(self.runFeedRateMinute)
+		self.distanceFeedRate.addLine(line)
+
+	def addRun(self):
+		'Add the run of linear moves, with the moves which lie on a circle replaced by arc moves.'
+		if len(self.runLines) < 1:
+			return
+		points = self.getRunPoints()
+		beginIndex = 0
+		while beginIndex < len(self.runLines):
+			endIndex = self.getArcEndIndex(beginIndex, points)
+			if endIndex == None:
+				self.distanceFeedRate.addLine(self.runLines[beginIndex])
+				beginIndex += 1
+			else:
+				self.addArcLine(self.runLocations[beginIndex], self.runLocations[endIndex])
+				beginIndex = endIndex
+		self.runLines = []
+		self.runLocations = []
+
+	def getArcAngle(self, center, points):
+		'Get the signed angle which the points sweep around the center, or None if they do not lie on an arc within the tolerance.'
+		arcTolerance = self.repository.arcTolerance.value
+		radius = abs(points[0] - center)
+		for point in points[1 :]:
+			if abs(abs(point - center) - radius) > arcTolerance:
+				return None
+		arcAngle = 0.0
+		for pointIndex in xrange(len(points) - 1):
+			beforeSegment = points[pointIndex] - center
+			afterSegment = points[pointIndex + 1] - center
+			angle = euclidean.getAngleDifferenceByComplex(afterSegment, beforeSegment)
+			if angle == 0.0 or angle * arcAngle < 0.0:
+				return None
+			halfChord = 0.5 * abs(afterSegment - beforeSegment)
+			if radius - math.sqrt(max(radius * radius - halfChord * halfChord, 0.0)) > arcTolerance:
+				return None
+			arcAngle += angle
+			if abs(arcAngle) > globalMaximumArcAngle:
+				return None
+		return arcAngle
+
+	def getArcEndIndex(self, beginIndex, points):
+		'Get the index of the end point of the longest arc from the begin point, or None if there is no arc with enough segments.'
+		arcEndIndex = None
+		beginPoint = points[beginIndex]
+		for endIndex in xrange(beginIndex + self.repository.minimumArcSegments.value, len(points)):
+			center = getCircumcenter(beginPoint, points[(beginIndex + endIndex) / 2], points[endIndex])
+			if center == None or abs(beginPoint - center) > self.repository.maximumArcRadius.value:
+				return arcEndIndex
+			arcAngle = self.getArcAngle(center, points[beginIndex : endIndex + 1])
+			if arcAngle == None:
+				return arcEndIndex
+			arcEndIndex = endIndex
+			self.arcAngle = arcAngle
+			self.arcCenter = center
+		return arcEndIndex
+
+
+def main():
+	'Display the arc dialog.'
+	if len(sys.argv) > 1:
+		writeOutput(' '.join(sys.argv[1 :]))
+	else:
+		settings.startMainLoopFromConstructor(getNewRepository())
+
+if __name__ == '__main__':
+	main()
@@ -119,7 +119,7 @@ class BottomSkein:
 	def getCraftedGcode(self, fileName, repository, svgText):
 		"Parse svgText and store the bottom svgText."
 		svgReader = SVGReader()
-		svgReader.parseSVG('', svgText)
+		svgReader.parseSVGByHandoffOrText('', svgText)
 		if svgReader.sliceDictionary == None:
 			print('Warning, nothing will be done because the sliceDictionary could not be found getCraftedGcode in preface.')
 			return ''
@@ -143,9 +143,8 @@ class BottomSkein:
 			decimalPlacesCarried,
 			layerHeight,
 			edgeWidth)
-		commentElement = svg_writer.getCommentElement(svgReader.documentElement)
 		procedureNameString = svgReader.sliceDictionary['procedureName'] + ',bottom'
-		return svgWriter.getReplacedSVGTemplate(fileName, loopLayers, procedureNameString, commentElement)
+		return svgWriter.getReplacedSVGTemplate(fileName, loopLayers, procedureNameString, svgReader.commentElement)
 
 
 def main():
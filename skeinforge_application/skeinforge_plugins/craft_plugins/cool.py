@@ -16,6 +16,11 @@ http://blog.thingiverse.com/2009/07/28/skeinforge-quicktip-cool/
 The default 'Activate Cool' checkbox is on.  When it is on, the functions described below will work, when it is off, the functions will not be called.
 
 ==Settings==
+===Acceleration===
+Default is 1000 millimeters per second per second.
+
+Defines the acceleration of the tool head which cool uses to estimate the time it takes to print a layer.  A layer of many short segments takes longer than its length divided by the feed rate, because the tool head does not reach the feed rate on short segments and slows down at sharp corners.  Without the acceleration, cool would think such a layer is fast and would not cool it enough.  If the acceleration is zero, the layer time is the length divided by the feed rate.
+
 ===Bridge Cool===
 Default is one degree Celcius.
 
@@ -167,6 +172,7 @@ class CoolRepository:
 			0.0, 'Minimum Orbital Radius (millimeters):', self, 20.0, 10.0)
 		settings.LabelSeparator().getFromRepository(self)
 		self.orbitalOutset = settings.FloatSpin().getFromValue(1.0, 'Orbital Outset (millimeters):', self, 5.0, 2.0)
+		self.acceleration = settings.FloatSpin().getFromValue(0.0, 'Acceleration (mm/s/s):', self, 5000.0, 1000.0)
 		self.executeTitle = 'Cool'
 
 	def execute(self):
@@ -188,6 +194,7 @@ class CoolSkein:
 		self.isBridgeLayer = False
 		self.isExtruderActive = False
 		self.layerCount = settings.LayerCount()
+		self.layerSummary = None
 		self.lineIndex = 0
 		self.lines = None
 		self.multiplier = 1.0
@@ -198,13 +205,17 @@ class CoolSkein:
 
 	def addCoolOrbits(self, remainingOrbitTime):
 		'Add the minimum radius cool orbits.'
-		if len(self.boundaryLayer.loops) < 1:
-			return
-		insetBoundaryLoops = self.boundaryLayer.loops
+		boundaryLoops = self.boundaryLayer.loops
+		if len(boundaryLoops) < 1:
+			boundingLoop = self.layerSummary.getBoundingLoop()
+			if len(boundingLoop) < 1:
+				return
+			boundaryLoops = [boundingLoop]
+		insetBoundaryLoops = boundaryLoops
 		if abs(self.repository.orbitalOutset.value) > 0.1 * abs(self.edgeWidth):
-			insetBoundaryLoops = intercircle.getInsetLoopsFromLoops(self.boundaryLayer.loops, -self.repository.orbitalOutset.value)
+			insetBoundaryLoops = intercircle.getInsetLoopsFromLoops(boundaryLoops, -self.repository.orbitalOutset.value)
 		if len(insetBoundaryLoops) < 1:
-			insetBoundaryLoops = self.boundaryLayer.loops
+			insetBoundaryLoops = boundaryLoops
 		largestLoop = euclidean.getLargestLoop(insetBoundaryLoops)
 		loopArea = euclidean.getAreaLoopAbsolute(largestLoop)
 		if loopArea < self.minimumArea:
@@ -268,6 +279,7 @@ class CoolSkein:
 		self.lines = archive.getTextLines(gcodeText)
 		self.minimumArea = 4.0 * repository.minimumOrbitalRadius.value * repository.minimumOrbitalRadius.value
 		self.parseInitialization()
+		self.layerSummaries = gcodec.LayerSummaries(self.lines, repository.acceleration.value, self.feedRateMinute)
 		self.boundingRectangle = gcodec.BoundingRectangle().getFromGcodeLines(
 			self.lines[self.lineIndex :], 0.5 * self.edgeWidth)
 		margin = 0.2 * self.edgeWidth
@@ -281,55 +293,6 @@ class CoolSkein:
 			self.distanceFeedRate.addLine('M107')
 		return gcodec.getGcodeWithoutDuplication('M108', self.distanceFeedRate.output.getvalue())
 
-	def getLayerTime(self):
-		'Get the time the extruder spends on the layer.'
-		feedRateMinute = self.feedRateMinute
-		layerTime = 0.0
-		lastThreadLocation = self.oldLocation
-		for lineIndex in xrange(self.lineIndex, len(self.lines)):
-			line = self.lines[lineIndex]
-			splitLine = gcodec.getSplitLineBeforeBracketSemicolon(line)
-			firstWord = gcodec.getFirstWord(splitLine)
-			if firstWord == 'G1':
-				location = gcodec.getLocationFromSplitLine(lastThreadLocation, splitLine)
-				feedRateMinute = gcodec.getFeedRateMinute(feedRateMinute, splitLine)
-				if lastThreadLocation is not None:
-					feedRateSecond = feedRateMinute / 60.0
-					layerTime += location.distance(lastThreadLocation) / feedRateSecond
-				lastThreadLocation = location
-			elif firstWord == '(<bridgeRotation>':
-				self.isBridgeLayer = True
-			elif firstWord == '(</layer>)':
-				return layerTime
-		return layerTime
-
-	def getLayerTimeActive(self):
-		'Get the time the extruder spends on the layer while active.'
-		feedRateMinute = self.feedRateMinute
-		isExtruderActive = self.isExtruderActive
-		layerTime = 0.0
-		lastThreadLocation = self.oldLocation
-		for lineIndex in xrange(self.lineIndex, len(self.lines)):
-			line = self.lines[lineIndex]
-			splitLine = gcodec.getSplitLineBeforeBracketSemicolon(line)
-			firstWord = gcodec.getFirstWord(splitLine)
-			if firstWord == 'G1':
-				location = gcodec.getLocationFromSplitLine(lastThreadLocation, splitLine)
-				feedRateMinute = gcodec.getFeedRateMinute(feedRateMinute, splitLine)
-				if lastThreadLocation is not None and isExtruderActive:
-					feedRateSecond = feedRateMinute / 60.0
-					layerTime += location.distance(lastThreadLocation) / feedRateSecond
-				lastThreadLocation = location
-			elif firstWord == 'M101':
-				isExtruderActive = True
-			elif firstWord == 'M103':
-				isExtruderActive = False
-			elif firstWord == '(<bridgeRotation>':
-				self.isBridgeLayer = True
-			elif firstWord == '(</layer>)':
-				return layerTime
-		return layerTime
-
 	def parseInitialization(self):
 		'Parse gcode initialization and store the parameters.'
 		for self.lineIndex in xrange(len(self.lines)):
@@ -380,8 +343,9 @@ class CoolSkein:
 			self.layerCount.printProgressIncrement('cool')
 			self.distanceFeedRate.addLine(line)
 			self.distanceFeedRate.addLinesSetAbsoluteDistanceMode(self.coolStartLines)
-			layerTime = self.getLayerTime()
-			remainingOrbitTime = max(self.repository.minimumLayerTime.value - layerTime, 0.0)
+			self.layerSummary = self.layerSummaries.getLayerSummary(self.lineIndex)
+			self.isBridgeLayer = self.layerSummary.isBridge
+			remainingOrbitTime = max(self.repository.minimumLayerTime.value - self.layerSummary.time, 0.0)
 			self.addCoolTemperature(remainingOrbitTime)
 			if self.repository.orbit.value:
 				self.addOrbitsIfNecessary(remainingOrbitTime)
@@ -407,7 +371,7 @@ class CoolSkein:
 
 	def setMultiplier(self, remainingOrbitTime):
 		'Set the feed and flow rate multiplier.'
-		layerTimeActive = self.getLayerTimeActive()
+		layerTimeActive = self.layerSummary.activeTime
 		self.multiplier = min(1.0, layerTimeActive / (remainingOrbitTime + layerTimeActive))
 		
 
@@ -188,6 +188,7 @@ class DimensionSkein:
 		self.isExtruderActive = False
 		self.layerIndex = -1
 		self.lineIndex = 0
+		self.loopEnclosureGrids = []
 		self.maximumZFeedRatePerSecond = None
 		self.oldLocation = None
 		self.operatingFlowRate = None
@@ -221,6 +222,7 @@ class DimensionSkein:
 		self.minimumTravelForRetraction = self.repository.minimumTravelForRetraction.value
 		self.doubleMinimumTravelForRetraction = self.minimumTravelForRetraction + self.minimumTravelForRetraction
 		self.lines = archive.getTextLines(gcodeText)
+		self.threadIndex = gcodec.ThreadIndex(self.lines)
 		self.parseInitialization()
 		if not self.repository.retractWithinIsland.value:
 			self.parseBoundaries()
@@ -244,8 +246,9 @@ class DimensionSkein:
 		'Get a dimensioned arc movement.'
 		if self.oldLocation == None:
 			return line
-		relativeLocation = gcodec.getLocationFromSplitLine(self.oldLocation, splitLine)
-		self.oldLocation += relativeLocation
+		location = gcodec.getLocationFromSplitLine(self.oldLocation, splitLine)
+		relativeLocation = location - self.oldLocation
+		self.oldLocation = location
 		distance = gcodec.getArcDistance(relativeLocation, splitLine)
 		return line + self.getExtrusionDistanceString(distance, splitLine)
 
@@ -270,28 +273,18 @@ class DimensionSkein:
 		'Get the travel distance to the next thread.'
 		if self.oldLocation == None:
 			return None
-		isActive = False
-		location = self.oldLocation
-		for afterIndex in xrange(lineIndex + 1, len(self.lines)):
-			line = self.lines[afterIndex]
-			splitLine = gcodec.getSplitLineBeforeBracketSemicolon(line)
-			firstWord = gcodec.getFirstWord(splitLine)
-			if firstWord == 'G1':
-				if isActive:
-					if not self.repository.retractWithinIsland.value:
-						locationEnclosureIndex = self.getSmallestEnclosureIndex(location.dropAxis())
-						if locationEnclosureIndex != self.getSmallestEnclosureIndex(self.oldLocation.dropAxis()):
-							return None
-					locationMinusOld = location - self.oldLocation
-					xyTravel = abs(locationMinusOld.dropAxis())
-					zTravelMultiplied = locationMinusOld.z * self.zDistanceRatio
-					return math.sqrt(xyTravel * xyTravel + zTravelMultiplied * zTravelMultiplied)
-				location = gcodec.getLocationFromSplitLine(location, splitLine)
-			elif firstWord == 'M101':
-				isActive = True
-			elif firstWord == 'M103':
-				isActive = False
-		return None
+		threadBeginningIndex = self.threadIndex.getNextIndex(self.threadIndex.nextActiveMoveIndexes, lineIndex + 1)
+		if threadBeginningIndex == None:
+			return None
+		location = self.threadIndex.getLocation(lineIndex, self.oldLocation, threadBeginningIndex - 1)
+		if not self.repository.retractWithinIsland.value:
+			locationEnclosureIndex = self.getSmallestEnclosureIndex(location.dropAxis())
+			if locationEnclosureIndex != self.getSmallestEnclosureIndex(self.oldLocation.dropAxis()):
+				return None
+		locationMinusOld = location - self.oldLocation
+		xyTravel = abs(locationMinusOld.dropAxis())
+		zTravelMultiplied = locationMinusOld.z * self.zDistanceRatio
+		return math.sqrt(xyTravel * xyTravel + zTravelMultiplied * zTravelMultiplied)
 
 	def getExtrusionDistanceString( self, distance, splitLine ):
 		'Get the extrusion distance string.'
@@ -328,11 +321,7 @@ class DimensionSkein:
 
 	def getSmallestEnclosureIndex(self, point):
 		'Get the index of the smallest boundary loop which encloses the point.'
-		boundaryLayer = self.boundaryLayers[self.layerIndex]
-		for loopIndex, loop in enumerate(boundaryLayer.loops):
-			if euclidean.isPointInsideLoop(loop, point):
-				return loopIndex
-		return None
+		return self.loopEnclosureGrids[self.layerIndex].getSmallestEnclosureIndex(point)
 
 	def parseBoundaries(self):
 		'Parse the boundaries and add them to the boundary layers.'
@@ -354,6 +343,7 @@ class DimensionSkein:
 				self.boundaryLayers.append(boundaryLayer)
 		for boundaryLayer in self.boundaryLayers:
 			triangle_mesh.sortLoopsInOrderOfArea(False, boundaryLayer.loops)
+			self.loopEnclosureGrids.append(euclidean.LoopEnclosureGrid(boundaryLayer.loops))
 
 	def parseInitialization(self):
 		'Parse gcode initialization and store the parameters.'
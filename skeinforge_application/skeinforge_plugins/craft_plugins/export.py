@@ -84,6 +84,11 @@ Default is off.
 
 When selected, export will save the gcode file with the suffix '_penultimate.gcode' just before it is exported.  This is useful because the code after it is exported could be in a form which the viewers can not display well.
 
+===Write Layer Index===
+Default is off.
+
+When selected, export will write a layer index next to the exported and penultimate gcode files, with the gcode file name plus the '.layers' extension.  The index holds the byte offset, z, move count and bounding box of each layer, so that the analyze tools can load a layer range of a large file without parsing the layers before it.  If there is no index, it is built the first time a layer range is read.
+
 ==Examples==
 The following examples export the file Screw Holder Bottom.stl.  The examples are run in a terminal in the folder which contains Screw Holder Bottom.stl and export.py.
 
@@ -106,6 +111,7 @@ import __init__
 from fabmetheus_utilities.fabmetheus_tools import fabmetheus_interpret
 from fabmetheus_utilities import archive
 from fabmetheus_utilities import euclidean
+from fabmetheus_utilities import gcode_index
 from fabmetheus_utilities import gcodec
 from fabmetheus_utilities import intercircle
 from fabmetheus_utilities import settings
@@ -288,6 +294,8 @@ def writeOutput(fileName, shouldAnalyze=True):
 		archive.writeFileText(fileNamePenultimate, gcodeText)
 		filePenultimateWritten = True
 		print('The penultimate file is saved as ' + archive.getSummarizedFileName(fileNamePenultimate))
+		if repository.writeLayerIndex.value:
+			gcode_index.writeLayerIndex(fileNamePenultimate)
 	exportGcode = getCraftedTextFromText(gcodeText, repository)
 	window = None
 	if shouldAnalyze and repository.analyzeGcode.value:
@@ -305,6 +313,8 @@ def writeOutput(fileName, shouldAnalyze=True):
 		replaceableExportGcode = getReplaceableExportGcode(repository.nameOfReplaceFile.value, replaceableExportGcode)
 		archive.writeFileText( fileNameSuffix, replaceableExportGcode )
 		print('The exported file is saved as ' + archive.getSummarizedFileName(fileNameSuffix))
+		if repository.writeLayerIndex.value:
+			gcode_index.writeLayerIndex(fileNameSuffix)
 	if repository.alsoSendOutputTo.value != '':
 		if replaceableExportGcode == None:
 			replaceableExportGcode = selectedPluginModule.getOutput(exportGcode)
@@ -354,6 +364,7 @@ class ExportRepository:
 		self.fileExtension = settings.StringSetting().getFromValue('File Extension:', self, 'gcode')
 		self.nameOfReplaceFile = settings.StringSetting().getFromValue('Name of Replace File:', self, 'replace.csv')
 		self.savePenultimateGcode = settings.BooleanSetting().getFromValue('Save Penultimate Gcode', self, False)
+		self.writeLayerIndex = settings.BooleanSetting().getFromValue('Write Layer Index', self, False)
 		self.executeTitle = 'Export'
 
 	def execute(self):
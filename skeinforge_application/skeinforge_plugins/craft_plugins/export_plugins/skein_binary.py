@@ -0,0 +1,86 @@
+"""
+This page is in the table of contents.
+Skein binary is an export plugin to convert gcode into the compact skein binary format.
+
+An export plugin is a script in the export_plugins folder which has the getOutput function, the globalIsReplaceable variable and if it's output is not replaceable, the writeOutput function.  It is meant to be run from the export tool.  To ensure that the plugin works on platforms which do not handle file capitalization properly, give the plugin a lower case name.
+
+The getOutput function of this script takes a gcode text and returns that text converted into the skein binary format.  The writeOutput function of this script takes a gcode text and writes that in the skein binary format.
+
+The skein binary format stores the moves as float32 records with their segment type and the layer table, and every other line once in a string table, so it is much smaller than the gcode text and it can be read without tokenizing.  The craft, analyze and export tools read a file with the skein extension as if it were the gcode it was made from.  The record structure is described in the skein_binary module in fabmetheus_utilities.
+
+Since the layer and segment tags are comments, to keep the layer table and the segment types select 'Do Not Delete Comments' in export.
+
+==Settings==
+===File Extension===
+Default is skein.
+
+Defines the file extension suffix.
+
+"""
+
+from __future__ import absolute_import
+import __init__
+from fabmetheus_utilities import archive
+from fabmetheus_utilities import gcodec
+from fabmetheus_utilities import settings
+from fabmetheus_utilities import skein_binary
+from skeinforge_application.skeinforge_utilities import skeinforge_polyfile
+from skeinforge_application.skeinforge_utilities import skeinforge_profile
+import sys
+
+
+__author__ = 'agent (agent@local)'
+__date__ = '$Date: 2026/18/10 $'
+__license__ = 'GNU Affero General Public License http://www.gnu.org/licenses/agpl.html'
+
+
+# This is true if the output is text and false if it is binary.
+globalIsReplaceable = False
+
+
+def getNewRepository():
+	'Get new repository.'
+	return SkeinBinaryRepository()
+
+def getOutput(gcodeText, repository=None):
+	'Get the exported version of a gcode file.'
+	if gcodeText == '':
+		return ''
+	return skein_binary.getBinaryText(gcodeText)
+
+def writeOutput(fileName, gcodeText=''):
+	'Write the exported version of a gcode file.'
+	repository = settings.getReadRepository(SkeinBinaryRepository())
+	gcodeText = gcodec.getGcodeFileText(fileName, gcodeText)
+	if gcodeText == '':
+		return
+	suffixFileName = fileName[: fileName.rfind('.')] + '.' + repository.fileExtension.value
+	archive.writeFileText(suffixFileName, getOutput(gcodeText, repository), 'wb+')
+	print('The converted file is saved as ' + archive.getSummarizedFileName(suffixFileName))
+
+
+class SkeinBinaryRepository:
+	'A class to handle the export settings.'
+	def __init__(self):
+		'Set the default settings, execute title & settings fileName.'
+		skeinforge_profile.addListsToCraftTypeRepository('skeinforge_application.skeinforge_plugins.craft_plugins.export_plugins.skein_binary.html', self)
+		self.fileNameInput = settings.FileNameInput().getFromFileName([('Gcode text files', '*.gcode')], 'Open File to be Converted to Skein Binary', self, '')
+		self.fileExtension = settings.StringSetting().getFromValue('File Extension:', self, skein_binary.globalFileExtension)
+		self.executeTitle = 'Convert to Skein Binary'
+
+	def execute(self):
+		'Convert to skein binary button has been clicked.'
+		fileNames = skeinforge_polyfile.getFileOrDirectoryTypesUnmodifiedGcode(self.fileNameInput.value, ['.gcode'], self.fileNameInput.wasCancelled)
+		for fileName in fileNames:
+			writeOutput(fileName)
+
+
+def main():
+	'Display the export dialog.'
+	if len(sys.argv) > 1:
+		writeOutput(' '.join(sys.argv[1 :]))
+	else:
+		settings.startMainLoopFromConstructor(getNewRepository())
+
+if __name__ == '__main__':
+	main()
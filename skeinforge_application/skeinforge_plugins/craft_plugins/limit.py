@@ -137,10 +137,13 @@ class LimitSkein:
 		self.feedRateMinute = gcodec.getFeedRateMinute(self.feedRateMinute, splitLine)
 		if self.feedRateMinute == None or self.oldLocation == None:
 			return line
-		relativeLocation = gcodec.getLocationFromSplitLine(self.oldLocation, splitLine)
-		self.oldLocation += relativeLocation
+		location = gcodec.getLocationFromSplitLine(self.oldLocation, splitLine)
+		relativeLocation = location - self.oldLocation
+		self.oldLocation = location
 		deltaZ = abs(relativeLocation.z)
 		distance = gcodec.getArcDistance(relativeLocation, splitLine)
+		if distance <= 0.0:
+			return line
 		return self.getZLimitedLine(deltaZ, distance, line, splitLine)
 
 	def getZLimitedLineLinear(self, line, location, splitLine):
@@ -21,6 +21,24 @@ The center of the shape will be moved to the "Center X" and "Center Y" coordinat
 ====Center X====
 ====Center Y====
 
+===Plate===
+Multiply can also pack several different parts, each with its own quantity, onto one plate and write them as one file.  The plate mode is run from the command line with the --plate option followed by the file names, each followed by an equal sign and the quantity if the quantity is more than one.  Each part is crafted up to multiply, then the convex hull of its extrusions is rotated by each multiple of the 'Plate Rotation Step' and the smallest fitting bounding rectangle, plus the separation, is packed with a skyline bottom left packer.  The packed parts are centered on the center and the layers of all the parts are merged, so the parts must be carved with the same layer height.  The rest of the craft chain is then run on the merged file, which has the name of the first file plus the suffix _plate.  If a part does not fit on the plate, a warning is printed and that part is left out.
+
+====Plate Depth====
+Default is 200 millimeters.
+
+Defines the depth, in the y direction, of the plate area the parts are packed into.
+
+====Plate Rotation Step====
+Default is 90 degrees.
+
+Defines the angle step of the rotations which are tried for each part.  If the step is zero, the parts are not rotated.  A smaller step packs odd shaped parts better, but takes longer.
+
+====Plate Width====
+Default is 200 millimeters.
+
+Defines the width, in the x direction, of the plate area the parts are packed into.
+
 ===Number of Cells===
 ====Number of Columns====
 Default is one.
@@ -55,6 +73,9 @@ Screw Holder Bottom.stl
 The multiply tool has created the file:
 .. Screw Holder Bottom_multiply.gcode
 
+> python multiply.py --plate Screw Holder Bottom.stl=4 Bracket.stl=10
+This packs four Screw Holder Bottoms and ten Brackets onto the plate and crafts them as the file Screw Holder Bottom_plate.gcode.
+
 """
 
 
@@ -63,7 +84,6 @@ from __future__ import absolute_import
 import __init__
 
 from fabmetheus_utilities.fabmetheus_tools import fabmetheus_interpret
-from fabmetheus_utilities.vector3 import Vector3
 from fabmetheus_utilities import archive
 from fabmetheus_utilities import euclidean
 from fabmetheus_utilities import gcodec
@@ -74,6 +94,7 @@ from skeinforge_application.skeinforge_utilities import skeinforge_polyfile
 from skeinforge_application.skeinforge_utilities import skeinforge_profile
 import math
 import sys
+import time
 
 
 __author__ = 'Enrique Perez (perez_enrique@yahoo.com)'
@@ -81,6 +102,13 @@ __date__ = '$Date: 2008/21/04 $'
 __license__ = 'GNU Affero General Public License http://www.gnu.org/licenses/agpl.html'
 
 
+globalMoveFormatTable = {
+	'(<boundaryPoint>' : '(<boundaryPoint> X%%s Y%%s Z%s </boundaryPoint>)',
+	'(<infillPoint>' : '(<infillPoint> X%%s Y%%s Z%s </infillPoint>)',
+	'G1' : 'G1 X%%s Y%%s Z%s'}
+globalPlateTolerance = 0.0001
+
+
 def getCraftedText(fileName, text='', repository=None):
 	'Multiply the fill file or text.'
 	return getCraftedTextFromText(archive.getTextIfEmpty(fileName, text), repository)
@@ -95,14 +123,62 @@ def getCraftedTextFromText(gcodeText, repository=None):
 		return gcodeText
 	return MultiplySkein().getCraftedGcode(gcodeText, repository)
 
+def getFileNameQuantities(arguments):
+	'Get the file names and quantities from the arguments, which are file names each followed by an equal sign and the quantity if it is more than one.'
+	fileNameQuantities = []
+	for argument in arguments:
+		equalIndex = argument.rfind('=')
+		if equalIndex > 0 and argument[equalIndex + 1 :].isdigit():
+			fileNameQuantities.append((argument[: equalIndex], int(argument[equalIndex + 1 :])))
+		else:
+			fileNameQuantities.append((argument, 1))
+	return fileNameQuantities
+
 def getNewRepository():
 	'Get new repository.'
 	return MultiplyRepository()
 
+def getPlateText(fileNameQuantities, repository=None):
+	'Get the merged text of the parts crafted up to multiply and packed onto the plate.'
+	craftSequence = skeinforge_craft.getReadCraftSequence()
+	if 'multiply' not in craftSequence:
+		print('Warning, multiply is not in the craft sequence, so the plate can not be packed.')
+		return ''
+	if repository == None:
+		repository = settings.getReadRepository(MultiplyRepository())
+	procedureBeforeMultiply = craftSequence[max(craftSequence.index('multiply') - 1, 0)]
+	plateParts = []
+	for fileName, quantity in fileNameQuantities:
+		if quantity > 0:
+			partText = skeinforge_craft.getChainText(fileName, procedureBeforeMultiply)
+			if partText == '':
+				print('Warning, the part could not be crafted and is left off the plate:')
+				print(fileName)
+			else:
+				plateParts.append(PlatePart(fileName, partText, quantity))
+	if len(plateParts) < 1:
+		return ''
+	return PlateSkein().getCraftedGcode(plateParts, repository)
+
 def writeOutput(fileName, shouldAnalyze=True):
 	'Multiply a gcode linear move file.'
 	skeinforge_craft.writeChainTextWithNounMessage(fileName, 'multiply', shouldAnalyze)
 
+def writePlateOutput(fileNameQuantities, shouldAnalyze=True):
+	'Pack the parts onto the plate, write the merged file and craft it with the rest of the craft sequence.'
+	if len(fileNameQuantities) < 1:
+		return None
+	startTime = time.time()
+	plateText = getPlateText(fileNameQuantities)
+	if plateText == '':
+		return None
+	firstFileName = fileNameQuantities[0][0]
+	plateFileName = firstFileName[: firstFileName.rfind('.')] + '_plate.gcode'
+	archive.writeFileText(plateFileName, plateText)
+	print('The packed plate is saved as ' + archive.getSummarizedFileName(plateFileName))
+	print('It took %s to craft and pack the parts.' % euclidean.getDurationString(time.time() - startTime))
+	return skeinforge_craft.writeOutput(plateFileName, shouldAnalyze)
+
 
 class MultiplyRepository:
 	'A class to handle the multiply settings.'
@@ -124,6 +200,11 @@ class MultiplyRepository:
 		settings.LabelSeparator().getFromRepository(self)
 		self.reverseSequenceEveryOddLayer = settings.BooleanSetting().getFromValue('Reverse Sequence every Odd Layer', self, False)
 		self.separationOverEdgeWidth = settings.FloatSpin().getFromValue(5.0, 'Separation over Perimeter Width (ratio):', self, 25.0, 5.0)
+		settings.LabelSeparator().getFromRepository(self)
+		settings.LabelDisplay().getFromName('- Plate -', self)
+		self.plateDepth = settings.FloatSpin().getFromValue(50.0, 'Plate Depth (mm):', self, 400.0, 200.0)
+		self.plateRotationStep = settings.FloatSpin().getFromValue(0.0, 'Plate Rotation Step (degrees):', self, 180.0, 90.0)
+		self.plateWidth = settings.FloatSpin().getFromValue(50.0, 'Plate Width (mm):', self, 400.0, 200.0)
 		self.executeTitle = 'Multiply'
 
 	def execute(self):
@@ -140,32 +221,30 @@ class MultiplySkein:
 		self.distanceFeedRate = gcodec.DistanceFeedRate()
 		self.isExtrusionActive = False
 		self.layerIndex = 0
-		self.layerLines = []
+		self.layerLineIndexes = []
 		self.lineIndex = 0
 		self.lines = None
+		self.moveTemplates = None
 		self.oldLocation = None
+		self.roundedStringsTable = {}
 		self.rowIndex = 0
 		self.shouldAccumulate = True
 
 	def addElement(self, offset):
 		'Add moved element to the output.'
-		for line in self.layerLines:
-			splitLine = gcodec.getSplitLineBeforeBracketSemicolon(line)
-			firstWord = gcodec.getFirstWord(splitLine)
-			if firstWord == '(<boundaryPoint>':
-				movedLocation = self.getMovedLocationSetOldLocation(offset, splitLine)
-				line = self.distanceFeedRate.getBoundaryLine(movedLocation)
-			elif firstWord == 'G1':
-				movedLocation = self.getMovedLocationSetOldLocation(offset, splitLine)
-				line = self.distanceFeedRate.getLinearGcodeMovement(movedLocation.dropAxis(), movedLocation.z)
-			elif firstWord == '(<infillPoint>':
-				movedLocation = self.getMovedLocationSetOldLocation(offset, splitLine)
-				line = self.distanceFeedRate.getInfillBoundaryLine(movedLocation)
-			self.distanceFeedRate.addLine(line)
+		xStrings = self.getRoundedStrings(1, offset.real)
+		yStrings = self.getRoundedStrings(2, offset.imag)
+		for layerLineIndexIndex, lineIndex in enumerate(self.layerLineIndexes):
+			moveTemplate = self.moveTemplates[lineIndex]
+			if moveTemplate == None:
+				self.distanceFeedRate.addLine(self.lines[lineIndex])
+			else:
+				self.distanceFeedRate.addLine(moveTemplate[0] % (xStrings[layerLineIndexIndex], yStrings[layerLineIndexIndex]))
 
 	def addLayer(self):
 		'Add multiplied layer to the output.'
 		self.addRemoveThroughLayer()
+		self.roundedStringsTable = {}
 		offset = self.centerOffset - self.arrayCenter - self.shapeCenter
 		for rowIndex in xrange(self.repository.numberOfRows.value):
 			yRowOffset = float(rowIndex) * self.extentPlusSeparation.imag
@@ -179,19 +258,17 @@ class MultiplySkein:
 				self.addElement(elementOffset)
 			self.rowIndex += 1
 		settings.printProgress(self.layerIndex, 'multiply')
-		if len(self.layerLines) > 1:
+		if len(self.layerLineIndexes) > 1:
 			self.layerIndex += 1
-		self.layerLines = []
+		self.layerLineIndexes = []
 
 	def addRemoveThroughLayer(self):
 		'Parse gcode initialization and store the parameters.'
-		for layerLineIndex in xrange(len(self.layerLines)):
-			line = self.layerLines[layerLineIndex]
-			splitLine = gcodec.getSplitLineBeforeBracketSemicolon(line)
-			firstWord = gcodec.getFirstWord(splitLine)
+		for layerLineIndexIndex, lineIndex in enumerate(self.layerLineIndexes):
+			line = self.lines[lineIndex]
 			self.distanceFeedRate.addLine(line)
-			if firstWord == '(<layer>':
-				self.layerLines = self.layerLines[layerLineIndex + 1 :]
+			if gcodec.getFirstWordFromLine(line) == '(<layer>':
+				self.layerLineIndexes = self.layerLineIndexes[layerLineIndexIndex + 1 :]
 				return
 
 	def getCraftedGcode(self, gcodeText, repository):
@@ -203,15 +280,25 @@ class MultiplySkein:
 		self.lines = archive.getTextLines(gcodeText)
 		self.parseInitialization()
 		self.setCorners()
-		for line in self.lines[self.lineIndex :]:
-			self.parseLine(line)
+		for self.lineIndex in xrange(self.lineIndex, len(self.lines)):
+			self.parseLine(self.lines[self.lineIndex])
 		return self.distanceFeedRate.output.getvalue()
 
-	def getMovedLocationSetOldLocation(self, offset, splitLine):
-		'Get the moved location and set the old location.'
-		location = gcodec.getLocationFromSplitLine(self.oldLocation, splitLine)
-		self.oldLocation = location
-		return Vector3(location.x + offset.real, location.y + offset.imag, location.z)
+	def getRoundedStrings(self, coordinateIndex, offsetValue):
+		'Get the rounded strings of a coordinate of the layer moves plus the offset, which are the same for every element in a row or column.'
+		roundedStringsKey = (coordinateIndex, offsetValue)
+		if roundedStringsKey in self.roundedStringsTable:
+			return self.roundedStringsTable[roundedStringsKey]
+		getRounded = self.distanceFeedRate.getRounded
+		roundedStrings = []
+		for lineIndex in self.layerLineIndexes:
+			moveTemplate = self.moveTemplates[lineIndex]
+			if moveTemplate == None:
+				roundedStrings.append(None)
+			else:
+				roundedStrings.append(getRounded(moveTemplate[coordinateIndex] + offsetValue))
+		self.roundedStringsTable[roundedStringsKey] = roundedStrings
+		return roundedStrings
 
 	def parseInitialization(self):
 		'Parse gcode initialization and store the parameters.'
@@ -242,20 +329,22 @@ class MultiplySkein:
 		elif firstWord == '(</crafting>)':
 			self.shouldAccumulate = False
 		if self.shouldAccumulate:
-			self.layerLines.append(line)
+			self.layerLineIndexes.append(self.lineIndex)
 			return
 		self.distanceFeedRate.addLine(line)
 
 	def setCorners(self):
-		'Set maximum and minimum corners and z.'
+		'Set maximum and minimum corners and z, and the move templates of the moved lines.'
 		cornerMaximumComplex = complex(-987654321.0, -987654321.0)
 		cornerMinimumComplex = -cornerMaximumComplex
-		for line in self.lines[self.lineIndex :]:
-			splitLine = gcodec.getSplitLineBeforeBracketSemicolon(line)
+		self.moveTemplates = [None] * len(self.lines)
+		for lineIndex in xrange(self.lineIndex, len(self.lines)):
+			splitLine = gcodec.getSplitLineBeforeBracketSemicolon(self.lines[lineIndex])
 			firstWord = gcodec.getFirstWord(splitLine)
-			if firstWord == 'G1':
+			if firstWord in globalMoveFormatTable:
 				location = gcodec.getLocationFromSplitLine(self.oldLocation, splitLine)
-				if self.isExtrusionActive:
+				self.moveTemplates[lineIndex] = (globalMoveFormatTable[firstWord] % self.distanceFeedRate.getRounded(location.z), location.x, location.y)
+				if firstWord == 'G1' and self.isExtrusionActive:
 					locationComplex = location.dropAxis()
 					cornerMaximumComplex = euclidean.getMaximum(locationComplex,  cornerMaximumComplex)
 					cornerMinimumComplex = euclidean.getMinimum(locationComplex,  cornerMinimumComplex)
@@ -274,9 +363,235 @@ class MultiplySkein:
 		self.arrayCenter = 0.5 * self.arrayExtent
 
 
+class PlateInstance:
+	'A class to hold a part placed on the plate with its rotation and offset.'
+	def __init__(self, offset, platePart, rotation):
+		'Initialize.'
+		self.offset = offset
+		self.platePart = platePart
+		self.rotation = rotation
+
+	def __repr__(self):
+		'Get the string representation of this plate instance.'
+		return '%s, %s, %s' % (self.platePart.fileName, self.offset, self.rotation)
+
+	def addLayer(self, distanceFeedRate, z):
+		'Add the moved and rotated lines of the layer at z to the output.'
+		if z not in self.platePart.layerTable:
+			return
+		beginIndex, endIndex = self.platePart.layerTable[z]
+		getRounded = distanceFeedRate.getRounded
+		for lineIndex in xrange(beginIndex, endIndex):
+			moveTemplate = self.platePart.moveTemplates[lineIndex]
+			if moveTemplate == None:
+				distanceFeedRate.addLine(self.platePart.lines[lineIndex])
+			elif len(moveTemplate) == 2:
+				distanceFeedRate.addLine(gcodec.getTagBracketedLine(moveTemplate[0], moveTemplate[1] * self.rotation))
+			else:
+				point = complex(moveTemplate[1], moveTemplate[2]) * self.rotation + self.offset
+				distanceFeedRate.addLine(moveTemplate[0] % (getRounded(point.real), getRounded(point.imag)))
+
+
+class PlatePacker:
+	'A class to pack rectangles onto the plate with the skyline bottom left algorithm.'
+	def __init__(self, plateSize):
+		'Initialize with one skyline segment, each segment is a list of the x, the height and the width.'
+		self.plateSize = plateSize
+		self.skyline = [[0.0, 0.0, plateSize.real]]
+
+	def __repr__(self):
+		'Get the string representation of this plate packer.'
+		return '%s, %s' % (self.plateSize, self.skyline)
+
+	def addRectangle(self, position, size):
+		'Add the rectangle at the position to the skyline.'
+		right = position.real + size.real
+		skyline = []
+		for segment in self.skyline:
+			segmentRight = segment[0] + segment[2]
+			if segment[0] < position.real:
+				skyline.append([segment[0], segment[1], min(segmentRight, position.real) - segment[0]])
+			if segmentRight > right:
+				segmentLeft = max(segment[0], right)
+				skyline.append([segmentLeft, segment[1], segmentRight - segmentLeft])
+		skyline.append([position.real, position.imag + size.imag, size.real])
+		skyline.sort()
+		self.skyline = [skyline[0]]
+		for segment in skyline[1 :]:
+			if segment[1] == self.skyline[-1][1]:
+				self.skyline[-1][2] += segment[2]
+			else:
+				self.skyline.append(segment)
+
+	def getPosition(self, size):
+		'Get the lowest then leftmost position where the rectangle fits, or None if it does not fit.'
+		bestPosition = None
+		for segmentIndex, segment in enumerate(self.skyline):
+			x = segment[0]
+			right = x + size.real
+			if right > self.plateSize.real + globalPlateTolerance:
+				return bestPosition
+			y = segment[1]
+			for nextSegment in self.skyline[segmentIndex + 1 :]:
+				if nextSegment[0] >= right:
+					break
+				y = max(y, nextSegment[1])
+			if y + size.imag <= self.plateSize.imag + globalPlateTolerance:
+				if bestPosition == None or y < bestPosition.imag:
+					bestPosition = complex(x, y)
+		return bestPosition
+
+
+class PlatePart:
+	'A class to hold the layers, move templates and convex hull of a part crafted up to multiply.'
+	def __init__(self, fileName, gcodeText, quantity):
+		'Parse the part text once.'
+		self.crafting = None
+		self.edgeWidth = None
+		self.fileName = fileName
+		self.headerEndIndex = 0
+		self.layerTable = {}
+		self.lines = archive.getTextLines(gcodeText)
+		self.moveTemplates = [None] * len(self.lines)
+		self.quantity = quantity
+		self.zTable = {}
+		decimalPlacesCarried = 4
+		isExtrusionActive = False
+		layerBeginIndex = None
+		layerZ = None
+		location = None
+		extrusionPoints = []
+		for lineIndex, line in enumerate(self.lines):
+			splitLine = gcodec.getSplitLineBeforeBracketSemicolon(line)
+			firstWord = gcodec.getFirstWord(splitLine)
+			if firstWord in globalMoveFormatTable:
+				location = gcodec.getLocationFromSplitLine(location, splitLine)
+				zString = euclidean.getRoundedToPlacesString(decimalPlacesCarried, location.z)
+				self.moveTemplates[lineIndex] = (globalMoveFormatTable[firstWord] % zString, location.x, location.y)
+				if firstWord == 'G1' and isExtrusionActive:
+					extrusionPoints.append(location.dropAxis())
+			elif firstWord == 'M101':
+				isExtrusionActive = True
+			elif firstWord == 'M103':
+				isExtrusionActive = False
+			elif firstWord == '(<bridgeRotation>' or firstWord == '(<rotation>':
+				self.moveTemplates[lineIndex] = (firstWord[2 : -1], gcodec.getRotationBySplitLine(splitLine))
+			elif firstWord == '(<layer>':
+				layerBeginIndex = lineIndex + 1
+				layerZ = float(splitLine[1])
+				self.zTable[layerZ] = line
+			elif firstWord == '(</layer>)':
+				if layerBeginIndex != None:
+					self.layerTable[layerZ] = (layerBeginIndex, lineIndex)
+				layerBeginIndex = None
+			elif firstWord == '(<decimalPlacesCarried>':
+				decimalPlacesCarried = int(splitLine[1])
+			elif firstWord == '(<edgeWidth>':
+				self.edgeWidth = abs(float(splitLine[1]))
+			elif firstWord == '(</extruderInitialization>)':
+				self.headerEndIndex = lineIndex
+			elif firstWord == '(</crafting>)':
+				self.crafting = lineIndex
+		self.convexHull = euclidean.getLoopConvexMonotone(extrusionPoints)
+
+	def __repr__(self):
+		'Get the string representation of this plate part.'
+		return '%s, %s, %s' % (self.fileName, self.quantity, len(self.layerTable))
+
+	def getArea(self):
+		'Get the area of the bounding rectangle of the convex hull.'
+		size = euclidean.getMaximumByComplexPath(self.convexHull) - euclidean.getMinimumByComplexPath(self.convexHull)
+		return size.real * size.imag
+
+
+class PlateSkein:
+	'A class to pack parts onto the plate and merge their layers.'
+	def __init__(self):
+		'Initialize.'
+		self.distanceFeedRate = gcodec.DistanceFeedRate()
+		self.plateInstances = []
+
+	def addPlateInstances(self, plateParts):
+		'Pack the instances of the parts onto the plate, largest first.'
+		plateSize = complex(self.repository.plateWidth.value, self.repository.plateDepth.value)
+		platePacker = PlatePacker(plateSize)
+		rotations = [complex(1.0, 0.0)]
+		rotationStep = self.repository.plateRotationStep.value
+		if rotationStep > 0.0:
+			for rotationIndex in xrange(1, int(math.ceil(180.0 / rotationStep - globalPlateTolerance))):
+				rotations.append(euclidean.getWiddershinsUnitPolar(math.radians(rotationIndex * rotationStep)))
+		separationComplex = complex(self.separation, self.separation)
+		sortedParts = sorted(plateParts, key=lambda platePart: -platePart.getArea())
+		for platePart in sortedParts:
+			orientations = []
+			for rotation in rotations:
+				rotatedHull = euclidean.getRotatedComplexes(rotation, platePart.convexHull)
+				cornerMinimum = euclidean.getMinimumByComplexPath(rotatedHull)
+				size = euclidean.getMaximumByComplexPath(rotatedHull) - cornerMinimum + separationComplex
+				orientations.append((cornerMinimum, rotation, size))
+			for instanceIndex in xrange(platePart.quantity):
+				bestPlacement = None
+				for cornerMinimum, rotation, size in orientations:
+					position = platePacker.getPosition(size)
+					if position != None:
+						score = (position.imag + size.imag, position.real)
+						if bestPlacement == None or score < bestPlacement[0]:
+							bestPlacement = (score, cornerMinimum, position, rotation, size)
+				if bestPlacement == None:
+					print('Warning, the plate is full, so %s of %s of the part are left off the plate:' % (platePart.quantity - instanceIndex, platePart.quantity))
+					print(platePart.fileName)
+					break
+				score, cornerMinimum, position, rotation, size = bestPlacement
+				platePacker.addRectangle(position, size)
+				offset = position + 0.5 * separationComplex - cornerMinimum
+				self.plateInstances.append(PlateInstance(offset, platePart, rotation))
+				self.packedExtent = euclidean.getMaximum(self.packedExtent, position + size - separationComplex)
+
+	def getCraftedGcode(self, plateParts, repository):
+		'Pack the parts and get the merged gcode.'
+		self.repository = repository
+		firstPart = plateParts[0]
+		edgeWidth = firstPart.edgeWidth
+		if edgeWidth == None:
+			edgeWidth = 0.4
+		self.separation = repository.separationOverEdgeWidth.value * edgeWidth
+		self.packedExtent = complex()
+		self.addPlateInstances(plateParts)
+		if len(self.plateInstances) < 1:
+			return ''
+		center = complex(repository.centerX.value, repository.centerY.value)
+		shift = center - 0.5 * self.packedExtent
+		for plateInstance in self.plateInstances:
+			plateInstance.offset += shift
+		for lineIndex in xrange(firstPart.headerEndIndex):
+			line = firstPart.lines[lineIndex]
+			self.distanceFeedRate.parseSplitLine(gcodec.getFirstWordFromLine(line), line.split())
+			self.distanceFeedRate.addLine(line)
+		self.distanceFeedRate.addTagBracketedProcedure('multiply')
+		firstLayerIndex = len(firstPart.lines)
+		if len(firstPart.layerTable) > 0:
+			firstLayerIndex = min(firstPart.layerTable.values())[0] - 1
+		self.distanceFeedRate.addLines(firstPart.lines[firstPart.headerEndIndex : firstLayerIndex])
+		zLines = {}
+		for platePart in plateParts:
+			zLines.update(platePart.zTable)
+		zs = sorted(zLines.keys())
+		for layerIndex, z in enumerate(zs):
+			settings.printProgressByNumber(layerIndex, len(zs), 'multiply')
+			self.distanceFeedRate.addLine(zLines[z])
+			for plateInstance in self.plateInstances:
+				plateInstance.addLayer(self.distanceFeedRate, z)
+			self.distanceFeedRate.addLine('(</layer>)')
+		if firstPart.crafting != None:
+			self.distanceFeedRate.addLines(firstPart.lines[firstPart.crafting :])
+		return self.distanceFeedRate.output.getvalue()
+
+
 def main():
 	'Display the multiply dialog.'
-	if len(sys.argv) > 1:
+	if len(sys.argv) > 2 and sys.argv[1] == '--plate':
+		writePlateOutput(getFileNameQuantities(sys.argv[2 :]))
+	elif len(sys.argv) > 1:
 		writeOutput(' '.join(sys.argv[1 :]))
 	else:
 		settings.startMainLoopFromConstructor(getNewRepository())
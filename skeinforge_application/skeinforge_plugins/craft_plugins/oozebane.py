@@ -71,6 +71,7 @@ from __future__ import absolute_import
 import __init__
 
 from fabmetheus_utilities.fabmetheus_tools import fabmetheus_interpret
+from fabmetheus_utilities.vector3 import Vector3
 from fabmetheus_utilities import archive
 from fabmetheus_utilities import euclidean
 from fabmetheus_utilities import gcodec
@@ -175,16 +176,17 @@ class OozebaneSkein:
 
 	def getActiveFeedRateRatio(self):
 		"Get the feed rate of the first active move over the operating feed rate."
-		isSearchExtruderActive = self.isExtruderActive
-		for afterIndex in xrange(self.lineIndex, len(self.lines)):
-			line = self.lines[ afterIndex ]
-			splitLine = gcodec.getSplitLineBeforeBracketSemicolon(line)
-			firstWord = gcodec.getFirstWord(splitLine)
-			if firstWord == 'G1':
-				if isSearchExtruderActive:
-					return gcodec.getFeedRateMinute( self.feedRateMinute, splitLine ) / self.operatingFeedRateMinute
-			elif firstWord == 'M101':
-				isSearchExtruderActive = True
+		searchIndex = self.lineIndex
+		if not self.isExtruderActive:
+			extruderOnIndex = self.threadIndex.getNextIndex(self.threadIndex.nextExtruderOnIndexes, self.lineIndex)
+			searchIndex = None
+			if extruderOnIndex != None:
+				searchIndex = extruderOnIndex + 1
+		if searchIndex != None:
+			moveIndex = self.threadIndex.getNextIndex(self.threadIndex.nextMoveIndexes, searchIndex)
+			if moveIndex != None:
+				splitLine = gcodec.getSplitLineBeforeBracketSemicolon(self.lines[moveIndex])
+				return gcodec.getFeedRateMinute( self.feedRateMinute, splitLine ) / self.operatingFeedRateMinute
 		print('active feed rate ratio was not found in oozebane.')
 		return 1.0
 
@@ -269,6 +271,7 @@ class OozebaneSkein:
 	def getCraftedGcode( self, gcodeText, oozebaneRepository ):
 		"Parse gcode text and store the oozebane gcode."
 		self.lines = archive.getTextLines(gcodeText)
+		self.threadIndex = gcodec.ThreadIndex(self.lines)
 		self.oozebaneRepository = oozebaneRepository
 		self.parseInitialization( oozebaneRepository )
 		for self.lineIndex in xrange(self.lineIndex, len(self.lines)):
@@ -276,95 +279,59 @@ class OozebaneSkein:
 			self.parseLine(line)
 		return self.distanceFeedRate.output.getvalue()
 
+	def getCurrentLocation(self):
+		"Get the location of the current line."
+		location = self.threadIndex.locations[self.lineIndex]
+		if location == None:
+			return Vector3()
+		return location
+
 	def getDistanceAfterThreadBeginning(self):
 		"Get the distance after the beginning of the thread."
-		line = self.lines[self.lineIndex]
-		splitLine = gcodec.getSplitLineBeforeBracketSemicolon(line)
-		lastThreadLocation = gcodec.getLocationFromSplitLine(self.oldLocation, splitLine)
-		totalDistance = 0.0
-		extruderOnReached = False
-		for beforeIndex in xrange( self.lineIndex - 1, 3, - 1 ):
-			line = self.lines[ beforeIndex ]
-			splitLine = gcodec.getSplitLineBeforeBracketSemicolon(line)
-			firstWord = gcodec.getFirstWord(splitLine)
-			if firstWord == 'G1':
-				location = gcodec.getLocationFromSplitLine( lastThreadLocation, splitLine )
-				totalDistance += location.distance( lastThreadLocation )
-				lastThreadLocation = location
-				if extruderOnReached:
-					return totalDistance
-			elif firstWord == 'M101':
-				extruderOnReached = True
-		return None
+		extruderOnIndex = self.threadIndex.getPreviousIndex(self.threadIndex.previousExtruderOnIndexes, self.lineIndex - 1)
+		if extruderOnIndex == None or extruderOnIndex < 5:
+			return None
+		threadBeginningIndex = self.threadIndex.getPreviousIndex(self.threadIndex.previousMoveIndexes, extruderOnIndex - 1)
+		if threadBeginningIndex == None or threadBeginningIndex < 4:
+			return None
+		lastMoveIndex = self.threadIndex.previousMoveIndexes[self.lineIndex - 1]
+		lastMoveDistance = self.getCurrentLocation().distance(self.threadIndex.locations[lastMoveIndex])
+		return self.threadIndex.cumulativeDistances[lastMoveIndex] - self.threadIndex.cumulativeDistances[threadBeginningIndex] + lastMoveDistance
 
 	def getDistanceToExtruderOffCommand( self, remainingDistance ):
 		"Get the distance to the word."
-		line = self.lines[self.lineIndex]
-		splitLine = gcodec.getSplitLineBeforeBracketSemicolon(line)
-		lastThreadLocation = gcodec.getLocationFromSplitLine(self.oldLocation, splitLine)
-		totalDistance = 0.0
-		for afterIndex in xrange( self.lineIndex + 1, len(self.lines) ):
-			line = self.lines[ afterIndex ]
-			splitLine = gcodec.getSplitLineBeforeBracketSemicolon(line)
-			firstWord = gcodec.getFirstWord(splitLine)
-			if firstWord == 'G1':
-				location = gcodec.getLocationFromSplitLine( lastThreadLocation, splitLine )
-				totalDistance += location.distance( lastThreadLocation )
-				lastThreadLocation = location
-				if totalDistance >= remainingDistance:
-					return None
-			elif firstWord == 'M103':
-				return totalDistance
-		return None
+		return self.getDistanceToNextIndex(self.threadIndex.nextExtruderOffIndexes, remainingDistance)
+
+	def getDistanceToNextIndex(self, nextIndexes, remainingDistance):
+		"Get the distance to the next index, or None if there is no next index or if the distance is not less than the remaining distance."
+		nextIndex = self.threadIndex.getNextIndex(nextIndexes, self.lineIndex + 1)
+		if nextIndex == None:
+			return None
+		totalDistance = self.threadIndex.getDistance(self.lineIndex, self.getCurrentLocation(), nextIndex)
+		if self.threadIndex.getMoveCount(self.lineIndex, nextIndex) > 0 and totalDistance >= remainingDistance:
+			return None
+		return totalDistance
 
 	def getDistanceToThreadBeginning(self):
 		"Get the distance to the beginning of the thread."
 		if self.earlyStartupDistance is None:
 			return None
-		line = self.lines[self.lineIndex]
-		splitLine = gcodec.getSplitLineBeforeBracketSemicolon(line)
-		lastThreadLocation = gcodec.getLocationFromSplitLine(self.oldLocation, splitLine)
-		totalDistance = 0.0
-		for afterIndex in xrange( self.lineIndex + 1, len(self.lines) ):
-			line = self.lines[ afterIndex ]
-			splitLine = gcodec.getSplitLineBeforeBracketSemicolon(line)
-			firstWord = gcodec.getFirstWord(splitLine)
-			if firstWord == 'G1':
-				location = gcodec.getLocationFromSplitLine( lastThreadLocation, splitLine )
-				totalDistance += location.distance( lastThreadLocation )
-				lastThreadLocation = location
-				if totalDistance >= self.earlyStartupDistance:
-					return None
-			elif firstWord == 'M101':
-				return totalDistance
-		return None
+		return self.getDistanceToNextIndex(self.threadIndex.nextExtruderOnIndexes, self.earlyStartupDistance)
 
 	def getDistanceToThreadBeginningAfterThreadEnd( self, remainingDistance ):
 		"Get the distance to the thread beginning after the end of this thread."
-		extruderOnReached = False
-		line = self.lines[self.lineIndex]
-		splitLine = gcodec.getSplitLineBeforeBracketSemicolon(line)
-		lastThreadLocation = gcodec.getLocationFromSplitLine(self.oldLocation, splitLine)
-		threadEndReached = False
-		totalDistance = 0.0
-		for afterIndex in xrange( self.lineIndex + 1, len(self.lines) ):
-			line = self.lines[ afterIndex ]
-			splitLine = gcodec.getSplitLineBeforeBracketSemicolon(line)
-			firstWord = gcodec.getFirstWord(splitLine)
-			if firstWord == 'G1':
-				location = gcodec.getLocationFromSplitLine( lastThreadLocation, splitLine )
-				if threadEndReached:
-					totalDistance += location.distance( lastThreadLocation )
-					if totalDistance >= remainingDistance:
-						return None
-					if extruderOnReached:
-						return totalDistance
-				lastThreadLocation = location
-			elif firstWord == 'M101':
-				extruderOnReached = True
-			elif firstWord == 'M103':
-				threadEndReached = True
-		return None
+		extruderOffIndex = self.threadIndex.getNextIndex(self.threadIndex.nextExtruderOffIndexes, self.lineIndex + 1)
+		extruderOnIndex = self.threadIndex.getNextIndex(self.threadIndex.nextExtruderOnIndexes, self.lineIndex + 1)
+		if extruderOffIndex == None or extruderOnIndex == None:
+			return None
+		threadBeginningIndex = self.threadIndex.getNextIndex(self.threadIndex.nextMoveIndexes, max(extruderOffIndex, extruderOnIndex) + 1)
+		if threadBeginningIndex == None:
+			return None
+		threadEndLocation = self.threadIndex.getLocation(self.lineIndex, self.getCurrentLocation(), extruderOffIndex)
+		totalDistance = self.threadIndex.getDistance(extruderOffIndex, threadEndLocation, threadBeginningIndex)
+		if totalDistance >= remainingDistance:
+			return None
+		return totalDistance
 
 	def getDistanceToThreadEnd(self):
 		"Get the distance to the end of the thread."
@@ -542,22 +509,17 @@ class OozebaneSkein:
 		lastThreadLocation = gcodec.getLocationFromSplitLine(self.oldLocation, splitLine)
 		if self.oldLocation is not None:
 			self.distanceFromThreadEndToThreadBeginning = lastThreadLocation.distance( self.oldLocation )
-		for afterIndex in xrange( self.lineIndex + 1, len(self.lines) ):
-			line = self.lines[ afterIndex ]
-			splitLine = gcodec.getSplitLineBeforeBracketSemicolon(line)
-			firstWord = gcodec.getFirstWord(splitLine)
-			if firstWord == 'G1':
-				location = gcodec.getLocationFromSplitLine( lastThreadLocation, splitLine )
-				self.distanceFromThreadEndToThreadBeginning += location.distance( lastThreadLocation )
-				lastThreadLocation = location
-			elif firstWord == 'M101':
-				distanceConstantRatio = self.distanceFromThreadEndToThreadBeginning / self.earlyStartupDistanceConstant
-				earlyStartupOperatingDistance = self.earlyStartupMaximumDistance * ( 1.0 - math.exp( - distanceConstantRatio ) )
-				if self.isFirstExtrusion:
-					earlyStartupOperatingDistance = self.oozebaneRepository.firstEarlyStartupDistance.value
-					self.isFirstExtrusion = False
-				self.earlyStartupDistance = earlyStartupOperatingDistance * self.getActiveFeedRateRatio()
-				return
+		extruderOnIndex = self.threadIndex.getNextIndex(self.threadIndex.nextExtruderOnIndexes, self.lineIndex + 1)
+		if extruderOnIndex == None:
+			self.distanceFromThreadEndToThreadBeginning += self.threadIndex.getDistance(self.lineIndex, lastThreadLocation, len(self.lines) - 1)
+			return
+		self.distanceFromThreadEndToThreadBeginning += self.threadIndex.getDistance(self.lineIndex, lastThreadLocation, extruderOnIndex)
+		distanceConstantRatio = self.distanceFromThreadEndToThreadBeginning / self.earlyStartupDistanceConstant
+		earlyStartupOperatingDistance = self.earlyStartupMaximumDistance * ( 1.0 - math.exp( - distanceConstantRatio ) )
+		if self.isFirstExtrusion:
+			earlyStartupOperatingDistance = self.oozebaneRepository.firstEarlyStartupDistance.value
+			self.isFirstExtrusion = False
+		self.earlyStartupDistance = earlyStartupOperatingDistance * self.getActiveFeedRateRatio()
 
 	def setExtrusionWidth( self, oozebaneRepository ):
 		"Set the extrusion width."
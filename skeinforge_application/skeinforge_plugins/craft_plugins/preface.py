@@ -209,7 +209,7 @@ class PrefaceSkein:
 	def getCraftedGcode( self, repository, gcodeText ):
 		"Parse gcode text and store the bevel gcode."
 		self.repository = repository
-		self.svgReader.parseSVG('', gcodeText)
+		self.svgReader.parseSVGByHandoffOrText('', gcodeText)
 		if self.svgReader.sliceDictionary == None:
 			print('Warning, nothing will be done because the sliceDictionary could not be found getCraftedGcode in preface.')
 			return ''
@@ -174,11 +174,34 @@ When selected, support material will be added only the exterior of the object.
 =====None=====
 When selected, raft will not add support material.
 
+=====Tree=====
+When selected, the support material will be a tree of branches instead of columns.  Contact points are sampled under the overhangs, a contact point which is too close to the object drops straight down until it is clear, then from it a branch grows down to the raft or to the object.  On the way down a branch leans towards its nearest neighbor, so the branches merge, and it leans away from the object when it would otherwise touch it.  Tree support uses less material than columns and leaves fewer marks on the object, the tree support settings are below.
+
 ====Support Minimum Angle====
 Default is sixty degrees.
 
 Defines the minimum angle that a surface overhangs before support material is added.  If angle is lower then this value the support will be generated.  This angle is defined from the vertical, so zero is a vertical wall, ten is a wall with a bit of overhang, thirty is the typical safe angle for filament extrusion, sixty is a really high angle for extrusion and ninety is an unsupported horizontal ceiling.
 
+====Tree Branch Angle====
+Default is forty degrees.
+
+Defines the largest angle from the vertical that a tree branch leans by when it moves towards another branch or away from the object.
+
+====Tree Branch Radius====
+Default is one millimeter.
+
+Defines the radius of the tree branches, each branch is printed as concentric circles with this outer radius.
+
+====Tree Contact Spacing====
+Default is three millimeters.
+
+Defines the spacing of the grid on which the contact points are sampled under the overhangs.
+
+====Tree Merge Distance====
+Default is eight millimeters.
+
+Defines the distance within which a tree branch leans towards the nearest other branch, so that they merge into one.
+
 ==Examples==
 The following examples raft the file Screw Holder Bottom.stl.  The examples are run in a terminal in the folder which contains Screw Holder Bottom.stl and raft.py.
 
@@ -219,6 +242,9 @@ __date__ = '$Date: 2008/21/04 $'
 __license__ = 'GNU Affero General Public License http://www.gnu.org/licenses/agpl.html'
 
 
+globalTreeBranchSides = 12
+
+
 #maybe later wide support
 #raft outline temperature http://hydraraptor.blogspot.com/2008/09/screw-top-pot.html
 def getCraftedText( fileName, text='', repository=None):
@@ -384,7 +410,14 @@ class RaftRepository:
 		self.supportChoiceEmptyLayersOnly = settings.MenuRadio().getFromMenuButtonDisplay(self.supportMaterialChoice, 'Empty Layers Only', self, False)
 		self.supportChoiceEverywhere = settings.MenuRadio().getFromMenuButtonDisplay(self.supportMaterialChoice, 'Everywhere', self, False)
 		self.supportChoiceExteriorOnly = settings.MenuRadio().getFromMenuButtonDisplay(self.supportMaterialChoice, 'Exterior Only', self, False)
+		self.supportChoiceTree = settings.MenuRadio().getFromMenuButtonDisplay(self.supportMaterialChoice, 'Tree', self, False)
 		self.supportMinimumAngle = settings.FloatSpin().getFromValue(-20.0, 'Add more or less support (Degrees):', self, 20.0, 0.0)
+		settings.LabelSeparator().getFromRepository(self)
+		settings.LabelDisplay().getFromName('- Tree Support -', self)
+		self.treeBranchAngle = settings.FloatSpin().getFromValue(0.0, 'Tree Branch Angle (degrees):', self, 60.0, 40.0)
+		self.treeBranchRadius = settings.FloatSpin().getFromValue(0.3, 'Tree Branch Radius (mm):', self, 3.0, 1.0)
+		self.treeContactSpacing = settings.FloatSpin().getFromValue(1.0, 'Tree Contact Spacing (mm):', self, 10.0, 3.0)
+		self.treeMergeDistance = settings.FloatSpin().getFromValue(1.0, 'Tree Merge Distance (mm):', self, 20.0, 8.0)
 		self.executeTitle = 'Raft'
 
 	def execute(self):
@@ -429,7 +462,9 @@ class RaftSkein:
 		self.operatingLayerEndLine = '(<operatingLayerEnd> </operatingLayerEnd>)'
 		self.operatingJump = None
 		self.orbitalFeedRatePerSecond = None
+		self.orbitLoopTable = {}
 		self.sharpestProduct = 0.94
+		self.subStepXIntersectionsTables = {}
 		self.supportFeedRate = None
 		self.supportFlowRate = None
 		self.supportLayers = []
@@ -490,16 +525,13 @@ class RaftSkein:
 			self.interfaceIntersectionsTable[yKey].sort()
 			y = yKey * self.interfaceStep
 			lineSegments = euclidean.getSegmentsFromXIntersections(self.interfaceIntersectionsTable[yKey], y)
-			xIntersectionIndexList = []
-			for lineSegmentIndex in xrange(len(lineSegments)):
-				lineSegment = lineSegments[lineSegmentIndex]
-				endpointBegin = lineSegment[0]
-				endpointEnd = lineSegment[1]
-				endpointBegin.point = complex(self.baseStep * math.floor(endpointBegin.point.real / self.baseStep) - overhang, y)
-				endpointEnd.point = complex(self.baseStep * math.ceil(endpointEnd.point.real / self.baseStep) + overhang, y)
-				if endpointEnd.point.real > endpointBegin.point.real:
-					euclidean.addXIntersectionIndexesFromSegment(lineSegmentIndex, lineSegment, xIntersectionIndexList)
-			xIntersections = euclidean.getJoinOfXIntersectionIndexes(xIntersectionIndexList)
+			xIntersectionLists = []
+			for lineSegment in lineSegments:
+				beginX = self.baseStep * math.floor(lineSegment[0].point.real / self.baseStep) - overhang
+				endX = self.baseStep * math.ceil(lineSegment[1].point.real / self.baseStep) + overhang
+				if endX > beginX:
+					xIntersectionLists.append([beginX, endX])
+			xIntersections = euclidean.getJoinOfXIntersectionLists(xIntersectionLists)
 			joinedSegments = euclidean.getSegmentsFromXIntersections(xIntersections, y)
 			if len(joinedSegments) > 0:
 				self.interfaceSegmentsTable[yKey] = joinedSegments
@@ -683,11 +715,14 @@ class RaftSkein:
 				y = xIntersectionsTableKey * self.interfaceStep
 				supportLayer.supportSegmentTable[ xIntersectionsTableKey ] = euclidean.getSegmentsFromXIntersections( xIntersectionsTable[ xIntersectionsTableKey ], y )
 
-	def addSupportLayerTemperature(self, endpoints, z):
+	def addSupportLayerTemperature(self, endpoints, treeLoops, z):
 		'Add support layer and temperature before the object layer.'
 		self.distanceFeedRate.addLine('(<supportLayer>)')
 		self.distanceFeedRate.addLinesSetAbsoluteDistanceMode(self.supportStartLines)
-		self.addTemperatureOrbits(endpoints, self.supportedLayersTemperature, z)
+		supportPoints = [endpoint.point for endpoint in endpoints]
+		for treeLoop in treeLoops:
+			supportPoints += treeLoop
+		self.addTemperatureOrbits(supportPoints, self.supportedLayersTemperature, z)
 		aroundPixelTable = {}
 		aroundWidth = 0.34321 * self.interfaceStep
 		boundaryLoops = self.boundaryLayers[self.layerIndex].loops
@@ -696,6 +731,8 @@ class RaftSkein:
 		for aroundBoundaryLoop in aroundBoundaryLoops:
 			euclidean.addLoopToPixelTable(aroundBoundaryLoop, aroundPixelTable, aroundWidth)
 		paths = euclidean.getPathsFromEndpoints(endpoints, 1.5 * self.interfaceStep, aroundPixelTable, self.sharpestProduct, aroundWidth)
+		for treeLoop in treeLoops:
+			paths.append(treeLoop + [treeLoop[0]])
 		feedRateMinuteMultiplied = self.repository.supportFeedRate.value * 60
 		supportFlowRateMultiplied = self.repository.supportFlowRateOverOperatingFlowRate.value*(self.nozzleXsection / self.extrusionXsection)
 		self.travelFeedRateMinute = None #self.repository.supportFeedRate.value * 60
@@ -708,7 +745,7 @@ class RaftSkein:
 		for path in paths:
 			self.distanceFeedRate.addGcodeFromFeedRateThreadZ(feedRateMinuteMultiplied, path, self.travelFeedRateMinute, z)
 		self.addFlowRate(self.oldFlowRate)
-		self.addTemperatureOrbits(endpoints, self.supportLayersTemperature, z)
+		self.addTemperatureOrbits(supportPoints, self.supportLayersTemperature, z)
 		self.distanceFeedRate.addLinesSetAbsoluteDistanceMode(self.supportEndLines)
 		self.distanceFeedRate.addLine('(</supportLayer>)')
 
@@ -719,24 +756,17 @@ class RaftSkein:
 		supportLayer = self.supportLayers[layerIndex]
 		if len( aboveLoops ) < 1:
 			return
-		boundaryLayer = self.boundaryLayers[layerIndex]
-		rise = aboveLayer.z - boundaryLayer.z
 #		print self.minimumSupportRatio ,'for', self.supportAutoAngle
-		outsetSupportLoops = intercircle.getInsetSeparateLoopsFromLoops(boundaryLayer.loops, -self.minimumSupportRatio * rise)
 		numberOfSubSteps = 4
 		subStepSize = self.interfaceStep / float( numberOfSubSteps )
-		aboveIntersectionsTable = {}
-		euclidean.addXIntersectionsFromLoopsForTable( aboveLoops, aboveIntersectionsTable, subStepSize )
-		outsetIntersectionsTable = {}
-		euclidean.addXIntersectionsFromLoopsForTable( outsetSupportLoops, outsetIntersectionsTable, subStepSize )
-		euclidean.subtractXIntersectionsTable( aboveIntersectionsTable, outsetIntersectionsTable )
+		aboveIntersectionsTable = self.getOverhangXIntersectionsTable(layerIndex, subStepSize)
 		for aboveIntersectionsTableKey in aboveIntersectionsTable.keys():
 			supportIntersectionsTableKey = int( round( float( aboveIntersectionsTableKey ) / numberOfSubSteps ) )
-			xIntersectionIndexList = []
+			xIntersectionLists = []
 			if supportIntersectionsTableKey in supportLayer.xIntersectionsTable:
-				euclidean.addXIntersectionIndexesFromXIntersections( 0, xIntersectionIndexList, supportLayer.xIntersectionsTable[ supportIntersectionsTableKey ] )
-			euclidean.addXIntersectionIndexesFromXIntersections( 1, xIntersectionIndexList, aboveIntersectionsTable[ aboveIntersectionsTableKey ] )
-			supportLayer.xIntersectionsTable[ supportIntersectionsTableKey ] = euclidean.getJoinOfXIntersectionIndexes( xIntersectionIndexList )
+				xIntersectionLists.append(supportLayer.xIntersectionsTable[supportIntersectionsTableKey])
+			xIntersectionLists.append(aboveIntersectionsTable[aboveIntersectionsTableKey])
+			supportLayer.xIntersectionsTable[supportIntersectionsTableKey] = euclidean.getJoinOfXIntersectionLists(xIntersectionLists)
 
 	def addTemperatureLineIfDifferent(self, temperature):
 		'Add a line of temperature if different.'
@@ -749,7 +779,7 @@ class RaftSkein:
 			self.distanceFeedRate.addLine('M104 S' + temperatureOutputString) # Set temperature.
 		self.oldTemperatureOutputString = temperatureOutputString
 
-	def addTemperatureOrbits( self, endpoints, temperature, z ):
+	def addTemperatureOrbits( self, supportPoints, temperature, z ):
 		'Add the temperature and orbits around the support layer.'
 		if self.layerIndex < 0:
 			return
@@ -759,17 +789,19 @@ class RaftSkein:
 		if len( boundaryLoops ) < 1:
 			layerCornerHigh = complex(-987654321.0, -987654321.0)
 			layerCornerLow = complex(987654321.0, 987654321.0)
-			for endpoint in endpoints:
-				layerCornerHigh = euclidean.getMaximum( layerCornerHigh, endpoint.point )
-				layerCornerLow = euclidean.getMinimum( layerCornerLow, endpoint.point )
+			for supportPoint in supportPoints:
+				layerCornerHigh = euclidean.getMaximum( layerCornerHigh, supportPoint )
+				layerCornerLow = euclidean.getMinimum( layerCornerLow, supportPoint )
 			squareLoop = euclidean.getSquareLoopWiddershins( layerCornerLow, layerCornerHigh )
 			intercircle.addOrbitsIfLarge( self.distanceFeedRate, squareLoop, self.orbitalFeedRatePerSecond, temperatureTimeChange, z )
 			return
-		edgeInset = 0.4 * self.edgeWidth
-		insetBoundaryLoops = intercircle.getInsetLoopsFromLoops(boundaryLoops, edgeInset)
-		if len( insetBoundaryLoops ) < 1:
-			insetBoundaryLoops = boundaryLoops
-		largestLoop = euclidean.getLargestLoop( insetBoundaryLoops )
+		if self.layerIndex not in self.orbitLoopTable:
+			edgeInset = 0.4 * self.edgeWidth
+			insetBoundaryLoops = intercircle.getInsetLoopsFromLoops(boundaryLoops, edgeInset)
+			if len( insetBoundaryLoops ) < 1:
+				insetBoundaryLoops = boundaryLoops
+			self.orbitLoopTable = {self.layerIndex : euclidean.getLargestLoop(insetBoundaryLoops)}
+		largestLoop = self.orbitLoopTable[self.layerIndex]
 		intercircle.addOrbitsIfLarge( self.distanceFeedRate, largestLoop, self.orbitalFeedRatePerSecond, temperatureTimeChange, z )
 
 	def addToFillXIntersectionIndexTables( self, supportLayer ):
@@ -785,15 +817,14 @@ class RaftSkein:
 		xIntersectionsTableKeys = xIntersectionsTable.keys()
 		for xIntersectionsTableKey in xIntersectionsTableKeys:
 			lineSegments = euclidean.getSegmentsFromXIntersections( xIntersectionsTable[ xIntersectionsTableKey ], xIntersectionsTableKey )
-			xIntersectionIndexList = []
+			xIntersectionLists = []
 			loopXIntersections = []
 			euclidean.addXIntersectionsFromLoops( loops, loopXIntersections, xIntersectionsTableKey )
-			for lineSegmentIndex in xrange( len( lineSegments ) ):
-				lineSegment = lineSegments[ lineSegmentIndex ]
+			for lineSegment in lineSegments:
 				extendedLineSegment = getExtendedLineSegment( radius, lineSegment, loopXIntersections )
 				if extendedLineSegment != None:
-					euclidean.addXIntersectionIndexesFromSegment( lineSegmentIndex, extendedLineSegment, xIntersectionIndexList )
-			xIntersections = euclidean.getJoinOfXIntersectionIndexes( xIntersectionIndexList )
+					xIntersectionLists.append([extendedLineSegment[0].point.real, extendedLineSegment[1].point.real])
+			xIntersections = euclidean.getJoinOfXIntersectionLists(xIntersectionLists)
 			if len( xIntersections ) > 0:
 				xIntersectionsTable[ xIntersectionsTableKey ] = xIntersections
 			else:
@@ -845,6 +876,16 @@ class RaftSkein:
 				return self.getInsetLoops( belowLayerIndex )
 		return []
 
+	def getOverhangXIntersectionsTable(self, layerIndex, subStepSize):
+		'Get the sub step x intersections table of the part of the layer above which overhangs the boundary layer by more than the support angle.'
+		aboveLayer = self.boundaryLayers[layerIndex + 1]
+		rise = aboveLayer.z - self.boundaryLayers[layerIndex].z
+		aboveIntersectionsTable = self.getSubStepXIntersectionsTable(layerIndex + 1, subStepSize).copy()
+		boundaryIntersectionsTable = self.getSubStepXIntersectionsTable(layerIndex, subStepSize)
+		outsetIntersectionsTable = euclidean.getDilatedXIntersectionsTable(boundaryIntersectionsTable, self.minimumSupportRatio * rise, subStepSize)
+		euclidean.subtractXIntersectionsTable(aboveIntersectionsTable, outsetIntersectionsTable)
+		return aboveIntersectionsTable
+
 	def getStepsUntilEnd( self, begin, end, stepSize ):
 		'Get steps from the beginning until the end.'
 		step = begin
@@ -854,6 +895,17 @@ class RaftSkein:
 			step += stepSize
 		return steps
 
+	def getSubStepXIntersectionsTable(self, boundaryLayerIndex, subStepSize):
+		'Get the sub step x intersections table of the boundary layer, keeping only the tables of the layer and the layer above, because the support segment tables are added from the bottom up.'
+		if boundaryLayerIndex not in self.subStepXIntersectionsTables:
+			xIntersectionsTable = {}
+			euclidean.addXIntersectionsFromLoopsForTable(self.boundaryLayers[boundaryLayerIndex].loops, xIntersectionsTable, subStepSize)
+			for oldBoundaryLayerIndex in self.subStepXIntersectionsTables.keys():
+				if oldBoundaryLayerIndex < boundaryLayerIndex - 1:
+					del self.subStepXIntersectionsTables[oldBoundaryLayerIndex]
+			self.subStepXIntersectionsTables[boundaryLayerIndex] = xIntersectionsTable
+		return self.subStepXIntersectionsTables[boundaryLayerIndex]
+
 	def getSupportEndpoints(self):
 		'Get the support layer segments.'
 		if len(self.supportLayers) <= self.layerIndex:
@@ -863,6 +915,21 @@ class RaftSkein:
 			return getVerticalEndpoints(supportSegmentTable, self.interfaceStep, 0.1 * self.edgeWidth, self.interfaceStep)
 		return euclidean.getEndpointsFromSegmentTable(supportSegmentTable)
 
+	def getSupportTreeLoops(self):
+		'Get the concentric loops of the tree support branches of the layer, from the outside in.'
+		if len(self.supportLayers) <= self.layerIndex:
+			return []
+		halfEdgeWidth = 0.5 * self.edgeWidth
+		treeLoops = []
+		for treePoint in self.supportLayers[self.layerIndex].treePoints:
+			radius = max(self.repository.treeBranchRadius.value - halfEdgeWidth, self.quarterEdgeWidth)
+			treeLoops.append(euclidean.getComplexPolygon(treePoint, radius, globalTreeBranchSides))
+			radius -= self.edgeWidth
+			while radius > halfEdgeWidth:
+				treeLoops.append(euclidean.getComplexPolygon(treePoint, radius, globalTreeBranchSides))
+				radius -= self.edgeWidth
+		return treeLoops
+
 	def getTemperatureChangeTime( self, temperature ):
 		'Get the temperature change time.'
 		if temperature == None:
@@ -876,6 +943,28 @@ class RaftSkein:
 			return ( temperature - oldTemperature ) / self.heatingRate
 		return ( oldTemperature - temperature ) / abs( self.coolingRate )
 
+	def getTreeContactPoints(self, layerIndex, subStepSize):
+		'Get the contact points of the tree support, on a grid under the overhang of the layer above the boundary layer.'
+		contactSpacing = self.repository.treeContactSpacing.value
+		rowsPerContact = max(1, int(round(contactSpacing / subStepSize)))
+		contactPoints = []
+		overhangIntersectionsTable = self.getOverhangXIntersectionsTable(layerIndex, subStepSize)
+		for overhangIntersectionsTableKey in overhangIntersectionsTable:
+			if overhangIntersectionsTableKey % rowsPerContact != 0:
+				continue
+			y = overhangIntersectionsTableKey * subStepSize
+			xIntersections = sorted(overhangIntersectionsTable[overhangIntersectionsTableKey])
+			for xIntersectionIndex in xrange(0, len(xIntersections) - 1, 2):
+				beginX = xIntersections[xIntersectionIndex]
+				endX = xIntersections[xIntersectionIndex + 1]
+				beginIndex = int(math.ceil(beginX / contactSpacing))
+				endIndex = int(math.floor(endX / contactSpacing))
+				if beginIndex > endIndex:
+					contactPoints.append(complex(0.5 * (beginX + endX), y))
+				for contactIndex in xrange(beginIndex, endIndex + 1):
+					contactPoints.append(complex(contactIndex * contactSpacing, y))
+		return contactPoints
+
 	def parseInitialization(self):
 		'Parse gcode initialization and store the parameters.'
 		for self.lineIndex in xrange(len(self.lines)):
@@ -990,14 +1079,15 @@ class RaftSkein:
 			self.addLineLayerStart = True
 			line = ''
 			endpoints = self.getSupportEndpoints()
+			treeLoops = self.getSupportTreeLoops()
 			if self.layerIndex == 1:
-				if len(endpoints) < 1:
+				if len(endpoints) < 1 and len(treeLoops) < 1:
 					temperatureChangeTimeBeforeNextLayers = self.getTemperatureChangeTime( self.objectNextLayersTemperature )
 					self.addTemperatureLineIfDifferent( self.objectNextLayersTemperature )
 					if self.repository.addRaftElevateNozzleOrbitSetAltitude.value and len( boundaryLayer.loops ) > 0:
 						self.addOperatingOrbits( boundaryLayer.loops, euclidean.getXYComplexFromVector3( self.oldLocation ), temperatureChangeTimeBeforeNextLayers, layerZ )
-			if len(endpoints) > 0:
-				self.addSupportLayerTemperature( endpoints, layerZ )
+			if len(endpoints) > 0 or len(treeLoops) > 0:
+				self.addSupportLayerTemperature( endpoints, treeLoops, layerZ )
 		elif firstWord == '(<edge>' or firstWord == '(<edgePath>)':
 			self.isEdgePath = True
 		elif firstWord == '(</edge>)' or firstWord == '(</edgePath>)':
@@ -1018,6 +1108,9 @@ class RaftSkein:
 			self.truncateSupportSegmentTables()
 			self.addSegmentTablesToSupportLayers()
 			return
+		if self.repository.supportChoiceTree.value:
+			self.setTreeSupportLayers()
+			return
 		for boundaryLayer in self.boundaryLayers:
 			# thresholdRadius of 0.8 is needed to avoid the ripple inset bug http://hydraraptor.blogspot.com/2010/12/crackers.html
 			supportLoops = intercircle.getInsetSeparateLoopsFromLoops(boundaryLayer.loops, -self.supportOutset, 0.8)
@@ -1078,6 +1171,44 @@ class RaftSkein:
 					if layerIndex > 1:
 						return
 
+	def setTreeSupportLayers(self):
+		'Grow the tree support branches down from the contact points and add the branch points and the raft table of the roots to the support layers.'
+		numberOfSubSteps = 4
+		subStepSize = self.interfaceStep / float(numberOfSubSteps)
+		contactPointsTable = {}
+		for layerIndex in xrange(len(self.boundaryLayers) - 1):
+			if len(self.boundaryLayers[layerIndex + 1].loops) > 0:
+				contactPoints = self.getTreeContactPoints(layerIndex, subStepSize)
+				if len(contactPoints) > 0:
+					contactPointsTable[layerIndex] = contactPoints
+		self.subStepXIntersectionsTables = {}
+		if len(contactPointsTable) < 1:
+			return
+		branchRadius = self.repository.treeBranchRadius.value
+		clearance = self.supportOutset + branchRadius
+		maximumLean = self.layerHeight * math.tan(math.radians(self.repository.treeBranchAngle.value))
+		supportTree = SupportTree(branchRadius, maximumLean, self.repository.treeMergeDistance.value, subStepSize)
+		topLayerIndex = max(contactPointsTable.keys())
+		for layerIndex in xrange(topLayerIndex + 1):
+			self.supportLayers.append(SupportLayer([]))
+		for layerIndex in xrange(topLayerIndex, -1, -1):
+			boundaryIntersectionsTable = {}
+			euclidean.addXIntersectionsFromLoopsForTable(self.boundaryLayers[layerIndex].loops, boundaryIntersectionsTable, subStepSize)
+			collisionIntersectionsTable = euclidean.getDilatedXIntersectionsTable(boundaryIntersectionsTable, clearance, subStepSize)
+			for boundaryIntersectionsTableKey in boundaryIntersectionsTable:
+				boundaryIntersectionsTable[boundaryIntersectionsTableKey].sort()
+			contactPoints = []
+			if layerIndex in contactPointsTable:
+				contactPoints = contactPointsTable[layerIndex]
+			supportTree.addLayer(boundaryIntersectionsTable, collisionIntersectionsTable, contactPoints)
+			self.supportLayers[layerIndex].treePoints = supportTree.branchPoints
+		rootIntersectionsTable = self.supportLayers[0].xIntersectionsTable
+		for treePoint in self.supportLayers[0].treePoints:
+			rootLoop = euclidean.getComplexPolygon(treePoint, branchRadius, globalTreeBranchSides)
+			loopIntersectionsTable = {}
+			euclidean.addXIntersectionsFromLoopsForTable([rootLoop], loopIntersectionsTable, self.interfaceStep)
+			euclidean.joinXIntersectionsTables(loopIntersectionsTable, rootIntersectionsTable)
+
 	def subtractJoinedFill( self, supportLayerIndex ):
 		'Join the fill then subtract it from the support layer table.'
 		supportLayer = self.supportLayers[supportLayerIndex]
@@ -1100,6 +1231,7 @@ class SupportLayer:
 	def __init__( self, supportLoops ):
 		self.supportLoops = supportLoops
 		self.supportSegmentTable = {}
+		self.treePoints = []
 		self.xIntersectionsTable = {}
 
 	def __repr__(self):
@@ -1107,6 +1239,100 @@ class SupportLayer:
 		return '%s' % ( self.supportLoops )
 
 
+class SupportTree:
+	'A class to grow the branches of a tree support down a layer at a time.'
+	def __init__(self, branchRadius, maximumLean, mergeDistance, width):
+		'Initialize.'
+		self.branchPoints = []
+		self.branchRadius = branchRadius
+		self.leans = []
+		self.maximumLean = maximumLean
+		self.mergeDistance = max(mergeDistance, branchRadius)
+		self.pendingPoints = []
+		self.width = width
+		for leanIndex in xrange(8):
+			self.leans.append(maximumLean * euclidean.getWiddershinsUnitPolar(0.25 * math.pi * leanIndex))
+
+	def __repr__(self):
+		'Get the string representation of this support tree.'
+		return '%s, %s, %s' % (self.branchRadius, self.branchPoints, self.pendingPoints)
+
+	def addLayer(self, boundaryIntersectionsTable, collisionIntersectionsTable, contactPoints):
+		'Move the branches down a layer, start branches at the contact points which are clear of the object, then merge the branches which touch.'
+		neighborTable = self.getPointTable(self.mergeDistance, self.branchPoints)
+		movedPoints = []
+		for branchPoint in self.branchPoints:
+			targetPoint = branchPoint
+			neighborPoint = self.getNearestPoint(self.mergeDistance, branchPoint, neighborTable)
+			if neighborPoint != None:
+				neighborSegment = neighborPoint - branchPoint
+				neighborDistance = abs(neighborSegment)
+				targetPoint += neighborSegment * min(self.maximumLean, 0.5 * neighborDistance) / neighborDistance
+			movedPoint = self.getFreePoint(collisionIntersectionsTable, branchPoint, targetPoint)
+			if movedPoint != None:
+				movedPoints.append(movedPoint)
+		pendingPoints = []
+		for contactPoint in self.pendingPoints + contactPoints:
+			if not euclidean.isPointInsideXIntersectionsTable(contactPoint, collisionIntersectionsTable, self.width):
+				movedPoints.append(contactPoint)
+			elif not euclidean.isPointInsideXIntersectionsTable(contactPoint, boundaryIntersectionsTable, self.width):
+				pendingPoints.append(contactPoint)
+		self.branchPoints = self.getMergedPoints(movedPoints)
+		self.pendingPoints = self.getMergedPoints(pendingPoints)
+
+	def addPointToTable(self, cellSize, point, pointTable):
+		'Add the point to the cell of the point table.'
+		cellKey = (int(math.floor(point.real / cellSize)), int(math.floor(point.imag / cellSize)))
+		euclidean.addElementToListDictionary(point, cellKey, pointTable)
+
+	def getFreePoint(self, collisionIntersectionsTable, point, targetPoint):
+		'Get the target point if it is clear of the object, otherwise the clear point within a lean of the point which is closest to the target, or None if the branch is hemmed in.'
+		if not euclidean.isPointInsideXIntersectionsTable(targetPoint, collisionIntersectionsTable, self.width):
+			return targetPoint
+		closestDistance = 987654321.0
+		freePoint = None
+		for lean in self.leans:
+			leanPoint = point + lean
+			distance = abs(leanPoint - targetPoint)
+			if distance < closestDistance and not euclidean.isPointInsideXIntersectionsTable(leanPoint, collisionIntersectionsTable, self.width):
+				closestDistance = distance
+				freePoint = leanPoint
+		return freePoint
+
+	def getMergedPoints(self, points):
+		'Get the points without the points which are within the branch radius of an earlier point.'
+		mergedPoints = []
+		mergedTable = {}
+		for point in points:
+			if self.getNearestPoint(self.branchRadius, point, mergedTable) == None:
+				mergedPoints.append(point)
+				self.addPointToTable(self.branchRadius, point, mergedTable)
+		return mergedPoints
+
+	def getNearestPoint(self, cellSize, point, pointTable):
+		'Get the nearest other point of the point table which is closer than the cell size, or None if there is none.'
+		cellX = int(math.floor(point.real / cellSize))
+		cellY = int(math.floor(point.imag / cellSize))
+		nearestDistance = cellSize
+		nearestPoint = None
+		for x in xrange(cellX - 1, cellX + 2):
+			for y in xrange(cellY - 1, cellY + 2):
+				if (x, y) in pointTable:
+					for otherPoint in pointTable[(x, y)]:
+						distance = abs(otherPoint - point)
+						if distance < nearestDistance and otherPoint is not point:
+							nearestDistance = distance
+							nearestPoint = otherPoint
+		return nearestPoint
+
+	def getPointTable(self, cellSize, points):
+		'Get the table of the points, keyed by their cell.'
+		pointTable = {}
+		for point in points:
+			self.addPointToTable(cellSize, point, pointTable)
+		return pointTable
+
+
 def main():
 	'Display the raft dialog.'
 	if len(sys.argv) > 1:
@@ -126,7 +126,7 @@ class ScaleSkein:
 	def getCraftedGcode(self, fileName, repository, svgText):
 		"Parse svgText and store the scale svgText."
 		svgReader = SVGReader()
-		svgReader.parseSVG('', svgText)
+		svgReader.parseSVGByHandoffOrText('', svgText)
 		if svgReader.sliceDictionary == None:
 			print('Warning, nothing will be done because the sliceDictionary could not be found getCraftedGcode in preface.')
 			return ''
@@ -148,9 +148,8 @@ class ScaleSkein:
 			decimalPlacesCarried,
 			layerHeight,
 			edgeWidth)
-		commentElement = svg_writer.getCommentElement(svgReader.documentElement)
 		procedureNameString = svgReader.sliceDictionary['procedureName'] + ',scale'
-		return svgWriter.getReplacedSVGTemplate(fileName, loopLayers, procedureNameString, commentElement)
+		return svgWriter.getReplacedSVGTemplate(fileName, loopLayers, procedureNameString, svgReader.commentElement)
 
 
 def main():
@@ -0,0 +1,161 @@
+"""
+This page is in the table of contents.
+Simplify is a plugin to remove the vertexes of the extruding paths which are within a deviation tolerance of the path without them.
+
+Carve removes the close vertexes of the slice loops, but later tools like fillet, smooth, comb and jitter can add dense runs of short moves again.  Simplify runs the Douglas-Peucker algorithm on each run of extruding linear moves at the same height and feed rate, so the simplified path is never further than the tolerance from the original path, and the original path is never further than the tolerance from the simplified path.  Fewer and longer moves make a smaller file, less planning work for the firmware and a higher real print speed.  The dimension tool then gives each remaining move the extrusion distance of its length.
+
+The edge and loop paths are on the surface of the object, so they have their own tolerance, which is usually smaller than the tolerance for the infill, support, raft and skirt paths.
+
+==Operation==
+The default 'Activate Simplify' checkbox is off.  When it is on, the functions described below will work, when it is off, nothing will be done.
+
+==Settings==
+===Edge Tolerance===
+Default is 0.02 millimeters.
+
+Defines the largest distance that the simplified edge and loop paths may be from the original paths.
+
+===Infill and Other Tolerance===
+Default is 0.05 millimeters.
+
+Defines the largest distance that the simplified infill, support, raft and skirt paths may be from the original paths.
+
+==Examples==
+The following examples simplify the file Screw Holder Bottom.stl.  The examples are run in a terminal in the folder which contains Screw Holder Bottom.stl and simplify.py.
+
+> python simplify.py
+This brings up the simplify dialog.
+
+> python simplify.py Screw Holder Bottom.stl
+The simplify tool is parsing the file:
+Screw Holder Bottom.stl
+..
+The simplify tool has created the file:
+.. Screw Holder Bottom_simplify.gcode
+
+"""
+
+from __future__ import absolute_import
+#Init has to be imported first because it has code to workaround the python bug where relative imports don't work if the module is imported as a main module.
+import __init__
+
+from fabmetheus_utilities.fabmetheus_tools import fabmetheus_interpret
+from fabmetheus_utilities import archive
+from fabmetheus_utilities import euclidean
+from fabmetheus_utilities import gcodec
+from fabmetheus_utilities import settings
+from skeinforge_application.skeinforge_utilities import skeinforge_craft
+from skeinforge_application.skeinforge_utilities import skeinforge_polyfile
+from skeinforge_application.skeinforge_utilities import skeinforge_profile
+import sys
+
+
+__author__ = 'agent (agent@local)'
+__date__ = '$Date: 2026/18/10 $'
+__license__ = 'GNU Affero General Public License http://www.gnu.org/licenses/agpl.html'
+
+
+def getCraftedText(fileName, text='', repository=None):
+	'Simplify a gcode linear move file or text.'
+	return getCraftedTextFromText(archive.getTextIfEmpty(fileName, text), repository)
+
+def getCraftedTextFromText(gcodeText, repository=None):
+	'Simplify a gcode linear move text.'
+	if gcodec.isProcedureDoneOrFileIsEmpty(gcodeText, 'simplify'):
+		return gcodeText
+	if repository == None:
+		repository = settings.getReadRepository(SimplifyRepository())
+	if not repository.activateSimplify.value:
+		return gcodeText
+	return SimplifySkein().getCraftedGcode(gcodeText, repository)
+
+def getDouglasPeuckerIndexes(points, tolerance):
+	'Get the sorted indexes of the points which are kept by the Douglas-Peucker algorithm, the first and last points are always kept.'
+	if len(points) < 3:
+		return range(len(points))
+	toleranceSquared = tolerance * tolerance
+	isKeptList = [False] * len(points)
+	isKeptList[0] = True
+	isKeptList[-1] = True
+	spans = [(0, len(points) - 1)]
+	while len(spans) > 0:
+		beginIndex, endIndex = spans.pop()
+		largestDistanceSquared = toleranceSquared
+		largestIndex = -1
+		for pointIndex in xrange(beginIndex + 1, endIndex):
+			distanceSquared = euclidean.getDistanceToPlaneSegment(points[beginIndex], points[endIndex], points[pointIndex])
+			if distanceSquared > largestDistanceSquared:
+				largestDistanceSquared = distanceSquared
+				largestIndex = pointIndex
+		if largestIndex > -1:
+			isKeptList[largestIndex] = True
+			spans.append((beginIndex, largestIndex))
+			spans.append((largestIndex, endIndex))
+	keptIndexes = []
+	for pointIndex, isKept in enumerate(isKeptList):
+		if isKept:
+			keptIndexes.append(pointIndex)
+	return keptIndexes
+
+def getNewRepository():
+	'Get new repository.'
+	return SimplifyRepository()
+
+def writeOutput(fileName, shouldAnalyze=True):
+	'Simplify a gcode linear move file.'
+	skeinforge_craft.writeChainTextWithNounMessage(fileName, 'simplify', shouldAnalyze)
+
+
+class SimplifyRepository:
+	'A class to handle the simplify settings.'
+	def __init__(self):
+		'Set the default settings, execute title & settings fileName.'
+		skeinforge_profile.addListsToCraftTypeRepository('skeinforge_application.skeinforge_plugins.craft_plugins.simplify.html', self)
+		self.fileNameInput = settings.FileNameInput().getFromFileName(fabmetheus_interpret.getGNUTranslatorGcodeFileTypeTuples(), 'Open File for Simplify', self, '')
+		self.activateSimplify = settings.BooleanSetting().getFromValue('Activate Simplify', self, False)
+		self.edgeTolerance = settings.FloatSpin().getFromValue(0.005, 'Edge Tolerance (mm):', self, 0.1, 0.02)
+		self.infillOtherTolerance = settings.FloatSpin().getFromValue(0.005, 'Infill and Other Tolerance (mm):', self, 0.2, 0.05)
+		self.executeTitle = 'Simplify'
+
+	def execute(self):
+		'Simplify button has been clicked.'
+		fileNames = skeinforge_polyfile.getFileOrDirectoryTypesUnmodifiedGcode(self.fileNameInput.value, fabmetheus_interpret.getImportPluginFileNames(), self.fileNameInput.wasCancelled)
+		for fileName in fileNames:
+			writeOutput(fileName)
+
+
+class SimplifySkein(skeinforge_craft.LinearMoveRunSkein):
+	'A class to simplify a skein of extrusions.'
+	def __init__(self):
+		'Initialize.'
+		skeinforge_craft.LinearMoveRunSkein.__init__(self, 'simplify')
+
+	def addRun(self):
+		'Add the run of linear moves, without the moves which are within the tolerance of the simplified path.'
+		if len(self.runLines) < 1:
+			return
+		points = self.getRunPoints()
+		tolerance = self.repository.infillOtherTolerance.value
+		if self.isEdge:
+			tolerance = self.repository.edgeTolerance.value
+		keptIndexes = getDouglasPeuckerIndexes(points, tolerance)[1 :]
+		firstLine = self.runLines[keptIndexes[0] - 1]
+		if keptIndexes[0] > 1 and self.runFeedRateMinute != None:
+			splitLine = gcodec.getSplitLineBeforeBracketSemicolon(firstLine)
+			firstLine = self.distanceFeedRate.getLineWithFeedRate(self.runFeedRateMinute, firstLine, splitLine)
+		self.distanceFeedRate.addLine(firstLine)
+		for keptIndex in keptIndexes[1 :]:
+			self.distanceFeedRate.addLine(self.runLines[keptIndex - 1])
+		self.runLines = []
+		self.runLocations = []
+
+
+def main():
+	'Display the simplify dialog.'
+	if len(sys.argv) > 1:
+		writeOutput(' '.join(sys.argv[1 :]))
+	else:
+		settings.startMainLoopFromConstructor(getNewRepository())
+
+if __name__ == '__main__':
+	main()
@@ -32,6 +32,8 @@ Default is on.
 
 When selected, the skirt will be convex, going around the model with only convex angles.  If convex is not selected, the skirt will hug the model, going into every nook and cranny.
 
+The convex skirt is made from the convex hull of the boundaries up to the skirt height, so it is at the skirt gap from the object.  The union of the boundaries is only made when convex is not selected or when there is a brim.  The hull and the union are kept for the last few models, so crafting the same model again with only different skirt gap, shells or brim settings does not make them again.
+
 ===Gap over Perimeter Width===
 Default is three.
 
@@ -87,6 +89,10 @@ __date__ = '$Date: 2008/21/04 $'
 __license__ = 'GNU Affero General Public License http://www.gnu.org/licenses/agpl.html'
 
 
+globalSkirtFootprintCache = {}
+globalSkirtFootprintCacheSize = 4
+
+
 def getCraftedText(fileName, text='', repository=None):
 	'Skirt the fill file or text.'
 	return getCraftedTextFromText(archive.getTextIfEmpty(fileName, text), repository)
@@ -101,6 +107,15 @@ def getCraftedTextFromText(gcodeText, repository=None):
 		return gcodeText
 	return SkirtSkein().getCraftedGcode(gcodeText, repository)
 
+def getJoinedXIntersectionsTable(xIntersectionListsTable):
+	'Get the x intersections table with the x intersection lists of each row joined.'
+	xIntersectionsTable = {}
+	for xIntersectionListsTableKey in xIntersectionListsTable:
+		xIntersections = euclidean.getJoinOfXIntersectionLists(xIntersectionListsTable[xIntersectionListsTableKey])
+		if len(xIntersections) > 0:
+			xIntersectionsTable[xIntersectionListsTableKey] = xIntersections
+	return xIntersectionsTable
+
 def getNewRepository():
 	'Get new repository.'
 	return SkirtRepository()
@@ -114,20 +129,62 @@ def getOuterLoops(loops):
 	intercircle.directLoops(True, outerLoops)
 	return outerLoops
 
+def getSkirtFootprint(boundaryLines, edgeWidth, loops):
+	'Get the skirt footprint of the boundary loops, from the cache if the boundary lines and the edge width are those of an earlier craft.'
+	skirtFootprintKey = (edgeWidth, '\n'.join(boundaryLines))
+	if skirtFootprintKey not in globalSkirtFootprintCache:
+		if len(globalSkirtFootprintCache) >= globalSkirtFootprintCacheSize:
+			globalSkirtFootprintCache.clear()
+		globalSkirtFootprintCache[skirtFootprintKey] = SkirtFootprint(edgeWidth, loops)
+	return globalSkirtFootprintCache[skirtFootprintKey]
+
 def writeOutput(fileName, shouldAnalyze=True):
 	'Skirt a gcode linear move file.'
 	skeinforge_craft.writeChainTextWithNounMessage(fileName, 'skirt', shouldAnalyze)
 
 
-class LoopCrossDictionary:
-	'Loop with a horizontal and vertical dictionary.'
-	def __init__(self):
-		'Initialize LoopCrossDictionary.'
-		self.loop = []
+class SkirtFootprint:
+	'A class to hold the convex hull and the outer loops of the union of the boundary loops up to the skirt height.'
+	def __init__(self, edgeWidth, loops):
+		'Initialize.'
+		self.convexLoops = None
+		self.edgeWidth = edgeWidth
+		self.loops = loops
+		self.outerLoops = None
 
 	def __repr__(self):
-		'Get the string representation of this LoopCrossDictionary.'
-		return str(self.loop)
+		'Get the string representation of this skirt footprint.'
+		return '%s, %s' % (self.edgeWidth, self.loops)
+
+	def getConvexLoops(self):
+		'Get the convex hull of the boundary points in a list, or an empty list if there are too few points.'
+		if self.convexLoops == None:
+			convexLoop = euclidean.getLoopConvexMonotone(euclidean.getConcatenatedList(self.loops))
+			self.convexLoops = []
+			if len(convexLoop) > 2:
+				self.convexLoops.append(convexLoop)
+		return self.convexLoops
+
+	def getOuterLoops(self):
+		'Get the outer loops of the union of the boundary loops, sampled on a grid of the edge width.'
+		if self.outerLoops != None:
+			return self.outerLoops
+		horizontalListsTable = {}
+		verticalListsTable = {}
+		for loop in self.loops:
+			horizontalXIntersectionsTable = {}
+			euclidean.addXIntersectionsFromLoopForTable(loop, horizontalXIntersectionsTable, self.edgeWidth)
+			for horizontalKey in horizontalXIntersectionsTable:
+				euclidean.addElementToListDictionary(horizontalXIntersectionsTable[horizontalKey], horizontalKey, horizontalListsTable)
+			verticalXIntersectionsTable = {}
+			euclidean.addXIntersectionsFromLoopForTable(euclidean.getDiagonalFlippedLoop(loop), verticalXIntersectionsTable, self.edgeWidth)
+			for verticalKey in verticalXIntersectionsTable:
+				euclidean.addElementToListDictionary(verticalXIntersectionsTable[verticalKey], verticalKey, verticalListsTable)
+		points = euclidean.getPointsByHorizontalDictionary(self.edgeWidth, getJoinedXIntersectionsTable(horizontalListsTable))
+		points += euclidean.getPointsByVerticalDictionary(self.edgeWidth, getJoinedXIntersectionsTable(verticalListsTable))
+		loops = triangle_mesh.getDescendingAreaOrientedLoops(points, points, 2.5 * self.edgeWidth)
+		self.outerLoops = getOuterLoops(loops)
+		return self.outerLoops
 
 
 class SkirtRepository:
@@ -158,12 +215,13 @@ class SkirtSkein:
 	'A class to skirt a skein of extrusions.'
 	def __init__(self):
 		'Initialize variables.'
+		self.boundaryLines = []
+		self.boundaryLoops = []
 		self.distanceFeedRate = gcodec.DistanceFeedRate()
 		self.feedRateMinute = None
 		self.isExtruderActive = False
 		self.isSupportLayer = False
 		self.layerIndex = -1
-		self.brimLine = 0
 		self.lineIndex = 0
 		self.lines = None
 		self.oldFlowRate = None
@@ -172,7 +230,6 @@ class SkirtSkein:
 		self.skirtFlowRate = None
 		self.skirtTemperature = None
 		self.travelFeedRateMinute = None
-		self.unifiedLoop = LoopCrossDictionary()
 
 
 	def addFlowRate(self, flowRate):
@@ -219,48 +276,26 @@ class SkirtSkein:
 		self.distanceFeedRate.addLine('M104 S' + euclidean.getRoundedToThreePlaces(temperature))
 		self.oldTemperatureInput = temperature
 
-	def createSegmentDictionaries(self, loopCrossDictionary):
-		'Create horizontal and vertical segment dictionaries.'
-		loopCrossDictionary.horizontalDictionary = self.getHorizontalXIntersectionsTable(loopCrossDictionary.loop)
-		flippedLoop = euclidean.getDiagonalFlippedLoop(loopCrossDictionary.loop)
-		loopCrossDictionary.verticalDictionary = self.getHorizontalXIntersectionsTable(flippedLoop)
-
 	def createSkirtLoops(self):
 		'Create the skirt loops.'
-		points = euclidean.getPointsByHorizontalDictionary(self.edgeWidth, self.unifiedLoop.horizontalDictionary)
-		points += euclidean.getPointsByVerticalDictionary(self.edgeWidth, self.unifiedLoop.verticalDictionary)
-		loops = triangle_mesh.getDescendingAreaOrientedLoops(points, points, 2.5 * self.edgeWidth)
-		outerLoops = getOuterLoops(loops)
+		skirtFootprint = getSkirtFootprint(self.boundaryLines, self.edgeWidth, self.boundaryLoops)
 		self.baseOutsetLoops = []
 		self.upperOutsetLoops = []
 		for shellIndex in xrange(self.repository.baseShells.value, 0, -1):
-			outsetLoops = intercircle.getInsetSeparateLoopsFromLoops(outerLoops, -self.skirtOutset - shellIndex * self.edgeWidth)
-			outsetLoops = getOuterLoops(outsetLoops)
+			outsetDistance = -self.skirtOutset - shellIndex * self.edgeWidth
 			if self.repository.convex.value:
+				outsetLoops = intercircle.getInsetSeparateLoopsFromLoops(skirtFootprint.getConvexLoops(), outsetDistance)
 				outsetLoops = [euclidean.getLoopConvex(euclidean.getConcatenatedList(outsetLoops))]
+			else:
+				outsetLoops = getOuterLoops(intercircle.getInsetSeparateLoopsFromLoops(skirtFootprint.getOuterLoops(), outsetDistance))
 			self.baseOutsetLoops += outsetLoops
 			self.upperOutsetLoops = outsetLoops
-		if self.repository.brimWidth.value > 0:	
-			points = euclidean.getPointsByHorizontalDictionary(self.edgeWidth, self.unifiedLoop.horizontalDictionary)
-			points += euclidean.getPointsByVerticalDictionary(self.edgeWidth, self.unifiedLoop.verticalDictionary)
-			loops = triangle_mesh.getDescendingAreaOrientedLoops(points, points, 2.5 * self.edgeWidth)
-			outerLoops = getOuterLoops(loops)
-			outsetLoops = intercircle.getInsetSeparateLoopsFromLoops(outerLoops, -self.edgeWidth*0.5)
-			outsetLoops = getOuterLoops(outsetLoops)
-#			if self.repository.convex.value:
-#				outsetLoops = [euclidean.getLoopConvex(euclidean.getConcatenatedList(outsetLoops))]
-			self.outsetBrimLoops = outsetLoops
-
-		for self.brimLine in xrange(self.brimLine+1,self.repository.brimWidth.value):
-			points = euclidean.getPointsByHorizontalDictionary(self.edgeWidth, self.unifiedLoop.horizontalDictionary)
-			points += euclidean.getPointsByVerticalDictionary(self.edgeWidth, self.unifiedLoop.verticalDictionary)
-			loops = triangle_mesh.getDescendingAreaOrientedLoops(points, points, 2.5 * self.edgeWidth)
-			outerLoops = getOuterLoops(loops)
-			outsetLoops = intercircle.getInsetSeparateLoopsFromLoops(outerLoops, -self.edgeWidth*(self.brimLine+0.5))
-			outsetLoops = getOuterLoops(outsetLoops)
-#			if self.repository.convex.value:
-#				outsetLoops = [euclidean.getLoopConvex(euclidean.getConcatenatedList(outsetLoops))]
-			self.outsetBrimLoops += outsetLoops
+		self.outsetBrimLoops = []
+		if self.repository.brimWidth.value > 0:
+			outerLoops = skirtFootprint.getOuterLoops()
+			for brimLine in xrange(self.repository.brimWidth.value):
+				outsetLoops = intercircle.getInsetSeparateLoopsFromLoops(outerLoops, -self.edgeWidth * (brimLine + 0.5))
+				self.outsetBrimLoops += getOuterLoops(outsetLoops)
 
 	def getCraftedGcode(self, gcodeText, repository):
 		'Parse gcode text and store the skirt gcode.'
@@ -274,36 +309,31 @@ class SkirtSkein:
 			self.parseLine(line)
 		return gcodec.getGcodeWithoutDuplication('M108', self.distanceFeedRate.output.getvalue())
 
-	def getHorizontalXIntersectionsTable(self, loop):
-		'Get the horizontal x intersections table from the loop.'
-		horizontalXIntersectionsTable = {}
-		euclidean.addXIntersectionsFromLoopForTable(loop, horizontalXIntersectionsTable, self.edgeWidth)
-		return horizontalXIntersectionsTable
-
 	def parseBoundaries(self):
-		'Parse the boundaries and union them.'
-		self.createSegmentDictionaries(self.unifiedLoop)
+		'Parse the boundaries of the layers up to the skirt height.'
 		if self.repository.layersTo.value < 1:
 			return
-		loopCrossDictionary = None
+		boundaryLoop = None
 		layerIndex = -1
-		for line in self.lines[self.lineIndex :]:
+		for lineIndex in xrange(self.lineIndex, len(self.lines)):
+			line = self.lines[lineIndex]
 			splitLine = gcodec.getSplitLineBeforeBracketSemicolon(line)
 			firstWord = gcodec.getFirstWord(splitLine)
 			if firstWord == '(</boundaryPerimeter>)' or firstWord == '(</raftPerimeter>)':
-				self.createSegmentDictionaries(loopCrossDictionary)
-				self.unifyLayer(loopCrossDictionary)
-				loopCrossDictionary = None
+				boundaryLoop = None
 			elif firstWord == '(<boundaryPoint>' or firstWord == '(<raftPoint>':
 				location = gcodec.getLocationFromSplitLine(None, splitLine)
-				if loopCrossDictionary == None:
-					loopCrossDictionary = LoopCrossDictionary()
-				loopCrossDictionary.loop.append(location.dropAxis())
+				if boundaryLoop == None:
+					boundaryLoop = []
+					self.boundaryLoops.append(boundaryLoop)
+				boundaryLoop.append(location.dropAxis())
+				self.boundaryLines.append(line)
 			elif firstWord == '(<layer>':
 				layerIndex += 1
 				if layerIndex > self.repository.layersTo.value:
 					return
 				settings.printProgress(layerIndex, 'skirt')
+				self.boundaryLines.append(line)
 
 	def parseInitialization(self):
 		'Parse gcode initialization and store the parameters.'
@@ -389,11 +419,6 @@ class SkirtSkein:
 			elif firstWord == '(</supportLayer>)':
 				isSupportLayer = False
 
-	def unifyLayer(self, loopCrossDictionary):
-		'Union the loopCrossDictionary with the unifiedLoop.'
-		euclidean.joinXIntersectionsTables(loopCrossDictionary.horizontalDictionary, self.unifiedLoop.horizontalDictionary)
-		euclidean.joinXIntersectionsTables(loopCrossDictionary.verticalDictionary, self.unifiedLoop.verticalDictionary)
-
 
 def main():
 	'Display the skirt dialog.'
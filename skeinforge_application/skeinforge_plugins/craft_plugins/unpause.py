@@ -133,8 +133,9 @@ class UnpauseSkein:
 		self.feedRateMinute = gcodec.getFeedRateMinute( self.feedRateMinute, splitLine )
 		if self.oldLocation is None:
 			return line
-		relativeLocation = gcodec.getLocationFromSplitLine(self.oldLocation, splitLine)
-		self.oldLocation += relativeLocation
+		location = gcodec.getLocationFromSplitLine(self.oldLocation, splitLine)
+		relativeLocation = location - self.oldLocation
+		self.oldLocation = location
 		distance = gcodec.getArcDistance(relativeLocation, splitLine)
 		return self.getUnpausedMovement(distance, line, splitLine)
 
@@ -29,7 +29,7 @@ __license__ = 'GNU Affero General Public License http://www.gnu.org/licenses/agp
 def getCraftSequence():
 	'Get the extrusion craft sequence.'
 #	return 'carve scale bottom preface widen inset fill multiply speed temperature raft skirt chamber tower jitter clip smooth stretch skin comb cool hop wipe oozebane dwindle splodge home lash fillet limit unpause dimension alteration export'.split()
-	return 'carve scale bottom preface widen inset fill multiply temperature raft skirt speed chamber tower jitter clip smooth stretch skin comb cool hop wipe oozebane dwindle splodge home lash fillet limit unpause dimension alteration export'.split()
+	return 'carve scale bottom preface widen inset fill multiply temperature raft skirt speed chamber tower jitter clip smooth stretch skin comb cool hop wipe oozebane dwindle splodge home lash fillet arc simplify limit unpause dimension alteration export'.split()
 
 def getNewRepository():
 	'Get new repository.'
@@ -1,6 +1,8 @@
 """
 Analyze is a script to access the plugins which analyze a gcode file.
 
+When the 'Layers From' and 'Layers To' settings are not the defaults, only that python slice of the layers is analyzed.  The layers are read by the layer index of gcode_index, or by the layer table of a skein binary file, so the layers before the range are not parsed.
+
 """
 
 from __future__ import absolute_import
@@ -8,8 +10,10 @@ from __future__ import absolute_import
 import __init__
 
 from fabmetheus_utilities import archive
+from fabmetheus_utilities import gcode_index
 from fabmetheus_utilities import gcodec
 from fabmetheus_utilities import settings
+from fabmetheus_utilities import skein_binary
 from skeinforge_application.skeinforge_utilities import skeinforge_polyfile
 from skeinforge_application.skeinforge_utilities import skeinforge_profile
 import os
@@ -22,6 +26,17 @@ __date__ = '$Date: 2008/21/04 $'
 __license__ = 'GNU Affero General Public License http://www.gnu.org/licenses/agpl.html'
 
 
+def getLayersText(fileName, repository):
+	'Get the gcode text of the layer range of the analyze settings, or an empty string when the whole file is analyzed.'
+	if repository.layersFrom.value == 0 and repository.layersTo.value == 912345678:
+		return ''
+	if skein_binary.isSkeinBinaryFileName(fileName):
+		layerIndex = skein_binary.getSkeinBinaryReader(fileName)
+	else:
+		layerIndex = gcode_index.getLayerIndex(fileName)
+	layerBegin, layerEnd, layerStep = slice(repository.layersFrom.value, repository.layersTo.value).indices(len(layerIndex.layers))
+	return layerIndex.getLayersText(layerBegin, layerEnd)
+
 def getNewRepository():
 	'Get new repository.'
 	return AnalyzeRepository()
@@ -36,6 +51,8 @@ def getPluginsDirectoryPath():
 
 def writeOutput(fileName, fileNamePenultimate, fileNameSuffix, filePenultimateWritten, gcodeText=''):
 	"Analyze a gcode file."
+	if gcodeText == '' and skein_binary.isSkeinBinaryFileName(fileName):
+		gcodeText = skein_binary.getGcodeTextFromFile(fileName)
 	gcodeText = archive.getTextIfEmpty(fileName, gcodeText)
 	pluginFileNames = getPluginFileNames()
 	window = None
@@ -60,7 +77,11 @@ class AnalyzeRepository:
 	def __init__(self):
 		"Set the default settings, execute title & settings fileName."
 		skeinforge_profile.addListsToCraftTypeRepository('skeinforge_application.skeinforge_utilities.skeinforge_analyze.html', self)
-		self.fileNameInput = settings.FileNameInput().getFromFileName( [ ('Gcode text files', '*.gcode') ], 'Open File for Analyze', self, '')
+		self.fileNameInput = settings.FileNameInput().getFromFileName( [ ('Gcode text files', '*.gcode'), ('Skein binary files', '*.skein') ], 'Open File for Analyze', self, '')
+		settings.LabelDisplay().getFromName('- Layers -', self )
+		self.layersFrom = settings.IntSpin().getFromValue( 0, 'Layers From (index):', self, 20, 0 )
+		self.layersTo = settings.IntSpin().getSingleIncrementFromValue( 0, 'Layers To (index):', self, 912345678, 912345678 )
+		settings.LabelSeparator().getFromRepository(self)
 		importantFileNames = ['skeiniso', 'skeinlayer', 'statistic']
 		settings.getRadioPluginsAddPluginFrame( getPluginsDirectoryPath(), importantFileNames, getPluginFileNames(), self )
 		self.executeTitle = 'Analyze'
@@ -69,13 +90,14 @@ class AnalyzeRepository:
 		"Analyze button has been clicked."
 		fileNames = skeinforge_polyfile.getFileOrDirectoryTypesUnmodifiedGcode( self.fileNameInput.value, [], self.fileNameInput.wasCancelled )
 		for fileName in fileNames:
-			writeOutput( fileName, fileName )
+			writeOutput(fileName, fileName, fileName, True, getLayersText(fileName, self))
 
 
 def main():
 	"Write analyze output."
 	fileName = ' '.join(sys.argv[1 :])
-	settings.startMainLoopFromWindow(writeOutput(fileName, fileName))
+	repository = settings.getReadRepository(AnalyzeRepository())
+	settings.startMainLoopFromWindow(writeOutput(fileName, fileName, fileName, True, getLayersText(fileName, repository)))
 
 
 if __name__ == "__main__":
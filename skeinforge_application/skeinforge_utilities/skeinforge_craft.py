@@ -14,11 +14,13 @@ from fabmetheus_utilities import archive
 from fabmetheus_utilities import euclidean
 from fabmetheus_utilities import gcodec
 from fabmetheus_utilities import settings
+from fabmetheus_utilities import skein_binary
 from skeinforge_application.skeinforge_utilities import skeinforge_analyze
 from skeinforge_application.skeinforge_utilities import skeinforge_polyfile
 from skeinforge_application.skeinforge_utilities import skeinforge_profile
+from skeinforge_application.skeinforge_utilities import skeinforge_profiler
+from optparse import OptionParser
 import os
-import sys
 import time
 
 
@@ -32,6 +34,8 @@ def getChainText( fileName, procedure ):
 	text=''
 	if fileName.endswith('.gcode') or fileName.endswith('.svg'):
 		text = archive.getFileText(fileName)
+	elif skein_binary.isSkeinBinaryFileName(fileName):
+		text = skein_binary.getGcodeTextFromFile(fileName)
 	procedures = getProcedures( procedure, text )
 	return getChainTextFromProcedures( fileName, procedures, text )
 
@@ -41,7 +45,10 @@ def getChainTextFromProcedures(fileName, procedures, text):
 	for procedure in procedures:
 		craftModule = getCraftModule(procedure)
 		if craftModule != None:
-			text = craftModule.getCraftedText(fileName, text)
+			if skeinforge_profiler.globalCraftProfiler == None:
+				text = craftModule.getCraftedText(fileName, text)
+			else:
+				text = skeinforge_profiler.globalCraftProfiler.getCraftedText(craftModule, fileName, procedure, text)
 			if text == '':
 				print('Warning, the text was not recognized in getChainTextFromProcedures in skeinforge_craft for')
 				print(fileName)
@@ -132,7 +139,10 @@ def writeOutput(fileName, shouldAnalyze=True):
 	"Craft a gcode file with the last module."
 	pluginModule = getLastModule()
 	if pluginModule != None:
-		return pluginModule.writeOutput(fileName, shouldAnalyze)
+		window = pluginModule.writeOutput(fileName, shouldAnalyze)
+		if skeinforge_profiler.globalCraftProfiler != None:
+			skeinforge_profiler.globalCraftProfiler.writeOutput(fileName)
+		return window
 
 def writeSVGTextWithNounMessage(fileName, repository, shouldAnalyze=True):
 	'Get and write an svg text and print messages.'
@@ -219,9 +229,116 @@ class CraftRepository:
 			writeOutput(fileName)
 
 
+class LinearMoveRunSkein:
+	'A base class to collect the runs of extruding linear moves at the same height and feed rate, the subclass addRun adds each run.'
+	def __init__(self, procedure):
+		'Initialize.'
+		self.distanceFeedRate = gcodec.DistanceFeedRate()
+		self.feedRateMinute = None
+		self.isEdge = False
+		self.isExtruderActive = False
+		self.layerIndex = -1
+		self.lineIndex = 0
+		self.lines = None
+		self.oldLocation = None
+		self.procedure = procedure
+		self.repository = None
+		self.runFeedRateMinute = None
+		self.runLines = []
+		self.runLocations = []
+
+	def addRun(self):
+		'Add the run of linear moves unchanged.'
+		for runLine in self.runLines:
+			self.distanceFeedRate.addLine(runLine)
+		self.runLines = []
+		self.runLocations = []
+
+	def getCraftedGcode(self, gcodeText, repository):
+		'Parse gcode text and store the crafted gcode.'
+		self.repository = repository
+		self.lines = archive.getTextLines(gcodeText)
+		self.parseInitialization()
+		for self.lineIndex in xrange(self.lineIndex, len(self.lines)):
+			self.parseLine(self.lines[self.lineIndex])
+		self.addRun()
+		return self.distanceFeedRate.output.getvalue()
+
+	def getRunPoints(self):
+		'Get the run locations without the z.'
+		points = []
+		for runLocation in self.runLocations:
+			points.append(runLocation.dropAxis())
+		return points
+
+	def isRunMove(self, location, splitLine):
+		'Determine if the linear move can be in a run of moves.'
+		if not self.isExtruderActive or self.oldLocation == None:
+			return False
+		if location.z != self.oldLocation.z or location == self.oldLocation:
+			return False
+		for word in splitLine[1 :]:
+			if word[0] not in 'XYZF':
+				return False
+		return True
+
+	def parseInitialization(self):
+		'Parse gcode initialization and store the parameters.'
+		for self.lineIndex in xrange(len(self.lines)):
+			line = self.lines[self.lineIndex]
+			splitLine = gcodec.getSplitLineBeforeBracketSemicolon(line)
+			firstWord = gcodec.getFirstWord(splitLine)
+			self.distanceFeedRate.parseSplitLine(firstWord, splitLine)
+			if firstWord == '(</extruderInitialization>)':
+				self.distanceFeedRate.addTagBracketedProcedure(self.procedure)
+				return
+			self.distanceFeedRate.addLine(line)
+
+	def parseLine(self, line):
+		'Parse a gcode line, collect the run moves and add the other lines.'
+		splitLine = gcodec.getSplitLineBeforeBracketSemicolon(line)
+		firstWord = gcodec.getFirstWord(splitLine)
+		if firstWord == 'G1':
+			feedRateMinute = gcodec.getFeedRateMinute(self.feedRateMinute, splitLine)
+			location = gcodec.getLocationFromSplitLine(self.oldLocation, splitLine)
+			if feedRateMinute != self.runFeedRateMinute:
+				self.addRun()
+			isRunMove = self.isRunMove(location, splitLine)
+			if isRunMove:
+				if len(self.runLines) < 1:
+					self.runFeedRateMinute = feedRateMinute
+					self.runLocations.append(self.oldLocation)
+				self.runLines.append(line)
+				self.runLocations.append(location)
+			self.feedRateMinute = feedRateMinute
+			self.oldLocation = location
+			if isRunMove:
+				return
+		self.addRun()
+		self.distanceFeedRate.addLine(line)
+		if firstWord == 'G2' or firstWord == 'G3':
+			self.feedRateMinute = gcodec.getFeedRateMinute(self.feedRateMinute, splitLine)
+			self.oldLocation = gcodec.getLocationFromSplitLine(self.oldLocation, splitLine)
+		elif firstWord == '(<edge>' or firstWord == '(<loop>':
+			self.isEdge = True
+		elif firstWord == '(</edge>)' or firstWord == '(</loop>)':
+			self.isEdge = False
+		elif firstWord == '(<layer>':
+			self.layerIndex += 1
+			settings.printProgress(self.layerIndex, self.procedure)
+		elif firstWord == 'M101':
+			self.isExtruderActive = True
+		elif firstWord == 'M103':
+			self.isExtruderActive = False
+
+
 def main():
 	"Write craft output."
-	writeOutput(' '.join(sys.argv[1 :]), False)
+	parser = OptionParser()
+	skeinforge_profiler.addProfilerOptions(parser)
+	(options, args) = parser.parse_args()
+	skeinforge_profiler.setCraftProfilerByOptions(options)
+	writeOutput(' '.join(args), False)
 
 if __name__ == "__main__":
 	main()
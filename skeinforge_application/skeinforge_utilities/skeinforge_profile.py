@@ -27,6 +27,8 @@ __date__ = '$Date: 2008/21/04 $'
 __license__ = 'GNU Affero General Public License http://www.gnu.org/licenses/agpl.html'
 
 
+globalProfileDirectoryCache = {}
+
 def addListsSetCraftProfile( craftSequence, defaultProfile, repository, fileNameHelp ):
 	"Set the craft profile repository."
 	settings.addListsToRepository(fileNameHelp, repository)
@@ -91,9 +93,16 @@ def getPluginsDirectoryPath():
 	return archive.getSkeinforgePluginsPath('profile_plugins')
 
 def getProfileDirectory():
-	"Get the profile directory."
+	"Get the profile directory, which is read again only when the profile or craft type settings have changed."
+	if 'craftTypeName' in globalProfileDirectoryCache:
+		if globalProfileDirectoryCache['stamps'] == getProfileStamps(globalProfileDirectoryCache['craftTypeName']):
+			return globalProfileDirectoryCache['profileDirectory']
 	craftTypeName = getCraftTypeName()
-	return os.path.join( craftTypeName, getProfileName(craftTypeName) )
+	profileDirectory = os.path.join( craftTypeName, getProfileName(craftTypeName) )
+	globalProfileDirectoryCache['craftTypeName'] = craftTypeName
+	globalProfileDirectoryCache['profileDirectory'] = profileDirectory
+	globalProfileDirectoryCache['stamps'] = getProfileStamps(craftTypeName)
+	return profileDirectory
 
 def getProfileName(craftTypeName):
 	"Get the profile name from the craft type name."
@@ -101,12 +110,24 @@ def getProfileName(craftTypeName):
 	settings.getReadRepository(craftTypeSettings)
 	return craftTypeSettings.profileListbox.value
 
+def getProfileStamps(craftTypeName):
+	"Get the modification time and size stamps of the profile settings, the craft type settings and the craft type profiles folder."
+	stamps = []
+	for profilesSubName in ['skeinforge_profile.csv', craftTypeName + '.csv', craftTypeName]:
+		try:
+			fileStat = os.stat(archive.getProfilesPath(profilesSubName))
+			stamps.append((fileStat.st_mtime, fileStat.st_size))
+		except OSError:
+			stamps.append(None)
+	return stamps
+
 def getReadProfileRepository():
 	"Get the read profile repository."
 	return settings.getReadRepository( ProfileRepository() )
 
 def updateProfileSaveListeners():
 	"Call the save function of all the update profile save listeners."
+	globalProfileDirectoryCache.clear()
 	for globalProfileSaveListener in euclidean.getListTableElements( settings.globalProfileSaveListenerListTable ):
 		globalProfileSaveListener.save()
 	cancelAll()
@@ -0,0 +1,276 @@
+"""
+Profiler is a script to measure the time, memory and text size of each craft plugin and of each layer in the craft chain.
+
+The profiler is turned on with the --profiler command line option of skeinforge_craft.py or sfact.py.  For each plugin in the chain it records the wall time, the cpu time, the peak memory of the process after the plugin, the change of the peak memory, and the lines and bytes of the text going in and coming out.  When the craft is done a summary table is printed and the records are written as json to the file with the suffix _craft_profile.json.
+
+For the plugins which print their layer progress, the profiler also records the wall and cpu time of each layer, which is the time from the progress call of a layer to the progress call of the next layer.  So for fill, which parses all the layers before it fills them, a layer record is the time to fill that layer.  The work a plugin does before its first progress call is in the record of the plugin, but not in a layer record.  The summary table shows the slowest layer of each plugin, the json file has all the layers.
+
+With the --cprofile option followed by a plugin name, the plugin is also run under cProfile, the statistics are saved to the file with the plugin name and prof suffix and the functions with the largest cumulative time are printed.
+
+The peak memory is read with the resource module, which is not available on Windows, in which case it is not recorded.
+
+To craft a file and print the profile, in a shell in the skeinforge_utilities folder type:
+> python skeinforge_craft.py --profiler --cprofile fill test.stl
+
+"""
+
+from __future__ import absolute_import
+#Init has to be imported first because it has code to workaround the python bug where relative imports don't work if the module is imported as a main module.
+import __init__
+
+from fabmetheus_utilities import archive
+from fabmetheus_utilities import settings
+import cProfile
+import json
+import os
+import pstats
+import sys
+import time
+try:
+	import resource
+except:
+	resource = None
+
+
+__author__ = 'agent (agent@local)'
+__date__ = '$Date: 2026/18/10 $'
+__license__ = 'GNU Affero General Public License http://www.gnu.org/licenses/agpl.html'
+
+
+globalCraftProfiler = None
+globalNumberOfCProfileFunctions = 20
+
+
+def addProfilerOptions(parser):
+	'Add the profiler options to the command line option parser.'
+	parser.add_option(
+		'--profiler', help='print and save the time, memory and size profile of each craft plugin and layer', action='store_true', dest='profiler', default=False)
+	parser.add_option(
+		'--cprofile', help='also run the named craft plugin under cProfile, this turns on the profiler', action='store', type='string', dest='cProfileProcedure')
+
+def getCommandLineOptionsString():
+	'Get the profiler command line options string, to pass the profiler on to another process.'
+	if globalCraftProfiler == None:
+		return ''
+	if globalCraftProfiler.cProfileProcedure == '':
+		return '--profiler '
+	return '--profiler --cprofile %s ' % globalCraftProfiler.cProfileProcedure
+
+def getCPUTime():
+	'Get the user and system cpu time of the process.'
+	processTimes = os.times()
+	return processTimes[0] + processTimes[1]
+
+def getLineCount(text):
+	'Get the number of lines in the text.'
+	if text == '':
+		return 0
+	lineCount = text.count('\n')
+	if not text.endswith('\n'):
+		lineCount += 1
+	return lineCount
+
+def getPeakMemoryKilobytes():
+	'Get the peak memory of the process in kilobytes, or None if it can not be read.'
+	if resource == None:
+		return None
+	peakMemory = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+	if sys.platform == 'darwin':
+		return peakMemory / 1024
+	return peakMemory
+
+def setCraftProfiler(cProfileProcedure=''):
+	'Turn on the craft profiler, with cProfile for the cProfileProcedure if it is not empty.'
+	global globalCraftProfiler
+	globalCraftProfiler = CraftProfiler(cProfileProcedure)
+
+def setCraftProfilerByOptions(options):
+	'Turn on the craft profiler if the profiler or cprofile option was given.'
+	if options.cProfileProcedure:
+		setCraftProfiler(options.cProfileProcedure)
+	elif options.profiler:
+		setCraftProfiler()
+
+
+class CraftProfiler:
+	'A class to record the plugin profiles of the craft chain.'
+	def __init__(self, cProfileProcedure=''):
+		'Initialize.'
+		self.cProfileProcedure = cProfileProcedure.lower()
+		self.cProfileStatsFileName = ''
+		self.craftProfilerPlugins = []
+
+	def getCraftedText(self, craftModule, fileName, procedure, text):
+		'Get the crafted text from the craft module and record the profile of the plugin.'
+		craftProfilerPlugin = CraftProfilerPlugin(procedure, text)
+		self.craftProfilerPlugins.append(craftProfilerPlugin)
+		settings.globalLayerProgressListener = craftProfilerPlugin
+		try:
+			if procedure == self.cProfileProcedure:
+				cProfileProfile = cProfile.Profile()
+				text = cProfileProfile.runcall(craftModule.getCraftedText, fileName, text)
+				self.cProfileStatsFileName = fileName[: fileName.rfind('.')] + '_' + procedure + '.prof'
+				cProfileProfile.dump_stats(self.cProfileStatsFileName)
+			else:
+				text = craftModule.getCraftedText(fileName, text)
+		finally:
+			settings.globalLayerProgressListener = None
+		craftProfilerPlugin.stop(text)
+		return text
+
+	def getDictionary(self, fileName):
+		'Get the dictionary of the profile, for the json output.'
+		pluginDictionaries = []
+		for craftProfilerPlugin in self.craftProfilerPlugins:
+			pluginDictionaries.append(craftProfilerPlugin.getDictionary())
+		return {'fileName' : fileName, 'cProfileStatsFileName' : self.cProfileStatsFileName, 'plugins' : pluginDictionaries}
+
+	def getTableText(self):
+		'Get the summary table of the plugin profiles.'
+		rows = [['Plugin', 'Wall (s)', 'CPU (s)', 'Peak (MB)', 'Lines In', 'Lines Out', 'KB In', 'KB Out', 'Layers', 'Slowest Layer (index: s)']]
+		totalCPUTime = 0.0
+		totalWallTime = 0.0
+		for craftProfilerPlugin in self.craftProfilerPlugins:
+			rows.append(craftProfilerPlugin.getTableRow())
+			totalCPUTime += craftProfilerPlugin.cpuTime
+			totalWallTime += craftProfilerPlugin.wallTime
+		rows.append(['Total', '%.3f' % totalWallTime, '%.3f' % totalCPUTime, '', '', '', '', '', '', ''])
+		columnWidths = [0] * len(rows[0])
+		for row in rows:
+			for columnIndex, word in enumerate(row):
+				columnWidths[columnIndex] = max(columnWidths[columnIndex], len(word))
+		lines = []
+		for row in rows:
+			words = [row[0].ljust(columnWidths[0])]
+			for columnIndex in xrange(1, len(row)):
+				words.append(row[columnIndex].rjust(columnWidths[columnIndex]))
+			lines.append('  '.join(words))
+		return '\n'.join(lines)
+
+	def writeOutput(self, fileName):
+		'Print the summary table and the cProfile statistics, then write the json file.'
+		if fileName == '' or len(self.craftProfilerPlugins) == 0:
+			return
+		print('')
+		print('Craft profile of ' + archive.getSummarizedFileName(fileName) + ':')
+		print(self.getTableText())
+		if self.cProfileStatsFileName != '':
+			print('')
+			print('The cProfile statistics of %s are saved as %s, the functions with the largest cumulative time are:' % (self.cProfileProcedure, archive.getSummarizedFileName(self.cProfileStatsFileName)))
+			pstats.Stats(self.cProfileStatsFileName, stream=sys.stdout).sort_stats('cumulative').print_stats(globalNumberOfCProfileFunctions)
+		jsonFileName = fileName[: fileName.rfind('.')] + '_craft_profile.json'
+		archive.writeFileText(jsonFileName, json.dumps(self.getDictionary(fileName), indent=1, sort_keys=True))
+		print('The craft profile is saved as ' + archive.getSummarizedFileName(jsonFileName))
+		self.craftProfilerPlugins = []
+		self.cProfileStatsFileName = ''
+
+
+class CraftProfilerLayer:
+	'A class to record the time of a layer in a plugin.'
+	def __init__(self, layerIndex):
+		'Initialize and start the layer timer.'
+		self.cpuTime = 0.0
+		self.layerIndex = layerIndex
+		self.wallTime = 0.0
+		self.startCPUTime = getCPUTime()
+		self.startWallTime = time.time()
+
+	def __repr__(self):
+		'Get the string representation of this layer.'
+		return '%s, %s, %s' % (self.layerIndex, self.wallTime, self.cpuTime)
+
+	def getDictionary(self):
+		'Get the dictionary of the layer record.'
+		return {'layerIndex' : self.layerIndex, 'wallTime' : self.wallTime, 'cpuTime' : self.cpuTime}
+
+	def stop(self):
+		'Stop the layer timer.'
+		self.cpuTime = getCPUTime() - self.startCPUTime
+		self.wallTime = time.time() - self.startWallTime
+
+
+class CraftProfilerPlugin:
+	'A class to record the profile of a plugin.'
+	def __init__(self, procedure, text):
+		'Initialize and start the plugin timer.'
+		self.bytesIn = len(text)
+		self.bytesOut = 0
+		self.cpuTime = 0.0
+		self.layers = []
+		self.linesIn = getLineCount(text)
+		self.linesOut = 0
+		self.peakMemoryIncrease = None
+		self.peakMemoryKilobytes = None
+		self.procedure = procedure
+		self.startPeakMemoryKilobytes = getPeakMemoryKilobytes()
+		self.wallTime = 0.0
+		self.startCPUTime = getCPUTime()
+		self.startWallTime = time.time()
+
+	def __repr__(self):
+		'Get the string representation of this plugin record.'
+		return '%s, %s, %s, %s' % (self.procedure, self.wallTime, self.cpuTime, len(self.layers))
+
+	def getDictionary(self):
+		'Get the dictionary of the plugin record.'
+		layerDictionaries = []
+		for layer in self.layers:
+			layerDictionaries.append(layer.getDictionary())
+		return {
+			'procedure' : self.procedure,
+			'wallTime' : self.wallTime,
+			'cpuTime' : self.cpuTime,
+			'peakMemoryKilobytes' : self.peakMemoryKilobytes,
+			'peakMemoryIncreaseKilobytes' : self.peakMemoryIncrease,
+			'linesIn' : self.linesIn,
+			'linesOut' : self.linesOut,
+			'bytesIn' : self.bytesIn,
+			'bytesOut' : self.bytesOut,
+			'layers' : layerDictionaries}
+
+	def getSlowestLayer(self):
+		'Get the layer with the largest wall time, or None if there are no layers.'
+		slowestLayer = None
+		for layer in self.layers:
+			if slowestLayer == None or layer.wallTime > slowestLayer.wallTime:
+				slowestLayer = layer
+		return slowestLayer
+
+	def getTableRow(self):
+		'Get the row of words of the summary table.'
+		peakMemoryString = ''
+		if self.peakMemoryKilobytes != None:
+			peakMemoryString = '%.1f' % (self.peakMemoryKilobytes / 1024.0)
+		slowestLayerString = ''
+		slowestLayer = self.getSlowestLayer()
+		if slowestLayer != None:
+			slowestLayerString = '%s: %.3f' % (slowestLayer.layerIndex, slowestLayer.wallTime)
+		return [
+			self.procedure,
+			'%.3f' % self.wallTime,
+			'%.3f' % self.cpuTime,
+			peakMemoryString,
+			str(self.linesIn),
+			str(self.linesOut),
+			'%.1f' % (self.bytesIn / 1024.0),
+			'%.1f' % (self.bytesOut / 1024.0),
+			str(len(self.layers)),
+			slowestLayerString]
+
+	def startLayer(self, layerIndex):
+		'Stop the previous layer timer and start a layer record.'
+		if len(self.layers) > 0:
+			self.layers[-1].stop()
+		self.layers.append(CraftProfilerLayer(layerIndex))
+
+	def stop(self, text):
+		'Stop the plugin timer and record the output size.'
+		self.cpuTime = getCPUTime() - self.startCPUTime
+		self.wallTime = time.time() - self.startWallTime
+		if len(self.layers) > 0:
+			self.layers[-1].stop()
+		self.bytesOut = len(text)
+		self.linesOut = getLineCount(text)
+		self.peakMemoryKilobytes = getPeakMemoryKilobytes()
+		if self.peakMemoryKilobytes != None and self.startPeakMemoryKilobytes != None:
+			self.peakMemoryIncrease = self.peakMemoryKilobytes - self.startPeakMemoryKilobytes
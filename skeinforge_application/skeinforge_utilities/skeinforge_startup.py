@@ -0,0 +1,93 @@
+"""
+Startup is a script to benchmark the time skeinforge takes before the first craft plugin starts on a file.
+
+For many small files the time to import the craft modules and to read the settings of every plugin in the craft sequence can be a large part of the craft time, so this script measures those steps without crafting anything.  The steps are:
+
+Import is the time to import skeinforge_craft and the modules it imports.
+
+Craft Sequence is the time to read the profile and get the craft sequence.
+
+Plugin Import is the time to import the plugins in the craft sequence, only those plugins are imported.
+
+Cold Settings is the time to construct and read the repositories of the plugins in the craft sequence with the settings caches empty, which is what happens for the first file.
+
+Warm Settings is the average time to construct and read those repositories again, which is what happens for each later file in the same process.
+
+To run the benchmark with ten warm repetitions, in a shell in the skeinforge_utilities folder type:
+> python skeinforge_startup.py 10
+
+"""
+
+from __future__ import absolute_import
+import time
+globalStartTime = time.time()
+#Init has to be imported first because it has code to workaround the python bug where relative imports don't work if the module is imported as a main module.
+import __init__
+
+from skeinforge_application.skeinforge_utilities import skeinforge_craft
+from skeinforge_application.skeinforge_utilities import skeinforge_profile
+from fabmetheus_utilities import archive
+from fabmetheus_utilities import settings
+import sys
+
+
+__author__ = 'agent (agent@local)'
+__date__ = '$Date: 2026/18/10 $'
+__license__ = 'GNU Affero General Public License http://www.gnu.org/licenses/agpl.html'
+
+
+globalImportDuration = time.time() - globalStartTime
+
+
+def getMillisecondsString(seconds):
+	'Get the duration in milliseconds as a string.'
+	return '%.1f ms' % (1000.0 * seconds)
+
+def getStartupDurations(repetitions=10):
+	'Get the list of step names and durations of the startup.'
+	durations = [('Import', globalImportDuration)]
+	startTime = time.time()
+	craftSequence = skeinforge_craft.getReadCraftSequence()
+	durations.append(('Craft Sequence', time.time() - startTime))
+	startTime = time.time()
+	craftModules = []
+	for pluginName in craftSequence:
+		craftModule = skeinforge_craft.getCraftModule(pluginName)
+		if craftModule != None:
+			craftModules.append(craftModule)
+	durations.append(('Plugin Import', time.time() - startTime))
+	archive.globalPluginFileNamesTable.clear()
+	settings.globalReadRepositoryCache.clear()
+	skeinforge_profile.globalProfileDirectoryCache.clear()
+	startTime = time.time()
+	readCraftRepositories(craftModules)
+	durations.append(('Cold Settings', time.time() - startTime))
+	repetitions = max(1, repetitions)
+	startTime = time.time()
+	for repetition in xrange(repetitions):
+		readCraftRepositories(craftModules)
+	durations.append(('Warm Settings', (time.time() - startTime) / float(repetitions)))
+	return durations
+
+def readCraftRepositories(craftModules):
+	'Construct and read the repositories of the craft modules.'
+	for craftModule in craftModules:
+		settings.getReadRepository(craftModule.getNewRepository())
+
+def writeOutput(repetitions=10):
+	'Print the startup durations.'
+	durations = getStartupDurations(repetitions)
+	print('Startup durations for the %s craft plugins:' % len(skeinforge_craft.getReadCraftSequence()))
+	for durationName, duration in durations:
+		print('%s: %s' % (durationName, getMillisecondsString(duration)))
+
+
+def main():
+	'Benchmark the startup.'
+	if len(sys.argv) > 1:
+		writeOutput(int(sys.argv[1]))
+	else:
+		writeOutput()
+
+if __name__ == '__main__':
+	main()